@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
 from app.models.course import Course
 from app.models.enrolled_course import EnrolledCourse, CourseStatus
@@ -14,6 +16,7 @@ from app.schemas.enrolled_course import (
     BulkCourseCompletion
 )
 from app.services.auth_service import AuthService
+from app.services.course_store import insert_enrollments, resolve_courses
 from app.schemas.common import PaginatedResponse
 
 router = APIRouter()
@@ -26,10 +29,10 @@ async def get_courses(
     transferable: Optional[bool] = Query(None),
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get courses with filtering and pagination"""
-    query = db.query(Course)
+    query = select(Course)
     
     # Apply filters
     if institution:
@@ -45,11 +48,11 @@ async def get_courses(
         query = query.filter(Course.transferable == transferable)
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
     # Apply pagination
     offset = (page - 1) * limit
-    courses = query.offset(offset).limit(limit).all()
+    courses = (await db.scalars(query.offset(offset).limit(limit))).all()
     
     return PaginatedResponse(
         items=[CourseResponse.from_orm(course) for course in courses],
@@ -63,13 +66,15 @@ async def get_courses(
 @router.get("/completed", response_model=List[EnrolledCourseResponse])
 async def get_completed_courses(
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's completed courses"""
-    completed_courses = db.query(EnrolledCourse).filter(
-        EnrolledCourse.user_id == current_user.id,
-        EnrolledCourse.status == CourseStatus.COMPLETED
-    ).all()
+    completed_courses = (await db.scalars(
+        select(EnrolledCourse).options(selectinload(EnrolledCourse.course)).filter(
+            EnrolledCourse.user_id == current_user.id,
+            EnrolledCourse.status == CourseStatus.COMPLETED
+        )
+    )).all()
     
     return [EnrolledCourseResponse.from_orm(course) for course in completed_courses]
 
@@ -77,47 +82,35 @@ async def get_completed_courses(
 async def add_completed_courses(
     courses_data: List[CourseCompletionItem],
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Add multiple completed courses"""
-    enrolled_courses = []
+    institution = current_user.profile.current_institution if current_user.profile else "Unknown"
     
-    for course_item in courses_data:
-        # Find or create course
-        course = db.query(Course).filter(
-            Course.code == course_item.course_code
-        ).first()
-        
-        if not course:
-            # Create new course entry (basic info)
-            course = Course(
-                code=course_item.course_code,
-                title=f"Course {course_item.course_code}",
-                units=course_item.credits,
-                institution=current_user.profile.current_institution if current_user.profile else "Unknown",
-                transferable=True
-            )
-            db.add(course)
-            db.flush()  # Get the course ID
-        
-        # Create enrolled course record
-        enrolled_course = EnrolledCourse(
-            user_id=current_user.id,
-            course_id=course.id,
-            quarter=course_item.quarter,
-            year=course_item.year,
-            grade=course_item.grade,
-            status=CourseStatus.COMPLETED
-        )
-        
-        db.add(enrolled_course)
-        enrolled_courses.append(enrolled_course)
+    # Find or create every course at once (basic info for new ones)
+    courses = await resolve_courses(db, {
+        (institution, course_item.course_code): {
+            "title": f"Course {course_item.course_code}",
+            "units": course_item.credits
+        }
+        for course_item in courses_data
+    })
     
-    db.commit()
+    # Create the enrolled course records in one statement, courses attached for the response
+    enrolled_courses = await insert_enrollments(db, [
+        {
+            "user_id": current_user.id,
+            "course_id": courses[(institution, course_item.course_code)].id,
+            "course": courses[(institution, course_item.course_code)],
+            "quarter": course_item.quarter,
+            "year": course_item.year,
+            "grade": course_item.grade,
+            "status": CourseStatus.COMPLETED
+        }
+        for course_item in courses_data
+    ])
     
-    # Refresh all objects to get relationships
-    for enrolled_course in enrolled_courses:
-        db.refresh(enrolled_course)
+    await db.commit()
     
     return [EnrolledCourseResponse.from_orm(course) for course in enrolled_courses]
 
@@ -125,18 +118,18 @@ async def add_completed_courses(
 async def remove_completed_course(
     course_id: int,
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Remove a completed course"""
-    enrolled_course = db.query(EnrolledCourse).filter(
+    enrolled_course = (await db.scalars(select(EnrolledCourse).filter(
         EnrolledCourse.id == course_id,
         EnrolledCourse.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not enrolled_course:
         raise HTTPException(status_code=404, detail="Course not found")
     
-    db.delete(enrolled_course)
-    db.commit()
+    await db.delete(enrolled_course)
+    await db.commit()
     
     return {"message": "Course removed successfully"} 
\ No newline at end of file
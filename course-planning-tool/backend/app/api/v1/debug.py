@@ -120,10 +120,10 @@ async def check_chrome_status():
 async def test_scraper():
     """Test the ASSIST scraper with minimal parameters"""
     try:
-        from app.scrapers.assist_scraper import scrape_assist_data
+        from app.scrapers.assist_scraper import scrape_assist_data_async
         
         # Test with minimal data
-        result = scrape_assist_data(
+        result = await scrape_assist_data_async(
             academic_year="2024-25",
             institution="De Anza College", 
             target_institution="UC Berkeley",
@@ -142,6 +142,27 @@ async def test_scraper():
             "message": "Scraper test failed"
         }
 
+@router.get("/scraper-pool")
+async def scraper_pool_status():
+    """Lease and recycle counters for the warm Chrome driver pool"""
+    from app.scrapers.driver_pool import get_driver_pool
+    
+    return {"success": True, "pool": get_driver_pool().stats()}
+
+@router.get("/metrics")
+async def metrics_snapshot():
+    """Cache, pool and latency metrics collected in this worker"""
+    from app.core.metrics import metrics
+    from app.scrapers.articulation_cache import articulation_cache
+    from app.services.schedule_cache import schedule_cache
+    
+    return {
+        "success": True,
+        "articulation_cache": articulation_cache.stats(),
+        "schedule_cache": schedule_cache.stats(),
+        "metrics": metrics.snapshot()
+    }
+
 @router.get("/system-explore")
 async def explore_system():
     """Explore system to find Chrome/Chromium installations"""
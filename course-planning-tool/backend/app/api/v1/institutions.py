@@ -1,7 +1,48 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Dict
+
+from app.schemas.common import ApiResponse
+from app.scrapers.assist_catalog import assist_catalog
 
 router = APIRouter()
 
 @router.get("/")
 async def get_institutions():
-    return {"message": "institutions endpoint"} 
\ No newline at end of file
+    return {"message": "institutions endpoint"}
+
+@router.get("/search", response_model=ApiResponse[Dict[str, Any]])
+async def search_institutions(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """Autocomplete institution names from the local ASSIST.org catalog"""
+    if not assist_catalog.is_ready():
+        assist_catalog.refresh_in_background()
+        raise HTTPException(status_code=503, detail="Institution catalog is still loading")
+    return ApiResponse(success=True, data={"institutions": assist_catalog.search_institutions(q, limit)})
+
+@router.get("/majors", response_model=ApiResponse[Dict[str, Any]])
+async def list_agreement_majors(academic_year: str, institution: str, target_institution: str):
+    """Majors in one ASSIST.org agreement, from the local catalog"""
+    if not assist_catalog.is_ready():
+        assist_catalog.refresh_in_background()
+        raise HTTPException(status_code=503, detail="Institution catalog is still loading")
+
+    year_id = assist_catalog.academic_year_id(academic_year)
+    source = assist_catalog.find_institution(institution)
+    if year_id is None or source is None:
+        raise HTTPException(status_code=404, detail="Academic year or institution not found on ASSIST.org")
+    agreements = assist_catalog.agreements(source["id"])
+    if agreements is None:
+        assist_catalog.refresh_in_background(source["id"])
+        raise HTTPException(status_code=503, detail="Agreements for this institution are still loading")
+    agreement = assist_catalog.find_agreement(source["id"], target_institution)
+    if agreement is None:
+        raise HTTPException(status_code=404, detail="No ASSIST.org agreement between these institutions")
+    reports = assist_catalog.majors(year_id, source["id"], agreement["id"])
+    if reports is None:
+        assist_catalog.refresh_in_background(source["id"], (year_id, source["id"], agreement["id"]))
+        raise HTTPException(status_code=503, detail="Majors for this agreement are still loading")
+
+    return ApiResponse(success=True, data={
+        "institution": source["name"],
+        "target_institution": agreement["name"],
+        "majors": [report["label"] for report in reports]
+    })
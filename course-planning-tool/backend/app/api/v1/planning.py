@@ -1,19 +1,27 @@
+import time
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, Any, List, Optional, Tuple
 from pydantic import BaseModel
 
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_async_db
 from app.models.user import User
 from app.models.student_profile import StudentProfile, Quarter
 from app.models.enrolled_course import EnrolledCourse, CourseStatus
 from app.models.transfer_requirement import TransferRequirement
-from app.services.auth_service import AuthService
 from app.services.ai_planning_service import AIPlanningService
-from app.scrapers.assist_scraper import scrape_assist_data
+from app.services.auth_service import AuthService
+from app.services.course_store import insert_enrollments, resolve_courses
+from app.services.quarter_planner import QuarterPlanner, quarter_sequence, schedule_service
+from app.scrapers.assist_scraper import scrape_assist_data_async
 from app.schemas.common import ApiResponse
 from app.schemas.student_profile import StudentProfileCreate
-from app.api.v1.transfer import normalize_institution_name  # Import normalization function
+from app.api.v1.transfer import _sse_event
+from app.services.transfer_analysis_service import resolve_assist_names
 
 router = APIRouter()
 
@@ -31,6 +39,9 @@ class PlanningRequest(BaseModel):
     # Planning preferences
     units_per_quarter: int = 12
     completed_courses: List[Dict[str, Any]] = []
+    schedule_engine: Optional[str] = None  # "ai" or "solver"; defaults to SCHEDULE_ENGINE
+    plan_horizon: bool = False  # Every quarter until transfer in one solver pass; can't be combined with "ai"
+    include_summer: bool = False
     
     # For existing users, these will be loaded from database
     update_profile: bool = False
@@ -51,170 +62,266 @@ class PlanningResponse(BaseModel):
 async def generate_ai_schedule(
     request: PlanningRequest,
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate AI-powered quarter-by-quarter course schedule"""
+    _check_engine(request)
     try:
-        # Step 1: Get or create user profile
-        profile = db.query(StudentProfile).filter(
-            StudentProfile.user_id == current_user.id
-        ).first()
+        profile, planning_context, completed_count = await _prepare_planning(request, current_user, db)
         
-        if not profile:
-            # New user - validate required fields
-            required_fields = [
-                'current_institution', 'target_institution', 'current_major', 
-                'target_major', 'current_quarter', 'current_year', 
-                'expected_transfer_year', 'expected_transfer_quarter'
-            ]
-            
-            missing_fields = [field for field in required_fields if getattr(request, field) is None]
-            if missing_fields:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Missing required fields for new user: {', '.join(missing_fields)}"
-                )
-            
-            # Create new profile
-            profile = StudentProfile(
-                user_id=current_user.id,
-                current_institution=request.current_institution,
-                current_major=request.current_major,
-                current_quarter=request.current_quarter,
-                current_year=request.current_year,
-                target_institution=request.target_institution,
-                target_major=request.target_major,
-                expected_transfer_year=request.expected_transfer_year,
-                expected_transfer_quarter=request.expected_transfer_quarter
-            )
-            db.add(profile)
-            db.commit()
-            db.refresh(profile)
-            
-            # Add completed courses if provided
-            if request.completed_courses:
-                await _add_completed_courses(request.completed_courses, current_user.id, db)
+        # Step 5: Generate the schedule - the whole horizon (solver only) or the selected engine's quarter
+        if request.plan_horizon:
+            schedule = await QuarterPlanner().generate_horizon_schedule(planning_context)
+        else:
+            schedule = await schedule_service(request.schedule_engine).generate_quarter_schedule(planning_context)
         
-        elif request.update_profile:
-            # Update existing profile with new information
-            if request.current_institution:
-                profile.current_institution = request.current_institution
-            if request.target_institution:
-                profile.target_institution = request.target_institution
-            if request.current_major:
-                profile.current_major = request.current_major
-            if request.target_major:
-                profile.target_major = request.target_major
-            if request.current_quarter:
-                profile.current_quarter = request.current_quarter
-            if request.current_year:
-                profile.current_year = request.current_year
-            if request.expected_transfer_year:
-                profile.expected_transfer_year = request.expected_transfer_year
-            if request.expected_transfer_quarter:
-                profile.expected_transfer_quarter = request.expected_transfer_quarter
-            
-            db.commit()
-        
-        # Step 2: Get user's completed courses
-        completed_courses = db.query(EnrolledCourse).filter(
-            EnrolledCourse.user_id == current_user.id,
-            EnrolledCourse.status == CourseStatus.COMPLETED
-        ).all()
+        # Step 6: Save planned courses to database (as PLANNED status)
+        await _save_planned_courses(schedule, current_user.id, db, profile.current_institution)
         
-        # Step 3: Scrape transfer requirements from ASSIST.org
-        # Normalize institution names for ASSIST.org compatibility
-        normalized_current_institution = normalize_institution_name(profile.current_institution)
-        normalized_target_institution = normalize_institution_name(profile.target_institution)
+        return ApiResponse(
+            success=True,
+            data=_schedule_data(schedule, profile, completed_count),
+            message="AI course schedule generated successfully!"
+        )
         
-        transfer_data = scrape_assist_data(
-            academic_year=f"{profile.expected_transfer_year-1}-{str(profile.expected_transfer_year)[2:]}",
-            institution=normalized_current_institution,
-            target_institution=normalized_target_institution,
-            major_filter=profile.target_major
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating schedule: {str(e)}"
+        )
+
+@router.post("/generate/stream")
+async def stream_ai_schedule(
+    request: PlanningRequest,
+    current_user: User = Depends(AuthService.get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Streaming variant of /generate (Server-Sent Events).
+
+    Emits a `course` event for each planned course as soon as it's known -
+    with the AI engine, as soon as the model has finished writing it - then a
+    `result` event carrying the same data as /generate once the whole schedule
+    has been validated and saved, or an `error` event.
+    """
+    _check_engine(request)
+    try:
+        profile, planning_context, completed_count = await _prepare_planning(request, current_user, db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error generating schedule: {str(e)}"
+        )
+
+    async def event_stream():
+        started = time.perf_counter()
+        try:
+            schedule = None
+            async for kind, payload in _schedule_events(request, planning_context):
+                if kind == "course":
+                    yield _sse_event("course", {**payload, "elapsed_ms": round((time.perf_counter() - started) * 1000)})
+                else:
+                    schedule = payload
+            # The request's session is closed once the response starts, so the save gets its own
+            async with AsyncSessionLocal() as session:
+                await _save_planned_courses(schedule, current_user.id, session, profile.current_institution)
+            yield _sse_event("result", _schedule_data(schedule, profile, completed_count))
+        except Exception as e:
+            yield _sse_event("error", {"status_code": 500, "detail": f"Error generating schedule: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _check_engine(request: PlanningRequest) -> None:
+    # Horizon plans come from the solver; silently ignoring an explicit AI request would mislead the client
+    if request.plan_horizon and (request.schedule_engine or "").lower() == "ai":
+        raise HTTPException(
+            status_code=400,
+            detail="plan_horizon is only available with the solver engine; omit schedule_engine or use \"solver\""
         )
+
+async def _prepare_planning(
+    request: PlanningRequest,
+    current_user: User,
+    db: AsyncSession
+) -> Tuple[StudentProfile, Dict[str, Any], int]:
+    """Profile, planning context and completed-course count for a planning request"""
+    # Step 1: Get or create user profile
+    profile = (await db.scalars(select(StudentProfile).filter(
+        StudentProfile.user_id == current_user.id
+    ))).first()
+    
+    if not profile:
+        # New user - validate required fields
+        required_fields = [
+            'current_institution', 'target_institution', 'current_major', 
+            'target_major', 'current_quarter', 'current_year', 
+            'expected_transfer_year', 'expected_transfer_quarter'
+        ]
         
-        if not transfer_data.get("success"):
+        missing_fields = [field for field in required_fields if getattr(request, field) is None]
+        if missing_fields:
             raise HTTPException(
-                status_code=500,
-                detail=f"Failed to scrape transfer requirements: {transfer_data.get('error', 'Unknown error')}"
+                status_code=400,
+                detail=f"Missing required fields for new user: {', '.join(missing_fields)}"
             )
         
-        # Step 4: Prepare data for AI planning
-        planning_context = {
-            "profile": {
-                "current_institution": profile.current_institution,
-                "target_institution": profile.target_institution,
-                "current_major": profile.current_major,
-                "target_major": profile.target_major,
-                "current_quarter": profile.current_quarter.value,
-                "current_year": profile.current_year,
-                "transfer_quarter": profile.expected_transfer_quarter.value,
-                "transfer_year": profile.expected_transfer_year
-            },
-            "completed_courses": [
-                {
-                    "code": course.course.code,
-                    "title": course.course.title,
-                    "units": course.course.units,
-                    "grade": course.grade,
-                    "quarter": course.quarter,
-                    "year": course.year
-                }
-                for course in completed_courses
-            ],
-            "transfer_requirements": transfer_data.get("data", {}),
-            "preferences": {
-                "units_per_quarter": profile.max_credits_per_quarter,
-                "max_units_per_quarter": min(profile.max_credits_per_quarter + 3, 20),  # Some flexibility
-                "min_units_per_quarter": max(profile.max_credits_per_quarter - 3, 6)
-            }
-        }
-        
-        # Step 5: Generate AI schedule
-        ai_service = AIPlanningService()
-        schedule = await ai_service.generate_quarter_schedule(planning_context)
+        # Create new profile
+        profile = StudentProfile(
+            user_id=current_user.id,
+            current_institution=request.current_institution,
+            current_major=request.current_major,
+            current_quarter=request.current_quarter,
+            current_year=request.current_year,
+            target_institution=request.target_institution,
+            target_major=request.target_major,
+            expected_transfer_year=request.expected_transfer_year,
+            expected_transfer_quarter=request.expected_transfer_quarter
+        )
+        db.add(profile)
+        await db.commit()
+        await db.refresh(profile)
         
-        # Step 6: Save planned courses to database (as PLANNED status)
-        await _save_planned_courses(schedule, current_user.id, db)
+        # Add completed courses if provided
+        if request.completed_courses:
+            await _add_completed_courses(request.completed_courses, current_user.id, db, profile.current_institution)
+    
+    elif request.update_profile:
+        # Update existing profile with new information
+        if request.current_institution:
+            profile.current_institution = request.current_institution
+        if request.target_institution:
+            profile.target_institution = request.target_institution
+        if request.current_major:
+            profile.current_major = request.current_major
+        if request.target_major:
+            profile.target_major = request.target_major
+        if request.current_quarter:
+            profile.current_quarter = request.current_quarter
+        if request.current_year:
+            profile.current_year = request.current_year
+        if request.expected_transfer_year:
+            profile.expected_transfer_year = request.expected_transfer_year
+        if request.expected_transfer_quarter:
+            profile.expected_transfer_quarter = request.expected_transfer_quarter
         
-        return ApiResponse(
-            success=True,
-            data={
-                "schedule": schedule,
-                "profile": {
-                    "current_institution": profile.current_institution,
-                    "target_institution": profile.target_institution,
-                    "current_major": profile.current_major,
-                    "target_major": profile.target_major,
-                    "transfer_timeline": f"{profile.expected_transfer_quarter.value} {profile.expected_transfer_year}"
-                },
-                "completed_courses_count": len(completed_courses),
-                "quarters_until_transfer": _calculate_quarters_until_transfer(
-                    profile.current_quarter.value, 
-                    profile.current_year,
-                    profile.expected_transfer_quarter.value,
-                    profile.expected_transfer_year
-                )
-            },
-            message="AI course schedule generated successfully!"
+        await db.commit()
+    
+    # Step 2: Get user's completed courses
+    completed_courses = (await db.scalars(
+        select(EnrolledCourse).options(selectinload(EnrolledCourse.course)).filter(
+            EnrolledCourse.user_id == current_user.id,
+            EnrolledCourse.status == CourseStatus.COMPLETED
         )
-        
-    except Exception as e:
+    )).all()
+    
+    # Step 3: Scrape transfer requirements from ASSIST.org
+    # Resolved to ASSIST.org names the same way as analyze-public, so both share cached agreements
+    academic_year = f"{profile.expected_transfer_year-1}-{profile.expected_transfer_year}"
+    assist_institution, assist_target_institution, assist_major = resolve_assist_names(
+        academic_year, profile.current_institution, profile.target_institution, profile.target_major
+    )
+    
+    transfer_data = await scrape_assist_data_async(
+        academic_year=academic_year,
+        institution=assist_institution,
+        target_institution=assist_target_institution,
+        major_filter=assist_major
+    )
+    
+    if not transfer_data.get("success"):
         raise HTTPException(
             status_code=500,
-            detail=f"Error generating schedule: {str(e)}"
+            detail=f"Failed to scrape transfer requirements: {transfer_data.get('error', 'Unknown error')}"
+        )
+    
+    # Step 4: Prepare data for AI planning
+    planning_context = {
+        "profile": {
+            "current_institution": profile.current_institution,
+            "target_institution": profile.target_institution,
+            "current_major": profile.current_major,
+            "target_major": profile.target_major,
+            "current_quarter": profile.current_quarter.value,
+            "current_year": profile.current_year,
+            "transfer_quarter": profile.expected_transfer_quarter.value,
+            "transfer_year": profile.expected_transfer_year
+        },
+        "completed_courses": [
+            {
+                "code": course.course.code,
+                "title": course.course.title,
+                "units": course.course.units,
+                "grade": course.grade,
+                "quarter": course.quarter,
+                "year": course.year
+            }
+            for course in completed_courses
+        ],
+        "transfer_requirements": transfer_data.get("data", {}),
+        "preferences": {
+            "units_per_quarter": profile.max_credits_per_quarter,
+            "max_units_per_quarter": min(profile.max_credits_per_quarter + 3, 20),  # Some flexibility
+            "min_units_per_quarter": max(profile.max_credits_per_quarter - 3, 6),
+            "include_summer": request.include_summer
+        },
+        "prerequisites": await _known_prerequisites(db, profile.current_institution)
+    }
+    
+    return profile, planning_context, len(completed_courses)
+
+async def _schedule_events(request: PlanningRequest, planning_context: Dict[str, Any]):
+    """("course", course) per planned course, then ("schedule", schedule)"""
+    if request.plan_horizon:
+        schedule = await QuarterPlanner().generate_horizon_schedule(planning_context)
+        for quarter in schedule["quarters"]:
+            for course in quarter["courses"]:
+                yield "course", {**course, "quarter": quarter["quarter"], "year": quarter["year"]}
+        yield "schedule", schedule
+        return
+
+    service = schedule_service(request.schedule_engine)
+    if isinstance(service, AIPlanningService):
+        async for event in service.stream_quarter_schedule(planning_context):
+            yield event
+        return
+
+    schedule = await service.generate_quarter_schedule(planning_context)
+    for course in schedule["quarter"]["courses"]:
+        yield "course", course
+    yield "schedule", schedule
+
+def _schedule_data(schedule: Dict[str, Any], profile: StudentProfile, completed_count: int) -> Dict[str, Any]:
+    return {
+        "schedule": schedule,
+        "profile": {
+            "current_institution": profile.current_institution,
+            "target_institution": profile.target_institution,
+            "current_major": profile.current_major,
+            "target_major": profile.target_major,
+            "transfer_timeline": f"{profile.expected_transfer_quarter.value} {profile.expected_transfer_year}"
+        },
+        "completed_courses_count": completed_count,
+        "quarters_until_transfer": _calculate_quarters_until_transfer(
+            profile.current_quarter.value, 
+            profile.current_year,
+            profile.expected_transfer_quarter.value,
+            profile.expected_transfer_year
         )
+    }
 
 @router.get("/schedule", response_model=ApiResponse[Dict[str, Any]])
 async def get_current_schedule(
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's current planned schedule"""
-    profile = db.query(StudentProfile).filter(
+    profile = (await db.scalars(select(StudentProfile).filter(
         StudentProfile.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not profile:
         return ApiResponse(
@@ -224,10 +331,12 @@ async def get_current_schedule(
         )
     
     # Get all planned courses
-    planned_courses = db.query(EnrolledCourse).filter(
-        EnrolledCourse.user_id == current_user.id,
-        EnrolledCourse.status.in_([CourseStatus.PLANNED, CourseStatus.ENROLLED])
-    ).all()
+    planned_courses = (await db.scalars(
+        select(EnrolledCourse).options(selectinload(EnrolledCourse.course)).filter(
+            EnrolledCourse.user_id == current_user.id,
+            EnrolledCourse.status.in_([CourseStatus.PLANNED, CourseStatus.ENROLLED])
+        )
+    )).all()
     
     # Group by quarter and year
     schedule_by_quarter = {}
@@ -264,84 +373,96 @@ async def get_current_schedule(
         message="Current schedule retrieved successfully"
     )
 
-async def _add_completed_courses(courses_data: List[Dict], user_id: int, db: Session):
-    """Helper function to add completed courses"""
-    from app.models.course import Course
+async def _add_completed_courses(courses_data: List[Dict], user_id: int, db: AsyncSession, institution: str = "Unknown"):
+    """Helper function to add completed courses in one bulk write (courses default to `institution`)"""
+    rows = [(course_data, (course_data.get("institution") or institution, course_data.get("course_code")))
+            for course_data in courses_data]
     
-    for course_data in courses_data:
-        # Find or create course
-        course = db.query(Course).filter(
-            Course.code == course_data.get("course_code")
-        ).first()
-        
-        if not course:
-            course = Course(
-                code=course_data.get("course_code"),
-                title=course_data.get("course_title", f"Course {course_data.get('course_code')}"),
-                units=float(course_data.get("credits", 3)),
-                institution=course_data.get("institution", "Unknown"),
-                transferable=True
-            )
-            db.add(course)
-            db.flush()
-        
-        # Add enrolled course
-        enrolled_course = EnrolledCourse(
-            user_id=user_id,
-            course_id=course.id,
-            quarter=course_data.get("quarter"),
-            year=int(course_data.get("year")),
-            grade=course_data.get("grade"),
-            status=CourseStatus.COMPLETED
-        )
-        db.add(enrolled_course)
-
-async def _save_planned_courses(schedule: Dict, user_id: int, db: Session):
-    """Helper function to save AI-generated planned courses"""
-    from app.models.course import Course
+    # Find or create every course at once
+    courses = await resolve_courses(db, {
+        key: {
+            "title": course_data.get("course_title", f"Course {course_data.get('course_code')}"),
+            "units": float(course_data.get("credits", 3))
+        }
+        for course_data, key in rows
+    })
     
+    await insert_enrollments(db, [
+        {
+            "user_id": user_id,
+            "course_id": courses[key].id,
+            "course": courses[key],
+            "quarter": course_data.get("quarter"),
+            "year": int(course_data.get("year")),
+            "grade": course_data.get("grade"),
+            "status": CourseStatus.COMPLETED
+        }
+        for course_data, key in rows
+    ])
+
+async def _save_planned_courses(schedule: Dict, user_id: int, db: AsyncSession, institution: str = "Unknown"):
+    """
+    Helper function to save generated planned courses in one bulk write.
+
+    Takes a horizon plan ("quarters") or a single-quarter schedule ("quarter");
+    GE placeholders aren't saved since they name no course. Courses are
+    looked up (or created) at `institution`, where the plan takes them.
+    """
+    quarters = schedule.get("quarters")
+    if quarters is None and schedule.get("quarter"):
+        quarter_name, _, year = str(schedule["quarter"].get("quarter_name", "")).partition(" ")
+        quarters = [{**schedule["quarter"], "quarter": quarter_name, "year": year}]
+
+    rows = []
+    for quarter_data in quarters or []:
+        if not str(quarter_data.get("year") or "").isdigit():
+            continue
+        for course_data in quarter_data.get("courses", []):
+            code = course_data.get("course_code") or course_data.get("code")
+            if code and code != "GE":
+                rows.append((quarter_data, course_data, (course_data.get("institution") or institution, code)))
+
     # Clear existing planned courses
-    db.query(EnrolledCourse).filter(
+    await db.execute(delete(EnrolledCourse).filter(
         EnrolledCourse.user_id == user_id,
         EnrolledCourse.status == CourseStatus.PLANNED
-    ).delete()
-    
-    for quarter_data in schedule.get("quarters", []):
-        for course_data in quarter_data.get("courses", []):
-            # Find or create course
-            course = db.query(Course).filter(
-                Course.code == course_data.get("code")
-            ).first()
-            
-            if not course:
-                course = Course(
-                    code=course_data.get("code"),
-                    title=course_data.get("title"),
-                    units=float(course_data.get("units", 3)),
-                    institution=course_data.get("institution", "Unknown"),
-                    transferable=True,
-                    category=course_data.get("category")
-                )
-                db.add(course)
-                db.flush()
-            
-            # Add planned course
-            planned_course = EnrolledCourse(
-                user_id=user_id,
-                course_id=course.id,
-                quarter=quarter_data.get("quarter"),
-                year=int(quarter_data.get("year")),
-                status=CourseStatus.PLANNED
-            )
-            db.add(planned_course)
-    
-    db.commit()
+    ))
+
+    # Find every course in one query, then create the missing ones in one upsert
+    courses = await resolve_courses(db, {
+        key: {
+            "title": course_data.get("course_name") or course_data.get("title"),
+            "units": course_data.get("units", 3),
+            "category": course_data.get("category")
+        }
+        for _, course_data, key in reversed(rows)  # The first mention of a course wins
+    })
+
+    await insert_enrollments(db, [
+        {
+            "user_id": user_id,
+            "course_id": courses[key].id,
+            "course": courses[key],
+            "quarter": str(quarter_data.get("quarter")).title(),
+            "year": int(quarter_data.get("year")),
+            "status": CourseStatus.PLANNED
+        }
+        for quarter_data, _, key in rows
+    ])
+    await db.commit()
+
+async def _known_prerequisites(db: AsyncSession, institution: str) -> Dict[str, List[str]]:
+    """Course code -> prerequisite codes, for the institution's courses that record any"""
+    from app.models.course import Course
+
+    rows = (await db.execute(
+        select(Course.code, Course.prerequisites).filter(
+            Course.institution == institution,
+            Course.prerequisites.isnot(None)
+        )
+    )).all()
+    return {code: list(prerequisites) for code, prerequisites in rows if prerequisites}
 
 def _calculate_quarters_until_transfer(current_quarter: str, current_year: int, transfer_quarter: str, transfer_year: int) -> int:
     """Calculate number of quarters until transfer"""
-    quarter_order = {"fall": 0, "winter": 1, "spring": 2, "summer": 3}
-    
-    current_total = current_year * 4 + quarter_order.get(current_quarter.lower(), 0)
-    transfer_total = transfer_year * 4 + quarter_order.get(transfer_quarter.lower(), 0)
-    
-    return max(0, transfer_total - current_total) 
\ No newline at end of file
+    return len(quarter_sequence(current_quarter, current_year, transfer_quarter, transfer_year, include_summer=True))
@@ -1,205 +1,36 @@
+import asyncio
+import json
+import time
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.user import User
 from app.models.student_profile import StudentProfile
 from app.models.transfer_requirement import TransferRequirement, RequirementStatus
+from app.models.course import Course
+from app.models.enrolled_course import EnrolledCourse, CourseStatus
 from app.services.auth_service import AuthService
-from app.scrapers.assist_scraper import scrape_assist_data
+from app.scrapers.assist_scraper import scrape_assist_data_async
+from app.scrapers.articulation_cache import articulation_cache, articulation_cache_key
 from app.schemas.common import ApiResponse
+from app.services.analysis_job_service import AnalysisJobService, JobQueueUnavailable, public_job_view
+from app.services.transfer_analysis_service import (
+    TransferAnalysisError,
+    TransferAnalysisService,
+    resolve_assist_names,
+)
+from app.services.requirement_engine import requirement_progress
 
 router = APIRouter()
 
-def normalize_major_name(raw_major: str) -> str:
-    """
-    Normalize major names to match ASSIST.org format
-    Maps common abbreviations and variations to full major names
-    """
-    if not raw_major:
-        return raw_major
-    
-    # Convert to lowercase for matching
-    major_lower = raw_major.lower().strip()
-    
-    # Major name mapping dictionary
-    major_mappings = {
-        # Computer Science variations
-        "cs": "Computer Science",
-        "computer science": "Computer Science",
-        "comp sci": "Computer Science",
-        "computer sci": "Computer Science",
-        "csc": "Computer Science",
-        
-        # Mathematics variations
-        "math": "Mathematics",
-        "mathematics": "Mathematics",
-        "applied math": "Applied Mathematics",
-        "applied mathematics": "Applied Mathematics",
-        "pure math": "Pure Mathematics",
-        "pure mathematics": "Pure Mathematics",
-        
-        # Engineering variations
-        "ee": "Electrical Engineering",
-        "electrical engineering": "Electrical Engineering",
-        "computer engineering": "Computer Engineering",
-        "comp eng": "Computer Engineering",
-        "cpe": "Computer Engineering",
-        "me": "Mechanical Engineering",
-        "mechanical engineering": "Mechanical Engineering",
-        "ce": "Civil Engineering",
-        "civil engineering": "Civil Engineering",
-        "chemical engineering": "Chemical Engineering",
-        "chem eng": "Chemical Engineering",
-        "bioengineering": "Bioengineering",
-        "bio eng": "Bioengineering",
-        
-        # Business variations
-        "business": "Business Administration",
-        "business admin": "Business Administration",
-        "business administration": "Business Administration",
-        "econ": "Economics",
-        "economics": "Economics",
-        
-        # Biology variations
-        "bio": "Biology",
-        "biology": "Biology",
-        "biochemistry": "Biochemistry",
-        "biochem": "Biochemistry",
-        "molecular biology": "Molecular Biology",
-        
-        # Chemistry variations
-        "chem": "Chemistry",
-        "chemistry": "Chemistry",
-        
-        # Physics variations
-        "physics": "Physics",
-        "astrophysics": "Astrophysics",
-        
-        # Psychology variations
-        "psych": "Psychology",
-        "psychology": "Psychology",
-        
-        # English variations
-        "english": "English",
-        "english lit": "English Literature",
-        "english literature": "English Literature",
-        
-        # History variations
-        "history": "History",
-        "hist": "History",
-        
-        # Political Science variations
-        "poli sci": "Political Science",
-        "political science": "Political Science",
-        "polisci": "Political Science",
-        
-        # Art variations
-        "art": "Art",
-        "fine art": "Fine Arts",
-        "fine arts": "Fine Arts",
-        "art history": "Art History",
-        
-        # Communication variations
-        "comm": "Communication Studies",
-        "communication": "Communication Studies",
-        "communications": "Communication Studies",
-        "communication studies": "Communication Studies",
-        
-        # Sociology variations
-        "soc": "Sociology",
-        "sociology": "Sociology",
-        
-        # Anthropology variations
-        "anthro": "Anthropology",
-        "anthropology": "Anthropology",
-        
-        # Philosophy variations
-        "phil": "Philosophy",
-        "philosophy": "Philosophy",
-    }
-    
-    # Check for exact matches first
-    if major_lower in major_mappings:
-        return major_mappings[major_lower]
-    
-    # Check for partial matches (for cases like "Applied Math" -> "Applied Mathematics")
-    # Only do partial matching for longer, more specific terms to avoid false positives
-    for key, value in major_mappings.items():
-        if len(key) > 3:  # Only check longer keys to avoid short abbreviations causing false matches
-            if key in major_lower:
-                return value
-    
-    # If no mapping found, return the original with proper capitalization
-    return raw_major.title()
+# Seconds between comment lines on an otherwise idle analysis stream
+SSE_KEEPALIVE_SECONDS = 15
 
-def normalize_institution_name(raw_institution: str) -> str:
-    """
-    Normalize institution names to match ASSIST.org format
-    """
-    if not raw_institution:
-        return raw_institution
-    
-    institution_lower = raw_institution.lower().strip()
-    
-    # Institution name mappings
-    institution_mappings = {
-        # Community Colleges
-        "de anza": "De Anza College",
-        "de anza college": "De Anza College",
-        "foothill": "Foothill College",
-        "foothill college": "Foothill College",
-        "diablo valley": "Diablo Valley College",
-        "diablo valley college": "Diablo Valley College",
-        "city college of san francisco": "City College of San Francisco",
-        "ccsf": "City College of San Francisco",
-        
-        # UC System
-        "uc berkeley": "University of California, Berkeley",
-        "ucb": "University of California, Berkeley",
-        "berkeley": "University of California, Berkeley",
-        "university of california berkeley": "University of California, Berkeley",
-        "university of california, berkeley": "University of California, Berkeley",
-        
-        "uc davis": "University of California, Davis",
-        "ucd": "University of California, Davis",
-        "davis": "University of California, Davis",
-        
-        "uc irvine": "University of California, Irvine",
-        "uci": "University of California, Irvine",
-        "irvine": "University of California, Irvine",
-        
-        "uc los angeles": "University of California, Los Angeles",
-        "ucla": "University of California, Los Angeles",
-        "los angeles": "University of California, Los Angeles",
-        
-        "uc san diego": "University of California, San Diego",
-        "ucsd": "University of California, San Diego",
-        "san diego": "University of California, San Diego",
-        
-        "uc santa barbara": "University of California, Santa Barbara",
-        "ucsb": "University of California, Santa Barbara",
-        "santa barbara": "University of California, Santa Barbara",
-        
-        # CSU System
-        "san jose state": "San Jose State University",
-        "sjsu": "San Jose State University",
-        "san francisco state": "San Francisco State University",
-        "sfsu": "San Francisco State University",
-    }
-    
-    # Check for exact matches
-    if institution_lower in institution_mappings:
-        return institution_mappings[institution_lower]
-    
-    # Check for partial matches
-    for key, value in institution_mappings.items():
-        if key in institution_lower:
-            return value
-    
-    # Return original with proper capitalization
-    return raw_institution.title()
 
 class TransferAnalysisRequest:
     def __init__(
@@ -218,7 +49,7 @@ class TransferAnalysisRequest:
 async def analyze_transfer_requirements(
     request: Dict[str, str],
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Analyze transfer requirements using ASSIST.org data"""
     try:
@@ -235,7 +66,7 @@ async def analyze_transfer_requirements(
             )
         
         # Use the ASSIST scraper to get transfer requirements
-        scraper_result = scrape_assist_data(
+        scraper_result = await scrape_assist_data_async(
             academic_year=academic_year,
             institution=current_institution,
             target_institution=target_institution,
@@ -253,9 +84,9 @@ async def analyze_transfer_requirements(
         processed_requirements = []
         
         # Get or create user profile
-        profile = db.query(StudentProfile).filter(
+        profile = (await db.scalars(select(StudentProfile).filter(
             StudentProfile.user_id == current_user.id
-        ).first()
+        ))).first()
         
         if not profile:
             raise HTTPException(
@@ -264,9 +95,9 @@ async def analyze_transfer_requirements(
             )
         
         # Clear existing requirements for this profile
-        db.query(TransferRequirement).filter(
+        await db.execute(delete(TransferRequirement).filter(
             TransferRequirement.profile_id == profile.id
-        ).delete()
+        ))
         
         # Create new requirements based on ASSIST data
         for category, details in requirements_data.items():
@@ -291,7 +122,7 @@ async def analyze_transfer_requirements(
                     "status": requirement.status.value
                 })
         
-        db.commit()
+        await db.commit()
         
         return ApiResponse(
             success=True,
@@ -314,15 +145,38 @@ async def analyze_transfer_requirements(
             detail=f"Error analyzing transfer requirements: {str(e)}"
         )
 
+async def _articulation_progress(profile: StudentProfile, user_id, db: AsyncSession) -> Optional[Dict[str, Any]]:
+    """
+    Exact progress against the profile's cached ASSIST agreement, or None when it
+    hasn't been scraped yet (this endpoint never starts a scrape)
+    """
+    transfer_year = profile.expected_transfer_year
+    if not transfer_year:
+        return None
+    # Resolved like the scrapes that filled the cache, so the key matches theirs
+    academic_year = f"{transfer_year - 1}-{transfer_year}"
+    agreement = await articulation_cache.get_agreement_async(articulation_cache_key(
+        academic_year,
+        *resolve_assist_names(academic_year, profile.current_institution, profile.target_institution,
+                              profile.target_major)
+    ))
+    completed_codes = list(await db.scalars(select(Course.code).join(
+        EnrolledCourse, EnrolledCourse.course_id == Course.id
+    ).filter(
+        EnrolledCourse.user_id == user_id,
+        EnrolledCourse.status == CourseStatus.COMPLETED
+    )))
+    return requirement_progress(agreement, completed_codes)
+
 @router.get("/progress", response_model=ApiResponse[Dict[str, Any]])
 async def get_transfer_progress(
     current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's transfer progress"""
-    profile = db.query(StudentProfile).filter(
+    profile = (await db.scalars(select(StudentProfile).filter(
         StudentProfile.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not profile:
         return ApiResponse(
@@ -335,9 +189,11 @@ async def get_transfer_progress(
         )
     
     # Get all requirements for this profile
-    requirements = db.query(TransferRequirement).filter(
+    requirements = (await db.scalars(select(TransferRequirement).filter(
         TransferRequirement.profile_id == profile.id
-    ).all()
+    ))).all()
+    
+    articulation_progress = await _articulation_progress(profile, current_user.id, db)
     
     if not requirements:
         return ApiResponse(
@@ -345,6 +201,7 @@ async def get_transfer_progress(
             data={
                 "overall_progress": 0,
                 "requirements": [],
+                "articulation_progress": articulation_progress,
                 "message": "No transfer requirements found. Run transfer analysis first."
             }
         )
@@ -374,6 +231,7 @@ async def get_transfer_progress(
         data={
             "overall_progress": overall_progress,
             "requirements": requirements_data,
+            "articulation_progress": articulation_progress,
             "profile": {
                 "current_institution": profile.current_institution,
                 "target_institution": profile.target_institution,
@@ -385,188 +243,121 @@ async def get_transfer_progress(
 @router.post("/analyze-public", response_model=ApiResponse[Dict[str, Any]])
 async def analyze_transfer_requirements_public(
     request: Dict[str, Any],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Public endpoint for analyzing transfer requirements (for testing without auth)"""
+    # Log what we received from frontend
+    print("=== BACKEND RECEIVED DATA ===")
+    print("Full request:", request)
+
     try:
-        # Log what we received from frontend
-        print("=== BACKEND RECEIVED DATA ===")
-        print("Full request:", request)
-        
-        # Map frontend parameters to backend expected format
-        raw_current_institution = request.get("current_institution")
-        raw_target_institution = request.get("intended_transfer_institution") 
-        raw_major = request.get("current_major")
-        raw_year = request.get("target_transfer_quarter")  # This contains the year like "2025"
-        completed_courses = request.get("completed_courses", [])
-        
-        # Process the data to match ASSIST.org format
-        # Convert year to academic year format (e.g., "2025" -> "2024-2025")
-        if raw_year and raw_year.isdigit():
-            year = int(raw_year)
-            academic_year = f"{year-1}-{year}"
-        else:
-            raise HTTPException(status_code=400, detail="target_transfer_quarter must be a valid year (e.g., '2025')")
-        
-        # Normalize institution names to match ASSIST.org exactly
-        current_institution = normalize_institution_name(raw_current_institution)
-        target_institution = normalize_institution_name(raw_target_institution)
-        
-        # Normalize major name with comprehensive mapping
-        major = normalize_major_name(raw_major)
-        
-        print(f"Raw frontend data:")
-        print(f"  raw_current_institution: {raw_current_institution}")
-        print(f"  raw_target_institution: {raw_target_institution}")
-        print(f"  raw_major: {raw_major}")
-        print(f"  raw_year: {raw_year}")
-        
-        print(f"Processed parameters for ASSIST.org:")
-        print(f"  current_institution: {current_institution}")
-        print(f"  target_institution: {target_institution}")
-        print(f"  major: {major}")
-        print(f"  academic_year: {academic_year}")
-        print(f"  completed_courses: {completed_courses}")
-        
-        if not all([current_institution, target_institution, major]):
-            raise HTTPException(
-                status_code=400,
-                detail="Missing required parameters: current_institution, intended_transfer_institution, current_major"
-            )
-        
-        # Use the ASSIST scraper to get transfer requirements
-        print(f"Calling ASSIST scraper with:")
-        print(f"  academic_year: {academic_year}")
-        print(f"  institution: {current_institution}")
-        print(f"  target_institution: {target_institution}")
-        print(f"  major_filter: {major}")
-        
-        scraper_result = scrape_assist_data(
-            academic_year=academic_year,
-            institution=current_institution,
-            target_institution=target_institution,
-            major_filter=major
-        )
-        
-        print(f"Scraper result type: {type(scraper_result)}")
-        print(f"Scraper result: {scraper_result}")
-        
-        # Handle case where scraper returns None or fails
-        if scraper_result is None:
-            print("❌ Scraper returned None")
-            scraper_result = {"success": False, "error": "Scraper returned None", "data": {}}
-        
-        if not isinstance(scraper_result, dict):
-            print(f"❌ Scraper returned unexpected type: {type(scraper_result)}")
-            scraper_result = {"success": False, "error": f"Scraper returned {type(scraper_result)}", "data": {}}
-        
-        if not scraper_result.get("success", False):
-            error_msg = scraper_result.get("error", "Unknown scraping error")
-            print(f"❌ Scraper failed: {error_msg}")
-            
-            # Return error response - NO FALLBACK DATA
-            raise HTTPException(
-                status_code=503,
-                detail=f"Transfer analysis unavailable: ASSIST.org scraping failed - {error_msg}. Please try again later or check if the institution/major combination exists on ASSIST.org."
-            )
-        
-        # Process the scraped data
-        requirements_data = scraper_result.get("data", {})
-        print(f"Requirements data: {requirements_data}")
-        
-        # Now use AI to generate a course schedule based on the scraped data
-        print("🤖 Generating AI-powered course schedule...")
-        
-        # Prepare context for AI planning - USE ONLY REAL DATA
-        current_planning_quarter = request.get("current_planning_quarter")
-        target_transfer_quarter = request.get("target_transfer_quarter")
-        
-        # Validate required data
-        if not current_planning_quarter:
-            raise HTTPException(status_code=400, detail="current_planning_quarter is required")
-        if not target_transfer_quarter:
-            raise HTTPException(status_code=400, detail="target_transfer_quarter is required")
-        
-        # Extract year from target_transfer_quarter if it's a year string
-        transfer_year = None
-        if target_transfer_quarter and target_transfer_quarter.isdigit():
-            transfer_year = int(target_transfer_quarter)
-        
-        planning_context = {
-            "profile": {
-                "current_institution": current_institution,
-                "target_institution": target_institution,
-                "current_major": major,
-                "target_major": major,
-                "current_quarter": current_planning_quarter,
-                "current_year": transfer_year - 1 if transfer_year else None,  # Extract from transfer year
-                "transfer_quarter": target_transfer_quarter,
-                "transfer_year": transfer_year
-            },
-            "completed_courses": [
-                {
-                    "code": course.get("courseNumber", ""),
-                    "title": f"Course {course.get('courseNumber', '')}",
-                    "units": float(course.get("credits", 0)),  # No fallback to 3
-                    "grade": course.get("grade", ""),
-                    "quarter": "Previous",
-                    "year": transfer_year - 1 if transfer_year else None
-                }
-                for course in completed_courses if course.get("courseNumber")  # Only include courses with valid data
-            ],
-            "transfer_requirements": requirements_data,
-            "preferences": {
-                "units_per_quarter": request.get("units_per_quarter", 15),  # Get from request or reasonable default
-                "max_units_per_quarter": 18,
-                "min_units_per_quarter": 12
-            }
-        }
-        
-        print(f"Planning context: {planning_context}")
-        
-        # Import and use AI planning service
-        from app.services.ai_planning_service import AIPlanningService
-        ai_service = AIPlanningService()
-        
-        try:
-            # Generate AI schedule
-            ai_schedule = await ai_service.generate_quarter_schedule(planning_context)
-            print(f"AI Schedule generated: {ai_schedule}")
-            
-            # Format response to match what frontend expects
-            return ApiResponse(
-                success=True,
-                data={
-                    "academic_year": academic_year,
-                    "source_institution": current_institution,
-                    "target_institution": target_institution,
-                    "major": major,
-                    "target_requirements": requirements_data.get("target_requirements", []),
-                    "source_requirements": requirements_data.get("source_requirements", {}),
-                    "ai_schedule": ai_schedule,  # Add the AI-generated schedule
-                    "user_timeline": {
-                        "target_transfer_quarter": request.get("target_transfer_quarter"),
-                        "current_planning_quarter": request.get("current_planning_quarter")
-                    },
-                    "analysis_metadata": {
-                        "quarters_until_transfer": 2,
-                        "analysis_date": None,  # Use real date if needed
-                        "requirements_source": "ASSIST.org + AI Planning"
-                    }
-                },
-                message="Transfer requirements analyzed and AI schedule generated successfully"
-            )
-            
-        except Exception as ai_error:
-            print(f"❌ AI scheduling failed: {ai_error}")
-            # Fail with proper error - NO FALLBACK DATA
-            raise HTTPException(
-                status_code=503,
-                detail=f"AI schedule generation failed: {str(ai_error)}. ASSIST.org data was retrieved but schedule generation is unavailable."
-            )
-        
+        params = TransferAnalysisService.prepare_public_request(request)
+        data = await TransferAnalysisService().analyze_public(params)
+    except TransferAnalysisError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error analyzing transfer requirements: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+    return ApiResponse(
+        success=True,
+        data=data,
+        message="Transfer requirements analyzed and AI schedule generated successfully"
+    )
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/analyze-public/stream")
+async def stream_transfer_analysis_public(request: Dict[str, Any]):
+    """
+    Streaming variant of /analyze-public (Server-Sent Events).
+
+    Emits one event per stage as it happens - browser_leased, agreement_loaded,
+    major_selected, requirements_parsed (with the parsed requirements), planning,
+    schedule_preview (the solver's schedule, ahead of the AI one), schedule_course
+    (each AI-planned course as soon as the model has written it) and
+    schedule_ready - then a `result` event carrying the same payload as
+    /analyze-public, or an `error` event with the HTTP status it would have returned.
+    """
+    try:
+        params = TransferAnalysisService.prepare_public_request(request)
+    except TransferAnalysisError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+    events: asyncio.Queue = asyncio.Queue()
+    started = time.perf_counter()
+
+    def on_stage(stage: str, payload: Dict[str, Any]):
+        events.put_nowait(("stage", stage, payload))
+
+    async def run():
+        try:
+            data = await TransferAnalysisService().analyze_public(params, on_stage=on_stage)
+            events.put_nowait(("result", "result", data))
+        except TransferAnalysisError as e:
+            events.put_nowait(("error", "error", {"status_code": e.status_code, "detail": str(e)}))
+        except Exception as e:
+            events.put_nowait(("error", "error", {
+                "status_code": 500,
+                "detail": f"Error analyzing transfer requirements: {str(e)}"
+            }))
+
+    # Not cancelled if the client goes away: the scrape still fills the articulation cache
+    task = asyncio.create_task(run())
+
+    async def event_stream():
+        while True:
+            try:
+                kind, name, payload = await asyncio.wait_for(events.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"  # Keep proxies from closing an idle stream
+                continue
+            elapsed_ms = round((time.perf_counter() - started) * 1000)
+            if kind == "stage":
+                yield _sse_event(name, {"stage": name, "elapsed_ms": elapsed_ms, **payload})
+                continue
+            yield _sse_event(name, {"elapsed_ms": elapsed_ms, **payload} if kind == "error" else payload)
+            await task
+            return
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/jobs", response_model=ApiResponse[Dict[str, Any]], status_code=202)
+async def submit_transfer_analysis_job(request: Dict[str, Any]):
+    """
+    Queue an analyze-public request as a background job.
+    Poll GET /transfer/jobs/{job_id} for its stage and result; submitting the
+    same request again returns the existing job.
+    """
+    try:
+        job, queued = await AnalysisJobService().submit_public_analysis(request)
+    except TransferAnalysisError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+    except JobQueueUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return ApiResponse(
+        success=True,
+        data=public_job_view(job),
+        message="Transfer analysis queued" if queued else "Transfer analysis already submitted"
+    )
+
+@router.get("/jobs/{job_id}", response_model=ApiResponse[Dict[str, Any]])
+async def get_transfer_analysis_job(job_id: str):
+    """Get the status, current stage and (when finished) result of an analysis job"""
+    try:
+        job = await AnalysisJobService().get_job(job_id)
+    except JobQueueUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Analysis job not found or expired")
+
+    return ApiResponse(success=True, data=public_job_view(job))
@@ -0,0 +1,26 @@
+from celery import Celery
+
+from app.core.config import settings
+
+RUN_ANALYSIS_JOB_TASK = "transfer.run_analysis_job"
+
+celery_app = Celery(
+    "course_planning",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    include=["app.tasks.transfer_analysis"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    # Job status and results are persisted by AnalysisJobStore, not a Celery result backend
+    task_ignore_result=True,
+    # A job survives a worker crash: it is acknowledged only once it has finished
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Scrapes are long and browser-bound; don't let one worker hoard queued jobs
+    worker_prefetch_multiplier=1,
+    broker_connection_retry_on_startup=True,
+    # Fail a submit quickly instead of hanging the request when the broker is down
+    task_publish_retry_policy={"max_retries": 2, "interval_start": 0, "interval_step": 0.5, "interval_max": 1},
+)
@@ -22,6 +22,27 @@ class Settings(BaseSettings):
     
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    
+    # Scraped articulation cache (agreements change about once a year)
+    ARTICULATION_CACHE_ENABLED: bool = True
+    ARTICULATION_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    ARTICULATION_CACHE_MEMORY_ENTRIES: int = 256
+    
+    # Coalescing of identical concurrent scrapes across workers
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = 60.0
+    SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS: float = 180.0
+    
+    # Blocking scraper work runs on a dedicated executor ("thread" or "process")
+    SCRAPER_EXECUTOR_KIND: str = "thread"
+    SCRAPER_EXECUTOR_WORKERS: int = 4
+    SCRAPER_EXECUTOR_MAX_QUEUE: int = 32
+    
+    # Background transfer-analysis jobs (Celery workers pull from the broker; job state lives in Redis)
+    CELERY_BROKER_URL: Optional[str] = None  # Defaults to REDIS_URL
+    ANALYSIS_JOB_TTL_SECONDS: int = 24 * 60 * 60
+    ANALYSIS_JOB_HEARTBEAT_TTL_SECONDS: int = 60  # A running job whose worker hasn't checked in for this long has died
+    ANALYSIS_JOBS_INLINE: bool = False  # Run jobs inside the API process (local dev without a worker)
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -30,6 +51,22 @@ class Settings(BaseSettings):
     
     # AI Services
     PERPLEXITY_API_KEY: Optional[str] = None
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_BASE_URL: str = "https://api.perplexity.ai"
+    LLM_MODEL: str = "sonar-pro"
+    LLM_TIMEOUT_SECONDS: float = 45.0  # Deadline per schedule call, hedges included
+    LLM_MAX_RETRIES: int = 1
+    LLM_HEDGE_ENABLED: bool = False  # Duplicate a call still running past the observed p95 latency
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Calls observed before the p95 is trusted
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    LLM_PROMPT_REQUIREMENTS_TOKEN_BUDGET: int = 1200  # Tokens for the remaining-requirements section
+
+    # Schedule generation: "ai" (Perplexity) or "solver" (CP-SAT, offline)
+    SCHEDULE_ENGINE: str = "ai"
+    SCHEDULE_PREVIEW_ENABLED: bool = True  # Send a solver schedule ahead of the AI one
+    SCHEDULE_SOLVER_DETERMINISTIC_TIME_LIMIT: float = 2.0  # CP-SAT work units (roughly seconds), not wall-clock
+    SCHEDULE_CACHE_ENABLED: bool = True  # Reuse AI schedules for identical planning inputs
+    SCHEDULE_CACHE_TTL_SECONDS: int = 24 * 60 * 60
     
     # CORS
     BACKEND_CORS_ORIGINS: str = "http://localhost:3000,https://univio.ai,https://univio-frontend.onrender.com"
@@ -39,6 +76,35 @@ class Settings(BaseSettings):
     CHROME_DRIVER_PATH: str = "/usr/bin/chromedriver"
     HEADLESS_BROWSER: bool = True
     
+    # Warm Chrome driver pool for the ASSIST scraper (0 = size from available memory)
+    SCRAPER_POOL_SIZE: int = 2
+    SCRAPER_POOL_PREWARM: int = 1
+    SCRAPER_POOL_LEASE_TIMEOUT: float = 120.0
+    SCRAPER_DRIVER_MAX_USES: int = 25
+    SCRAPER_DRIVER_MAX_RSS_MB: int = 1024
+    
+    # Scraping browser only fetches from these hosts and resource types (comma-separated)
+    SCRAPER_BLOCK_REQUESTS: bool = True
+    SCRAPER_ALLOWED_HOSTS: str = "assist.org,*.assist.org"
+    SCRAPER_ALLOWED_RESOURCE_TYPES: str = "Document,Script,XHR,Fetch,Stylesheet"
+    
+    # ASSIST.org scraper backend: "http" (JSON API, no browser) or "selenium"
+    ASSIST_SCRAPER_BACKEND: str = "http"
+    ASSIST_HTTP_FALLBACK_TO_SELENIUM: bool = True
+    ASSIST_API_BASE_URL: str = "https://assist.org/api"
+    ASSIST_HTTP_TIMEOUT: float = 10.0
+    ASSIST_HTTP_MAX_CONNECTIONS: int = 10
+    
+    # Selenium loads agreement pages by URL using ASSIST IDs resolved through the JSON API
+    ASSIST_DEEP_LINK_ENABLED: bool = True
+    ASSIST_ID_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    ASSIST_ID_REFRESH_SECONDS: int = 24 * 60 * 60
+    
+    # Local catalog of ASSIST institutions, agreements and majors used to resolve and validate requests
+    ASSIST_CATALOG_ENABLED: bool = True
+    ASSIST_CATALOG_PATH: str = "./data/assist_catalog.json"
+    ASSIST_CATALOG_REFRESH_SECONDS: int = 7 * 24 * 60 * 60
+    
     def get_database_url(self) -> str:
         """
         Get database URL - Use Supabase PostgreSQL for production, SQLite for local dev
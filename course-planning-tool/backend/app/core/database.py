@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
@@ -58,8 +59,50 @@ engine = create_database_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def async_database_url(url: str) -> str:
+    """The same database through its asyncio driver (asyncpg / aiosqlite)"""
+    if url.startswith('postgresql://') or url.startswith('postgresql+psycopg2://'):
+        return 'postgresql+asyncpg://' + url.split('://', 1)[1]
+    if url.startswith('sqlite://'):
+        return 'sqlite+aiosqlite://' + url.split('://', 1)[1]
+    return url
+
+def create_async_database_engine(url: str):
+    """
+    Async engine for the API routes. It connects lazily, so unlike the sync
+    engine there is no connection test here.
+    """
+    if url.startswith('postgresql'):
+        return create_async_engine(
+            url,
+            pool_size=5,
+            max_overflow=10,
+            pool_pre_ping=True,
+            pool_recycle=300,
+            echo=False,
+            connect_args={
+                "server_settings": {"timezone": "utc"},
+                # Supabase's pooler (pgbouncer, transaction mode) can't keep asyncpg's prepared statements
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+            }
+        )
+    return create_async_engine(url)
+
+# The sync engine above serves scripts (create_demo_user.py, ...) and the remaining sync routes;
+# async routes use this one so queries don't block the event loop
+async_engine = create_async_database_engine(async_database_url(DATABASE_URL))
+
+# Objects stay loaded after commit: async sessions can't lazy-load expired attributes
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+async def get_async_db():
+    """Async database session dependency for FastAPI"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def get_db():
     """Database session dependency for FastAPI"""
     try:
@@ -80,4 +123,38 @@ async def create_tables():
         logger.info("✅ Database tables created/verified")
     except Exception as e:
         logger.error(f"❌ Failed to create tables: {e}")
-        raise 
\ No newline at end of file
+        raise 
+
+# Courses created before (code, institution) was unique can hold duplicates, and create_all
+# doesn't add constraints to existing tables. Keep each key's oldest row, move enrollments onto
+# it, then add the index the bulk course upsert (services/course_store.py) conflicts on.
+_REPOINT_DUPLICATE_ENROLLMENTS = """
+    UPDATE enrolled_courses SET course_id = (
+        SELECT MIN(kept.id) FROM courses AS duplicate
+        JOIN courses AS kept ON kept.code = duplicate.code AND kept.institution = duplicate.institution
+        WHERE duplicate.id = enrolled_courses.course_id
+    )
+    WHERE course_id NOT IN (SELECT MIN(id) FROM courses GROUP BY code, institution)
+"""
+_DELETE_DUPLICATE_COURSES = "DELETE FROM courses WHERE id NOT IN (SELECT MIN(id) FROM courses GROUP BY code, institution)"
+_CREATE_COURSE_KEY_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS uq_courses_code_institution ON courses (code, institution)"
+
+def _migrate_course_key(conn) -> bool:
+    inspector = inspect(conn)
+    if not inspector.has_table("courses"):
+        return False  # create_all builds the table with its constraint
+    names = {index["name"] for index in inspector.get_indexes("courses")}
+    names |= {constraint["name"] for constraint in inspector.get_unique_constraints("courses")}
+    if "uq_courses_code_institution" in names:
+        return False
+    if inspector.has_table("enrolled_courses"):
+        conn.execute(text(_REPOINT_DUPLICATE_ENROLLMENTS))
+    conn.execute(text(_DELETE_DUPLICATE_COURSES))
+    conn.execute(text(_CREATE_COURSE_KEY_INDEX))
+    return True
+
+async def ensure_course_key_index(engine=None):
+    """Idempotently dedupe courses by (code, institution) and add their unique index"""
+    async with (engine or async_engine).begin() as conn:
+        if await conn.run_sync(_migrate_course_key):
+            logger.info("✅ Courses deduplicated and unique on (code, institution)")
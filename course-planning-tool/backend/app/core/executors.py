@@ -0,0 +1,159 @@
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class ExecutorSaturated(Exception):
+    """Raised when an executor's queue is full and new work is turned away"""
+
+
+def _timed_call(submitted_at: float, fn: Callable, args: tuple, kwargs: dict):
+    # Runs in the worker (thread or process); reports how long the task sat in the queue
+    queue_wait = time.time() - submitted_at
+    return queue_wait, fn(*args, **kwargs)
+
+
+class BoundedExecutor:
+    """
+    Thread or process pool for blocking work, with a hard cap on queued tasks.
+
+    `max_workers` tasks run at once and up to `max_queue` more wait; beyond
+    that `run` fails fast with ExecutorSaturated instead of piling up work.
+    """
+
+    def __init__(self, name: str, kind: str, max_workers: int, max_queue: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        if kind == "process":
+            # spawn: forking a process that holds Chrome/driver threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def is_process_pool(self) -> bool:
+        return self.kind == "process"
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                metrics.inc(f"executor.{self.name}.rejected")
+                raise ExecutorSaturated(
+                    f"{self.name} executor is saturated ({self._pending} tasks pending); try again shortly"
+                )
+            self._pending += 1
+            self._publish_depth()
+
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            queue_wait, result = await loop.run_in_executor(
+                self._executor,
+                functools.partial(_timed_call, time.time(), fn, args, kwargs)
+            )
+            metrics.observe(f"executor.{self.name}.queue_wait_seconds", queue_wait)
+            return result
+        finally:
+            metrics.observe(f"executor.{self.name}.total_seconds", time.perf_counter() - started)
+            with self._lock:
+                self._pending -= 1
+                self._publish_depth()
+
+    def _publish_depth(self) -> None:
+        metrics.set_gauge(f"executor.{self.name}.pending", self._pending)
+        metrics.set_gauge(f"executor.{self.name}.queue_depth", max(0, self._pending - self.max_workers))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight async calls (e.g. LLM requests) and tracks how many are waiting"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = max(1, limit)
+        # asyncio primitives are bound to one loop; Celery workers run their own loops
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._waiting = 0
+        self._in_flight = 0
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+        return semaphore
+
+    def has_free_slot(self) -> bool:
+        """Whether a call entering `slot()` now would start without queueing"""
+        return not self._semaphore().locked()
+
+    @asynccontextmanager
+    async def slot(self):
+        self._waiting += 1
+        metrics.set_gauge(f"limiter.{self.name}.queue_depth", self._waiting)
+        started = time.perf_counter()
+        try:
+            await self._semaphore().acquire()
+        finally:
+            self._waiting -= 1
+            metrics.set_gauge(f"limiter.{self.name}.queue_depth", self._waiting)
+        metrics.observe(f"limiter.{self.name}.queue_wait_seconds", time.perf_counter() - started)
+
+        self._in_flight += 1
+        metrics.set_gauge(f"limiter.{self.name}.in_flight", self._in_flight)
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            metrics.set_gauge(f"limiter.{self.name}.in_flight", self._in_flight)
+            self._semaphore().release()
+
+
+_scraper_executor: Optional[BoundedExecutor] = None
+_scraper_executor_lock = threading.Lock()
+
+
+def get_scraper_executor() -> BoundedExecutor:
+    """Dedicated executor for blocking ASSIST scrapes, configured from settings"""
+    global _scraper_executor
+    if _scraper_executor is None:
+        with _scraper_executor_lock:
+            if _scraper_executor is None:
+                _scraper_executor = BoundedExecutor(
+                    name="scraper",
+                    kind=settings.SCRAPER_EXECUTOR_KIND,
+                    max_workers=settings.SCRAPER_EXECUTOR_WORKERS,
+                    max_queue=settings.SCRAPER_EXECUTOR_MAX_QUEUE,
+                )
+    return _scraper_executor
+
+
+def shutdown_executors() -> None:
+    global _scraper_executor
+    with _scraper_executor_lock:
+        executor, _scraper_executor = _scraper_executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+llm_limiter = ConcurrencyLimiter("llm", settings.LLM_MAX_CONCURRENCY)
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Optional
+
+import redis
+import redis.asyncio as redis_async
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# After a failed connection, skip Redis for this long instead of timing out on every call
+_RETRY_AFTER_SECONDS = 30
+
+_client: Optional[redis.Redis] = None
+_unavailable_until = 0.0
+_lock = threading.Lock()
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Shared Redis client, or None while Redis is unreachable"""
+    global _client, _unavailable_until
+    if _client is not None:
+        return _client
+    if time.monotonic() < _unavailable_until:
+        return None
+
+    with _lock:
+        if _client is not None:
+            return _client
+        try:
+            client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            )
+            client.ping()
+            _client = client
+            logger.info("✅ Redis connection successful")
+        except redis.RedisError as e:
+            _unavailable_until = time.monotonic() + _RETRY_AFTER_SECONDS
+            logger.warning(f"⚠️ Redis unavailable, continuing without it: {e}")
+    return _client
+
+
+def mark_redis_unavailable() -> None:
+    """Drop the shared client after an operational error so the next call reconnects later"""
+    global _client, _unavailable_until
+    with _lock:
+        _client = None
+        _unavailable_until = time.monotonic() + _RETRY_AFTER_SECONDS
+
+
+_async_clients = weakref.WeakKeyDictionary()
+_async_unavailable_until = 0.0
+
+
+async def get_async_redis() -> Optional[redis_async.Redis]:
+    """asyncio Redis client for the running event loop, or None while Redis is unreachable"""
+    global _async_unavailable_until
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is not None:
+        return client
+    if time.monotonic() < _async_unavailable_until:
+        return None
+
+    client = redis_async.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+    try:
+        await client.ping()
+    except redis.RedisError as e:
+        _async_unavailable_until = time.monotonic() + _RETRY_AFTER_SECONDS
+        logger.warning(f"⚠️ Redis unavailable, continuing without it: {e}")
+        await client.close()
+        return None
+    _async_clients[loop] = client
+    return client
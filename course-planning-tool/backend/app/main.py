@@ -2,11 +2,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import threading
 
 from app.api.api import api_router
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import async_engine, create_tables, ensure_course_key_index
+from app.core.executors import shutdown_executors
 from app.core.logging import setup_logging
+from app.scrapers.assist_catalog import assist_catalog
+from app.scrapers.driver_pool import get_driver_pool, shutdown_driver_pool
+from app.services.llm_client import llm_client
 
 # Setup logging
 setup_logging()
@@ -26,9 +32,27 @@ async def lifespan(app: FastAPI):
     #     logger.error(f"❌ Failed to create database tables during startup: {e}")
     #     logger.warning("⚠️ Application will start but database features may not work")
     
+    # Existing databases predate the unique course key that course upserts rely on
+    try:
+        await ensure_course_key_index()
+    except Exception as e:
+        logger.error(f"❌ Failed to add the unique course index: {e}")
+    
+    # Read the ASSIST catalog file now rather than on the event loop in the first request
+    if settings.ASSIST_CATALOG_ENABLED:
+        await asyncio.to_thread(assist_catalog.load)
+    
+    # Launch scraper browsers in the background so startup isn't blocked on Chrome
+    if settings.SCRAPER_POOL_PREWARM > 0:
+        pool = get_driver_pool()
+        threading.Thread(target=pool.prewarm, args=(settings.SCRAPER_POOL_PREWARM,), daemon=True).start()
+    
     yield
     # Shutdown
-    pass
+    await llm_client.close()
+    await async_engine.dispose()
+    shutdown_executors()
+    shutdown_driver_pool()
 
 # Create FastAPI application
 app = FastAPI(
@@ -1,9 +1,11 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, Float, JSON, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Course(Base):
     __tablename__ = "courses"
+    # Bulk course upserts (services/course_store.py) target this as their ON CONFLICT key
+    __table_args__ = (UniqueConstraint("code", "institution", name="uq_courses_code_institution"),)
     
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String, nullable=False, index=True)  # e.g., "MATH 1A"
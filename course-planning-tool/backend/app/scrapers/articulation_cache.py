@@ -0,0 +1,173 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_async_redis, get_redis, mark_redis_unavailable
+from app.scrapers.articulation_model import Agreement, decode_agreement, encode_agreement
+
+CACHE_KEY_PREFIX = "assist:articulation:v2"
+
+
+def normalize_key_part(value: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so spelling variants share a key"""
+    value = re.sub(r"[^\w\s]", " ", str(value or "").lower())
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def normalize_academic_year(academic_year: str) -> str:
+    """'2024-25', '2024 - 2025' and '2024' all become '2024-2025'"""
+    match = re.match(r"\s*(\d{4})", str(academic_year or ""))
+    if not match:
+        return normalize_key_part(academic_year)
+    fall_year = int(match.group(1))
+    return f"{fall_year}-{fall_year + 1}"
+
+
+def articulation_cache_key(academic_year: str, institution: str, target_institution: str, major: str) -> str:
+    return "|".join([
+        CACHE_KEY_PREFIX,
+        normalize_academic_year(academic_year),
+        normalize_key_part(institution),
+        normalize_key_part(target_institution),
+        normalize_key_part(major),
+    ])
+
+
+class ArticulationCache:
+    """
+    Two-tier cache for scraped articulation data.
+
+    An in-process LRU answers repeat lookups without a network hop; Redis
+    shares results across workers and survives restarts. Entries are stored
+    in the compact agreement encoding, so callers always get their own copy.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        agreement = self.get_agreement(key)
+        return agreement.to_dict() if agreement is not None else None
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        agreement = await self.get_agreement_async(key)
+        return agreement.to_dict() if agreement is not None else None
+
+    def get_agreement(self, key: str) -> Optional[Agreement]:
+        payload = self._memory_get(key)
+        if payload is not None:
+            metrics.inc("articulation_cache.hits.memory")
+            return decode_agreement(payload)
+
+        client = get_redis()
+        if client is not None:
+            try:
+                payload = client.get(key)
+            except redis.RedisError:
+                mark_redis_unavailable()
+                metrics.inc("articulation_cache.errors")
+                payload = None
+            if payload is not None:
+                metrics.inc("articulation_cache.hits.redis")
+                self._memory_set(key, payload)
+                return decode_agreement(payload)
+
+        metrics.inc("articulation_cache.misses")
+        return None
+
+    async def get_agreement_async(self, key: str) -> Optional[Agreement]:
+        """`get_agreement` for code on the event loop: Redis is read with the asyncio client"""
+        payload = self._memory_get(key)
+        if payload is not None:
+            metrics.inc("articulation_cache.hits.memory")
+            return decode_agreement(payload)
+
+        client = await get_async_redis()
+        if client is not None:
+            try:
+                payload = await client.get(key)
+            except redis.RedisError:
+                metrics.inc("articulation_cache.errors")
+                payload = None
+            if payload is not None:
+                metrics.inc("articulation_cache.hits.redis")
+                self._memory_set(key, payload)
+                return decode_agreement(payload)
+
+        metrics.inc("articulation_cache.misses")
+        return None
+
+    def set(self, key: str, data: Dict[str, Any], remote: bool = True) -> None:
+        payload = encode_agreement(Agreement.from_dict(data))
+        self._memory_set(key, payload)
+        metrics.inc("articulation_cache.stores")
+
+        client = get_redis() if remote else None
+        if client is not None:
+            try:
+                client.set(key, payload, ex=self.ttl_seconds)
+            except redis.RedisError:
+                mark_redis_unavailable()
+                metrics.inc("articulation_cache.errors")
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(key)
+            except redis.RedisError:
+                mark_redis_unavailable()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = (metrics.counter("articulation_cache.hits.memory") +
+                metrics.counter("articulation_cache.hits.redis"))
+        misses = metrics.counter("articulation_cache.misses")
+        with self._lock:
+            entries = len(self._memory)
+        return {
+            "memory_entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits_memory": metrics.counter("articulation_cache.hits.memory"),
+            "hits_redis": metrics.counter("articulation_cache.hits.redis"),
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+
+    def _memory_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return payload
+
+    def _memory_set(self, key: str, payload: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl_seconds, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+articulation_cache = ArticulationCache(
+    max_entries=settings.ARTICULATION_CACHE_MEMORY_ENTRIES,
+    ttl_seconds=settings.ARTICULATION_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,298 @@
+"""
+Typed in-memory model for one ASSIST articulation agreement.
+
+Scrapers still produce the nested dict layout the API returns
+(`target_requirements` / `source_requirements`); `Agreement.from_dict`
+parses it once, with units as floats and course codes interned, and
+`to_dict` renders it back unchanged. `encode_agreement` / `decode_agreement`
+store an agreement compactly: every distinct course is written once and
+referenced by position, as msgpack when it is installed, otherwise JSON.
+"""
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # JSON encoding still works without it
+    msgpack = None
+
+NO_COURSE_CODE = 'NO_COURSE'
+
+COMPACT_VERSION = 1
+
+_UNITS_NUMBER = re.compile(r'(\d+(?:\.\d+)?)')
+
+
+@lru_cache(maxsize=256)
+def parse_units(units_text: str) -> Optional[float]:
+    """'4.00 units' -> 4.0; '' or unparseable -> None"""
+    match = _UNITS_NUMBER.search(units_text or '')
+    return float(match.group(1)) if match else None
+
+
+def format_units(units: Optional[float]) -> str:
+    return f"{units:.2f} units" if units is not None else ''
+
+
+@dataclass(frozen=True, slots=True)
+class CourseRef:
+    code: str
+    title: str
+    units: Optional[float] = None
+    # Only set when the scraped units text isn't the canonical "4.00 units" form
+    units_text: Optional[str] = None
+    kind: Optional[str] = None  # 'receiving' on target-side courses that carry a type
+
+    @classmethod
+    def from_dict(cls, course: Dict[str, Any]) -> "CourseRef":
+        text = course.get('units') or ''
+        units = parse_units(text) if isinstance(text, str) else float(text)
+        if isinstance(text, str) and text != format_units(units):
+            raw = text
+        else:
+            raw = None
+        return cls(
+            code=sys.intern(course.get('code') or ''),
+            title=course.get('title') or '',
+            units=units,
+            units_text=raw,
+            kind=course.get('type')
+        )
+
+    @property
+    def is_no_course(self) -> bool:
+        return self.code == NO_COURSE_CODE
+
+    @property
+    def units_label(self) -> str:
+        return self.units_text if self.units_text is not None else format_units(self.units)
+
+    def to_dict(self) -> Dict[str, Any]:
+        course = {'code': self.code, 'title': self.title, 'units': self.units_label}
+        if self.kind is not None:
+            course['type'] = self.kind
+        return course
+
+
+@dataclass(slots=True)
+class RequirementOption:
+    """One lettered option of a choice group; all of its courses are required"""
+    letter: str
+    courses: List[CourseRef]
+
+
+@dataclass(slots=True)
+class RequirementGroup:
+    """
+    A numbered requirement on the receiving side.
+
+    structure is 'sequence' (take every course), 'choice' (complete one
+    option) or 'recommended' (a HIGHLY RECOMMENDED block of choice groups).
+    """
+    number: str
+    title: str
+    structure: str
+    courses: Optional[List[CourseRef]] = None
+    options: Optional[List[RequirementOption]] = None
+    subsections: Optional[List["RequirementGroup"]] = None
+
+    @classmethod
+    def from_dict(cls, section: Dict[str, Any]) -> "RequirementGroup":
+        courses = section.get('courses')
+        options = section.get('options')
+        subsections = section.get('subsections')
+        return cls(
+            number=str(section.get('number', '')),
+            title=section.get('title') or '',
+            structure=section.get('structure') or '',
+            courses=[CourseRef.from_dict(c) for c in courses] if courses is not None else None,
+            options=[
+                RequirementOption(o.get('letter') or '', [CourseRef.from_dict(c) for c in o.get('courses', [])])
+                for o in options
+            ] if options is not None else None,
+            subsections=[cls.from_dict(s) for s in subsections] if subsections is not None else None
+        )
+
+    def receiving_courses(self) -> Iterator[CourseRef]:
+        for course in self.courses or ():
+            yield course
+        for option in self.options or ():
+            yield from option.courses
+        for subsection in self.subsections or ():
+            yield from subsection.receiving_courses()
+
+    def to_dict(self) -> Dict[str, Any]:
+        section: Dict[str, Any] = {'number': self.number, 'title': self.title}
+        if self.courses is not None:
+            section['courses'] = [c.to_dict() for c in self.courses]
+        if self.options is not None:
+            section['options'] = [
+                {'letter': o.letter, 'courses': [c.to_dict() for c in o.courses]} for o in self.options
+            ]
+        if self.subsections is not None:
+            section['subsections'] = [s.to_dict() for s in self.subsections]
+        section['structure'] = self.structure
+        return section
+
+
+# OR of AND-groups of sending-side courses
+SendingOptions = List[Tuple[CourseRef, ...]]
+
+
+@dataclass(slots=True)
+class Agreement:
+    """One major's articulation agreement between a sending and a receiving institution"""
+    groups: List[RequirementGroup]
+    # Receiving course code -> the sending-side course groups that satisfy it
+    articulations: Dict[str, SendingOptions]
+    academic_year: Optional[str] = None
+    source_institution: Optional[str] = None
+    target_institution: Optional[str] = None
+    major: Optional[str] = None
+    _courses: Optional[List[CourseRef]] = field(default=None, repr=False, compare=False)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Agreement":
+        """Parse the scraper's result data (target_requirements / source_requirements)"""
+        return cls(
+            groups=[RequirementGroup.from_dict(s) for s in data.get('target_requirements') or []],
+            articulations={
+                sys.intern(code): [tuple(CourseRef.from_dict(c) for c in group) for group in groups]
+                for code, groups in (data.get('source_requirements') or {}).items()
+            },
+            academic_year=data.get('academic_year'),
+            source_institution=data.get('source_institution'),
+            target_institution=data.get('target_institution'),
+            major=data.get('major')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key in ('academic_year', 'source_institution', 'target_institution', 'major'):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        data['target_requirements'] = [g.to_dict() for g in self.groups]
+        data['source_requirements'] = {
+            code: [[c.to_dict() for c in group] for group in groups]
+            for code, groups in self.articulations.items()
+        }
+        return data
+
+    def receiving_courses(self) -> Iterator[CourseRef]:
+        for group in self.groups:
+            yield from group.receiving_courses()
+
+    def sending_courses(self) -> List[CourseRef]:
+        """Distinct sending-side courses (NO_COURSE included), in agreement order"""
+        if self._courses is None:
+            seen = {}
+            for groups in self.articulations.values():
+                for group in groups:
+                    for course in group:
+                        if course.code:
+                            seen.setdefault(course.code, course)
+            self._courses = list(seen.values())
+        return self._courses
+
+
+# ---------------------------------------------------------------------------
+# Compact encoding
+# ---------------------------------------------------------------------------
+
+def _course_row(course: CourseRef) -> list:
+    row = [course.code, course.title, course.units, course.units_text, course.kind]
+    while len(row) > 2 and row[-1] is None:
+        row.pop()
+    return row
+
+
+def to_compact(agreement: Agreement) -> list:
+    """Nested lists with a shared course table; see from_compact for the layout"""
+    table: List[list] = []
+    positions: Dict[CourseRef, int] = {}
+
+    def ref(course: CourseRef) -> int:
+        position = positions.get(course)
+        if position is None:
+            position = positions[course] = len(table)
+            table.append(_course_row(course))
+        return position
+
+    def group_row(group: RequirementGroup) -> list:
+        return [
+            group.number,
+            group.title,
+            group.structure,
+            [ref(c) for c in group.courses] if group.courses is not None else None,
+            [[o.letter, [ref(c) for c in o.courses]] for o in group.options] if group.options is not None else None,
+            [group_row(s) for s in group.subsections] if group.subsections is not None else None,
+        ]
+
+    groups = [group_row(g) for g in agreement.groups]
+    articulations = [
+        [code, [[ref(c) for c in group] for group in options]]
+        for code, options in agreement.articulations.items()
+    ]
+    return [
+        COMPACT_VERSION,
+        [agreement.academic_year, agreement.source_institution, agreement.target_institution, agreement.major],
+        table,
+        groups,
+        articulations,
+    ]
+
+
+def from_compact(compact: list) -> Agreement:
+    version, meta, table, groups, articulations = compact
+    if version != COMPACT_VERSION:
+        raise ValueError(f"Unsupported compact agreement version: {version}")
+    courses = [
+        CourseRef(sys.intern(row[0]), row[1], *row[2:])
+        for row in table
+    ]
+
+    def group(row: list) -> RequirementGroup:
+        number, title, structure, course_refs, options, subsections = row
+        return RequirementGroup(
+            number=number,
+            title=title,
+            structure=structure,
+            courses=[courses[i] for i in course_refs] if course_refs is not None else None,
+            options=[RequirementOption(letter, [courses[i] for i in refs]) for letter, refs in options]
+            if options is not None else None,
+            subsections=[group(s) for s in subsections] if subsections is not None else None
+        )
+
+    academic_year, source_institution, target_institution, major = meta
+    return Agreement(
+        groups=[group(g) for g in groups],
+        articulations={
+            sys.intern(code): [tuple(courses[i] for i in refs) for refs in options]
+            for code, options in articulations
+        },
+        academic_year=academic_year,
+        source_institution=source_institution,
+        target_institution=target_institution,
+        major=major
+    )
+
+
+def encode_agreement(agreement: Agreement) -> bytes:
+    compact = to_compact(agreement)
+    if msgpack is not None:
+        return msgpack.packb(compact, use_bin_type=True)
+    return json.dumps(compact, separators=(",", ":")).encode()
+
+
+def decode_agreement(payload: bytes) -> Agreement:
+    # A JSON payload is always an array; msgpack's fixarray header never encodes to '['
+    if payload[:1] == b'[':
+        return from_compact(json.loads(payload))
+    if msgpack is None:
+        raise ValueError("msgpack-encoded agreement but msgpack is not installed")
+    return from_compact(msgpack.unpackb(payload, raw=False))
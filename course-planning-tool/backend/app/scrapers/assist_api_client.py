@@ -0,0 +1,417 @@
+import json
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+
+
+class AssistApiError(Exception):
+    """Raised when the ASSIST.org JSON API can't answer a lookup"""
+
+
+def _parse_embedded_json(value: Any) -> Any:
+    # The articulation endpoint returns several fields as JSON-encoded strings
+    if isinstance(value, str):
+        return json.loads(value) if value else []
+    return value or []
+
+
+def _fall_year(academic_year: str) -> int:
+    """'2024-2025' or '2024-25' -> 2024"""
+    match = re.match(r'\s*(\d{4})', str(academic_year))
+    if not match:
+        raise AssistApiError(f"Unrecognized academic year: {academic_year}")
+    return int(match.group(1))
+
+
+def _unique_name_match(name: str, candidates: List[Tuple[str, int]], not_found: str) -> int:
+    """
+    ID of the candidate named `name`. Without an exact name, a partial match
+    must point at a single ID: names containing `name` as whole words rank
+    above names merely containing it, and a tie between IDs is rejected
+    rather than resolved by list order.
+    """
+    wanted = name.strip().lower()
+    whole_words = re.compile(rf'(?<!\w){re.escape(wanted)}(?!\w)')
+    ranked: Dict[int, Dict[int, str]] = {}
+    for candidate, candidate_id in candidates:
+        lowered = candidate.lower()
+        if lowered == wanted:
+            return candidate_id
+        if wanted and wanted in lowered:
+            rank = 0 if whole_words.search(lowered) else 1
+            ranked.setdefault(rank, {}).setdefault(candidate_id, candidate)
+    if not ranked:
+        raise AssistApiError(not_found)
+    matches = ranked[min(ranked)]
+    if len(matches) > 1:
+        raise AssistApiError(f"'{name}' is ambiguous on ASSIST.org: {', '.join(sorted(matches.values()))}")
+    return next(iter(matches))
+
+
+def major_label_index(labels: List[str], major: str) -> Optional[int]:
+    """
+    Position of the label that is `major` (ignoring case), else of the first
+    containing it - the "Filter Major List" box's semantics. The exact label
+    wins so "Mathematics, B.A." doesn't land on "Applied Mathematics, B.A.".
+    """
+    wanted = major.strip().lower()
+    lowered = [label.strip().lower() for label in labels]
+    if wanted in lowered:
+        return lowered.index(wanted)
+    return next((index for index, label in enumerate(lowered) if wanted in label), None)
+
+
+def _format_units(course: Dict[str, Any]) -> str:
+    units = course.get('minUnits')
+    if units is None:
+        units = course.get('maxUnits')
+    if units is None:
+        return ''
+    return f"{float(units):.2f} units"
+
+
+def _course_entry(course: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        'code': f"{course.get('prefix', '').strip()} {course.get('courseNumber', '').strip()}".strip(),
+        'title': (course.get('courseTitle') or '').strip(),
+        'units': _format_units(course)
+    }
+
+
+def _cell_courses(cell: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Receiving-side courses in a template cell (single course or an AND series)"""
+    if cell.get('type') == 'Course' and cell.get('course'):
+        return [cell['course']]
+    if cell.get('type') == 'Series' and cell.get('series'):
+        return list(cell['series'].get('courses', []))
+    return []
+
+
+def _is_highly_recommended(asset: Dict[str, Any]) -> bool:
+    content = re.sub(r'<[^>]+>', '', asset.get('content') or '')
+    return 'HIGHLY RECOMMENDED' in content.upper()
+
+
+def _sending_groups(articulation: Optional[Dict[str, Any]]) -> List[List[Dict[str, str]]]:
+    """OR-groups of source courses; each group is an AND of courses"""
+    no_course = [[{
+        'code': 'NO_COURSE',
+        'title': 'No Course Articulated',
+        'units': ''
+    }]]
+    if not articulation:
+        return no_course
+
+    sending = articulation.get('sendingArticulation') or {}
+    groups = []
+    for item in sorted(sending.get('items') or [], key=lambda i: i.get('position', 0)):
+        if item.get('type') == 'Course':
+            courses = [item]
+        else:
+            courses = sorted(item.get('items') or [], key=lambda c: c.get('position', 0))
+        group = [_course_entry(course) for course in courses if course.get('prefix')]
+        if group:
+            groups.append(group)
+    return groups or no_course
+
+
+def articulation_to_requirements(result: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str, List]]:
+    """
+    Map an ASSIST articulation agreement into the scraper's
+    (target_requirements, source_requirements) structure.
+    """
+    template_assets = sorted(_parse_embedded_json(result.get('templateAssets')), key=lambda a: a.get('position', 0))
+    articulations = _parse_embedded_json(result.get('articulations'))
+    by_cell = {a.get('templateCellId'): a.get('articulation') for a in articulations}
+
+    sections = []
+    source_requirements: Dict[str, List] = {}
+    recommended = None
+    group_number = 0
+
+    for asset in template_assets:
+        asset_type = asset.get('type')
+        if asset_type == 'RequirementTitle':
+            # A HIGHLY RECOMMENDED title collects the groups that follow it
+            if _is_highly_recommended(asset):
+                recommended = {
+                    'number': 'HIGHLY_RECOMMENDED',
+                    'title': 'Highly Recommended',
+                    'subsections': [],
+                    'structure': 'recommended'
+                }
+                sections.append(recommended)
+            else:
+                recommended = None
+            continue
+        if asset_type != 'RequirementGroup':
+            continue
+
+        group_number += 1
+        options = []
+        for group_section in sorted(asset.get('sections', []), key=lambda s: s.get('position', 0)):
+            courses = []
+            for row in sorted(group_section.get('rows', []), key=lambda r: r.get('position', 0)):
+                for cell in sorted(row.get('cells', []), key=lambda c: c.get('position', 0)):
+                    receiving = _cell_courses(cell)
+                    if not receiving:
+                        continue
+                    for course in receiving:
+                        courses.append(_course_entry(course))
+                    key = _course_entry(receiving[0])['code']
+                    if key not in source_requirements:
+                        source_requirements[key] = _sending_groups(by_cell.get(cell.get('id')))
+            if courses:
+                options.append(courses)
+
+        if not options:
+            continue
+
+        letters = [chr(ord('A') + i) for i in range(len(options))]
+        if recommended is not None:
+            recommended['subsections'].append({
+                'number': str(group_number),
+                'title': ' or '.join(letters),
+                'options': [
+                    {'letter': letter, 'courses': [dict(course, type='receiving') for course in courses]}
+                    for letter, courses in zip(letters, options)
+                ],
+                'structure': 'choice'
+            })
+        elif len(options) == 1:
+            sections.append({
+                'number': str(group_number),
+                'title': 'Complete the following',
+                'courses': [dict(course, type='receiving') for course in options[0]],
+                'structure': 'sequence'
+            })
+        else:
+            sections.append({
+                'number': str(group_number),
+                'title': f"Complete {' or '.join(letters)}",
+                'options': [
+                    {'letter': letter, 'courses': courses}
+                    for letter, courses in zip(letters, options)
+                ],
+                'structure': 'choice'
+            })
+
+    # Drop a HIGHLY RECOMMENDED header that never received a group
+    sections = [s for s in sections if s.get('structure') != 'recommended' or s['subsections']]
+    return sections, source_requirements
+
+
+class AssistApiClient:
+    """
+    Browserless ASSIST.org client.
+
+    Resolves year, institution and agreement IDs through the same JSON
+    endpoints the ASSIST Angular app calls, then fetches the articulation
+    report directly over a pooled keep-alive connection.
+    """
+
+    _LOOKUP_TTL_SECONDS = 6 * 60 * 60
+
+    def __init__(self, base_url: Optional[str] = None, timeout: Optional[float] = None, client: Optional[httpx.Client] = None):
+        self.base_url = (base_url or settings.ASSIST_API_BASE_URL).rstrip('/')
+        self._client = client or httpx.Client(
+            base_url=self.base_url,
+            timeout=timeout or settings.ASSIST_HTTP_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.ASSIST_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ASSIST_HTTP_MAX_CONNECTIONS
+            ),
+            headers={'Accept': 'application/json', 'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'},
+            follow_redirects=True
+        )
+        self._lookups: Dict[str, Tuple[float, Any]] = {}
+        self._lookups_lock = threading.Lock()
+
+    def close(self) -> None:
+        self._client.close()
+
+    def _get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        try:
+            response = self._client.get(path, params=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPError as e:
+            raise AssistApiError(f"ASSIST API request {path} failed: {e}")
+        except ValueError as e:
+            raise AssistApiError(f"ASSIST API returned invalid JSON for {path}: {e}")
+
+    def _get_cached(self, cache_key: str, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        # Years, institutions and agreement lists change rarely; keep them briefly in-process
+        now = time.monotonic()
+        with self._lookups_lock:
+            cached = self._lookups.get(cache_key)
+            if cached and now - cached[0] < self._LOOKUP_TTL_SECONDS:
+                return cached[1]
+        value = self._get_json(path, params)
+        with self._lookups_lock:
+            self._lookups[cache_key] = (now, value)
+        return value
+
+    def get_academic_years(self) -> List[Dict[str, Any]]:
+        return self._get_cached('years', '/AcademicYears')
+
+    def get_institutions(self) -> List[Dict[str, Any]]:
+        return self._get_cached('institutions', '/institutions')
+
+    def get_agreement_institutions(self, institution_id: int) -> List[Dict[str, Any]]:
+        return self._get_cached(f'agreements:{institution_id}', f'/institutions/{institution_id}/agreements')
+
+    def get_major_reports(self, academic_year_id: int, sending_id: int, receiving_id: int) -> List[Dict[str, Any]]:
+        data = self._get_cached(
+            f'reports:{academic_year_id}:{sending_id}:{receiving_id}',
+            '/agreements',
+            {
+                'receivingInstitutionId': receiving_id,
+                'sendingInstitutionId': sending_id,
+                'academicYearId': academic_year_id,
+                'categoryCode': 'major'
+            }
+        )
+        return data.get('reports', []) if isinstance(data, dict) else []
+
+    def get_articulation(self, key: str) -> Dict[str, Any]:
+        data = self._get_json('/articulation/Agreements', {'Key': key})
+        if not data.get('isSuccessful', True) or not data.get('result'):
+            raise AssistApiError(f"ASSIST API has no articulation for {key}: {data.get('validationFailure')}")
+        return data['result']
+
+    def resolve_academic_year_id(self, academic_year: str) -> int:
+        fall_year = _fall_year(academic_year)
+        for year in self.get_academic_years():
+            if int(year.get('FallYear', 0)) == fall_year:
+                return int(year['Id'])
+        raise AssistApiError(f"Academic year {academic_year} not found on ASSIST.org")
+
+    def resolve_institution_id(self, name: str) -> int:
+        candidates = [
+            (entry.get('name') or '', int(institution['id']))
+            for institution in self.get_institutions()
+            for entry in institution.get('names', [])
+        ]
+        return _unique_name_match(name, candidates, f"Institution {name} not found on ASSIST.org")
+
+    def resolve_target_institution_id(self, sending_id: int, target_name: str) -> int:
+        candidates = [
+            (agreement.get('institutionName') or '', int(agreement['institutionParentId']))
+            for agreement in self.get_agreement_institutions(sending_id)
+        ]
+        return _unique_name_match(
+            target_name, candidates, f"No ASSIST agreement between institution {sending_id} and {target_name}"
+        )
+
+    def resolve_major_report(self, academic_year_id: int, sending_id: int, receiving_id: int, major_filter: str) -> Dict[str, Any]:
+        reports = self.get_major_reports(academic_year_id, sending_id, receiving_id)
+        index = major_label_index([report.get('label') or '' for report in reports], major_filter)
+        if index is None:
+            raise AssistApiError(f"Major matching '{major_filter}' not found in ASSIST agreement")
+        return reports[index]
+
+    def resolve_agreement(self, academic_year: str, institution: str, target_institution: str) -> Tuple[int, int, int]:
+        """(academic year id, sending id, receiving id) for one source/target pair"""
+        year_id = self.resolve_academic_year_id(academic_year)
+        sending_id = self.resolve_institution_id(institution)
+        receiving_id = self.resolve_target_institution_id(sending_id, target_institution)
+        return year_id, sending_id, receiving_id
+
+    def report_requirements(self, report: Dict[str, Any], academic_year: str, institution: str,
+                            target_institution: str, major: str) -> Dict[str, Any]:
+        sections, sending_requirements = articulation_to_requirements(self.get_articulation(report['key']))
+        return {
+            'academic_year': academic_year,
+            'source_institution': institution,
+            'target_institution': target_institution,
+            'major': major,
+            'target_requirements': sections,
+            'source_requirements': sending_requirements
+        }
+
+    def fetch_requirements(self, academic_year: str, institution: str, target_institution: str, major_filter: str) -> Dict[str, Any]:
+        year_id, sending_id, receiving_id = self.resolve_agreement(academic_year, institution, target_institution)
+        report = self.resolve_major_report(year_id, sending_id, receiving_id, major_filter)
+        return self.report_requirements(report, academic_year, institution, target_institution, major_filter)
+
+
+_client: Optional[AssistApiClient] = None
+_client_lock = threading.Lock()
+
+
+def get_assist_api_client() -> AssistApiClient:
+    """Process-wide client so every scrape reuses the same connection pool"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = AssistApiClient()
+    return _client
+
+
+def scrape_assist_via_api(academic_year, institution, target_institution, major_filter, on_progress=None):
+    """
+    HTTP backend with the same result envelope as the Selenium scraper.
+    `on_progress(stage)` is called as the agreement and the major are resolved.
+    """
+    try:
+        client = get_assist_api_client()
+        year_id, sending_id, receiving_id = client.resolve_agreement(academic_year, institution, target_institution)
+        if on_progress:
+            on_progress("agreement_loaded")
+        report = client.resolve_major_report(year_id, sending_id, receiving_id, major_filter)
+        if on_progress:
+            on_progress("major_selected")
+        data = client.report_requirements(report, academic_year, institution, target_institution, major_filter)
+        return {
+            "success": True,
+            "data": data,
+            "error": None
+        }
+    except Exception as e:
+        print(f"❌ ASSIST API error during scraping: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "data": {}
+        }
+
+
+def scrape_assist_batch_via_api(academic_year, institution, target_institution, majors=None):
+    """
+    Resolve the source/target pair once, then yield (major, result envelope)
+    for each major; `majors=None` walks every major report in the agreement.
+    Raises AssistApiError if the pair itself can't be resolved.
+    """
+    client = get_assist_api_client()
+    year_id, sending_id, receiving_id = client.resolve_agreement(academic_year, institution, target_institution)
+
+    if majors is None:
+        targets = [(report.get('label') or '', report)
+                   for report in client.get_major_reports(year_id, sending_id, receiving_id)]
+    else:
+        targets = [(major, None) for major in majors]
+
+    for major, report in targets:
+        try:
+            if report is None:
+                report = client.resolve_major_report(year_id, sending_id, receiving_id, major)
+            data = client.report_requirements(report, academic_year, institution, target_institution, major)
+            yield major, {
+                "success": True,
+                "data": data,
+                "error": None
+            }
+        except Exception as e:
+            print(f"❌ ASSIST API error for {major}: {str(e)}")
+            yield major, {
+                "success": False,
+                "error": str(e),
+                "data": {}
+            }
@@ -0,0 +1,411 @@
+import argparse
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.scrapers.assist_api_client import AssistApiError, get_assist_api_client
+from app.scrapers.articulation_cache import normalize_key_part
+
+logger = logging.getLogger(__name__)
+
+CATALOG_VERSION = 1
+
+
+class CatalogMismatch(ValueError):
+    """The requested year/institution/major combination doesn't exist on ASSIST.org"""
+
+
+def _fall_year(academic_year: str) -> Optional[int]:
+    match = re.match(r"\s*(\d{4})", str(academic_year or ""))
+    return int(match.group(1)) if match else None
+
+
+def _major_name(label: str) -> str:
+    """'Applied Mathematics, B.A.' -> 'applied mathematics'"""
+    return normalize_key_part(label.split(",")[0])
+
+
+class NameIndex:
+    """
+    Search index over a list of names.
+
+    Exact lookups go through a dict of normalized names; token searches
+    prefix-match every query token against a sorted token table and
+    intersect the posting lists, so a lookup never scans the names.
+    """
+
+    def __init__(self, names: List[str]):
+        self.names = list(names)
+        self._exact: Dict[str, int] = {}
+        postings: Dict[str, set] = {}
+        for position, name in enumerate(self.names):
+            normalized = normalize_key_part(name)
+            self._exact.setdefault(normalized, position)
+            for token in normalized.split():
+                postings.setdefault(token, set()).add(position)
+        self._tokens = sorted(postings)
+        self._postings = [sorted(postings[token]) for token in self._tokens]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def exact(self, query: str) -> Optional[int]:
+        return self._exact.get(normalize_key_part(query))
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """Positions whose tokens prefix-match every query token, in list order"""
+        tokens = normalize_key_part(query).split()
+        if not tokens:
+            return []
+        matched: Optional[set] = None
+        # Rarest prefixes first keeps the intersection small
+        for token in sorted(set(tokens), key=len, reverse=True):
+            positions = set()
+            start = bisect.bisect_left(self._tokens, token)
+            for i in range(start, len(self._tokens)):
+                if not self._tokens[i].startswith(token):
+                    break
+                positions.update(self._postings[i])
+            matched = positions if matched is None else matched & positions
+            if not matched:
+                return []
+        ordered = sorted(matched)
+        return ordered[:limit] if limit else ordered
+
+    def best(self, query: str) -> Optional[int]:
+        position = self.exact(query)
+        if position is not None:
+            return position
+        # Same semantics as the ASSIST option lists: the first name containing the text
+        wanted = normalize_key_part(query)
+        candidates = self.search(query)
+        for candidate in candidates:
+            if wanted in normalize_key_part(self.names[candidate]):
+                return candidate
+        return candidates[0] if candidates else None
+
+
+class AssistCatalog:
+    """
+    Local catalog of ASSIST.org years, institutions, agreements and majors.
+
+    Built from the same JSON endpoints that feed the ASSIST form's option
+    lists and stored at ASSIST_CATALOG_PATH. Lookups only read memory: a
+    pair whose major list hasn't been fetched yet, or a catalog past its
+    refresh interval, is filled in on a background thread while the
+    request proceeds unvalidated.
+    """
+
+    def __init__(self, path: str, refresh_seconds: int):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self._data: Dict[str, Any] = {}
+        self._institution_index: Optional[NameIndex] = None
+        self._agreement_indexes: Dict[str, NameIndex] = {}
+        self._major_indexes: Dict[str, NameIndex] = {}
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._loaded = False
+
+    # -- lookups -------------------------------------------------------------
+
+    def load(self) -> None:
+        """
+        Read the saved catalog from disk. Lookups do this on first use; servers
+        call it at startup, off the event loop, so lookups in async handlers
+        only ever read memory.
+        """
+        self._ensure_loaded()
+
+    def is_ready(self) -> bool:
+        self._ensure_loaded()
+        return self._institution_index is not None
+
+    def academic_year_id(self, academic_year: str) -> Optional[int]:
+        self._ensure_loaded()
+        year_id = self._data.get("years", {}).get(str(_fall_year(academic_year)))
+        return int(year_id) if year_id is not None else None
+
+    def find_institution(self, name: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry ({id, name, code, is_community_college}) for the best match"""
+        self._ensure_loaded()
+        index = self._institution_index
+        if index is None or not name:
+            return None
+        position = index.best(name)
+        if position is None:
+            # Codes such as "UCB" or "DEANZA" are exact-only
+            position = self._data.get("codes", {}).get(str(name).strip().upper())
+        return self._data["institutions"][position] if position is not None else None
+
+    def search_institutions(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        self._ensure_loaded()
+        index = self._institution_index
+        if index is None:
+            return []
+        return [self._data["institutions"][position] for position in index.search(query, limit)]
+
+    def agreements(self, sending_id: int) -> Optional[List[Dict[str, Any]]]:
+        """Institutions `sending_id` has agreements with, or None if not catalogued"""
+        self._ensure_loaded()
+        return self._data.get("agreements", {}).get(str(sending_id))
+
+    def find_agreement(self, sending_id: int, target_name: str) -> Optional[Dict[str, Any]]:
+        agreements = self.agreements(sending_id)
+        if agreements is None:
+            return None
+        index = self._agreement_indexes.get(str(sending_id))
+        if index is None:
+            index = NameIndex([agreement["name"] for agreement in agreements])
+            self._agreement_indexes[str(sending_id)] = index
+        position = index.best(target_name)
+        return agreements[position] if position is not None else None
+
+    def majors(self, year_id: int, sending_id: int, receiving_id: int) -> Optional[List[Dict[str, str]]]:
+        """Major reports ({label, key}) in one agreement, or None if not catalogued"""
+        self._ensure_loaded()
+        return self._data.get("majors", {}).get(f"{year_id}:{sending_id}:{receiving_id}")
+
+    def find_major(self, year_id: int, sending_id: int, receiving_id: int, major: str) -> Optional[Dict[str, str]]:
+        reports = self.majors(year_id, sending_id, receiving_id)
+        if not reports or not major:
+            return None
+        pair = f"{year_id}:{sending_id}:{receiving_id}"
+        index = self._major_indexes.get(pair)
+        if index is None:
+            index = NameIndex([report["label"] for report in reports])
+            self._major_indexes[pair] = index
+        # Prefer a label whose major name matches outright over the first containing one,
+        # so "Mathematics" doesn't resolve to "Applied Mathematics, B.A."
+        wanted = normalize_key_part(major)
+        for position in index.search(major):
+            if _major_name(reports[position]["label"]) == wanted:
+                return reports[position]
+        position = index.best(major)
+        return reports[position] if position is not None else None
+
+    def resolve_transfer_path(self, academic_year: str, institution: str, target_institution: str,
+                              major: str) -> Tuple[str, str, str]:
+        """
+        Exact ASSIST names for (institution, target institution, major).
+
+        Parts the catalog hasn't seen yet are returned unchanged and fetched in
+        the background for next time.
+
+        Raises:
+            CatalogMismatch: when the year, an institution, the agreement or the
+            major is known not to exist on ASSIST.org
+        """
+        if not self.is_ready():
+            self.refresh_in_background()
+            metrics.inc("assist_catalog.unvalidated")
+            return institution, target_institution, major
+        self._refresh_if_stale()
+
+        year_id = self.academic_year_id(academic_year)
+        if year_id is None:
+            raise CatalogMismatch(f"ASSIST.org has no agreements for academic year {academic_year}")
+
+        source = self.find_institution(institution)
+        if source is None:
+            raise CatalogMismatch(f"Institution '{institution}' not found on ASSIST.org")
+
+        agreements = self.agreements(source["id"])
+        if agreements is None:
+            self.refresh_in_background(source["id"])
+            metrics.inc("assist_catalog.unvalidated")
+            return source["name"], target_institution, major
+        agreement = self.find_agreement(source["id"], target_institution)
+        if agreement is None:
+            raise CatalogMismatch(f"{source['name']} has no ASSIST agreement with '{target_institution}'")
+        if agreement["year_ids"] and year_id not in agreement["year_ids"]:
+            raise CatalogMismatch(
+                f"{source['name']} has no {academic_year} agreement with {agreement['name']}"
+            )
+
+        reports = self.majors(year_id, source["id"], agreement["id"])
+        if reports is None:
+            self.refresh_in_background(source["id"], (year_id, source["id"], agreement["id"]))
+            metrics.inc("assist_catalog.unvalidated")
+            return source["name"], agreement["name"], major
+        report = self.find_major(year_id, source["id"], agreement["id"], major)
+        if report is None:
+            raise CatalogMismatch(
+                f"No '{major}' major in the {academic_year} agreement between {source['name']} and {agreement['name']}"
+            )
+
+        metrics.inc("assist_catalog.resolved")
+        return source["name"], agreement["name"], report["label"]
+
+    # -- building ------------------------------------------------------------
+
+    def refresh(self, sending_ids: Optional[List[int]] = None, pairs: Optional[List[Tuple[int, int, int]]] = None,
+                all_agreements: bool = False, all_majors_year: Optional[int] = None) -> None:
+        """
+        Fetch from the ASSIST API and save to disk.
+
+        Always refreshes years and institutions, plus the agreements of
+        `sending_ids` (or of every institution with `all_agreements`) and the
+        major lists of `pairs`. `all_majors_year` walks the major list of every
+        catalogued agreement for that fall year.
+        """
+        client = get_assist_api_client()
+        started = time.perf_counter()
+        with self._lock:
+            data = json.loads(json.dumps(self._data)) if self._data else {}
+
+        data["years"] = {str(int(year["FallYear"])): int(year["Id"]) for year in client.get_academic_years()}
+        institutions, codes = [], {}
+        for institution in client.get_institutions():
+            names = [entry.get("name") for entry in institution.get("names", []) if entry.get("name")]
+            if not names:
+                continue
+            if institution.get("code"):
+                codes.setdefault(str(institution["code"]).strip().upper(), len(institutions))
+            institutions.append({
+                "id": int(institution["id"]),
+                "name": names[0],
+                "code": institution.get("code"),
+                "is_community_college": bool(institution.get("isCommunityCollege")),
+            })
+        data["institutions"] = institutions
+        data["codes"] = codes
+
+        agreements = data.setdefault("agreements", {})
+        if all_agreements:
+            sending_ids = [institution["id"] for institution in institutions]
+        # Known agreement lists are refreshed along with the ones asked for
+        for sending_id in sorted(set(int(i) for i in agreements) | set(sending_ids or [])):
+            try:
+                agreements[str(sending_id)] = [
+                    {
+                        "id": int(agreement["institutionParentId"]),
+                        "name": agreement.get("institutionName") or "",
+                        "year_ids": sorted(set(agreement.get("sendingYearIds") or []) |
+                                           set(agreement.get("receivingYearIds") or [])),
+                    }
+                    for agreement in client.get_agreement_institutions(sending_id)
+                ]
+            except AssistApiError as e:
+                logger.warning(f"⚠️ Could not catalog agreements of institution {sending_id}: {e}")
+
+        majors = data.setdefault("majors", {})
+        wanted_pairs = {tuple(int(part) for part in pair.split(":")) for pair in majors}
+        wanted_pairs.update(tuple(pair) for pair in pairs or [])
+        if all_majors_year is not None:
+            year_id = data["years"].get(str(all_majors_year))
+            if year_id is not None:
+                wanted_pairs.update(
+                    (year_id, int(sending_id), agreement["id"])
+                    for sending_id, targets in agreements.items()
+                    for agreement in targets
+                    if not agreement["year_ids"] or year_id in agreement["year_ids"]
+                )
+        for year_id, sending_id, receiving_id in sorted(wanted_pairs):
+            try:
+                majors[f"{year_id}:{sending_id}:{receiving_id}"] = [
+                    {"label": report.get("label") or "", "key": report.get("key")}
+                    for report in client.get_major_reports(year_id, sending_id, receiving_id)
+                ]
+            except AssistApiError as e:
+                logger.warning(f"⚠️ Could not catalog majors of agreement {year_id}:{sending_id}:{receiving_id}: {e}")
+
+        data["version"] = CATALOG_VERSION
+        data["refreshed_at"] = time.time()
+        self._install(data)
+        self._save(data)
+        metrics.observe("assist_catalog.refresh_seconds", time.perf_counter() - started)
+        logger.info(f"📚 ASSIST catalog refreshed: {len(institutions)} institutions, {len(agreements)} agreement lists, "
+                    f"{len(majors)} major lists")
+
+    def refresh_in_background(self, sending_id: Optional[int] = None,
+                              pair: Optional[Tuple[int, int, int]] = None) -> None:
+        """Start a refresh on a daemon thread unless the same one is already running"""
+        task = (sending_id, pair)
+        with self._lock:
+            if task in self._pending:
+                return
+            self._pending.add(task)
+
+        def run():
+            try:
+                self.refresh(sending_ids=[sending_id] if sending_id is not None else None,
+                             pairs=[pair] if pair is not None else None)
+            except Exception as e:
+                metrics.inc("assist_catalog.refresh_failures")
+                logger.warning(f"⚠️ ASSIST catalog refresh failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(task)
+
+        threading.Thread(target=run, name="assist-catalog-refresh", daemon=True).start()
+
+    def _refresh_if_stale(self) -> None:
+        if time.time() - self._data.get("refreshed_at", 0) > self.refresh_seconds:
+            self.refresh_in_background()
+
+    def _install(self, data: Dict[str, Any]) -> None:
+        index = NameIndex([institution["name"] for institution in data.get("institutions", [])]) \
+            if data.get("institutions") else None
+        with self._lock:
+            self._data = data
+            self._institution_index = index
+            self._agreement_indexes = {}
+            self._major_indexes = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable ASSIST catalog at {self.path}: {e}")
+            return
+        if data.get("version") == CATALOG_VERSION:
+            self._install(data)
+
+    def _save(self, data: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save ASSIST catalog to {self.path}: {e}")
+
+
+assist_catalog = AssistCatalog(
+    path=settings.ASSIST_CATALOG_PATH,
+    refresh_seconds=settings.ASSIST_CATALOG_REFRESH_SECONDS,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local ASSIST.org institution and major catalog")
+    parser.add_argument("--all-agreements", action="store_true", help="Catalog the agreements of every institution")
+    parser.add_argument("--majors-year", type=int, help="Catalog every agreement's majors for this fall year (e.g. 2024)")
+    args = parser.parse_args()
+
+    assist_catalog.load()
+    assist_catalog.refresh(all_agreements=args.all_agreements, all_majors_year=args.majors_year)
+    print(f"✅ ASSIST catalog written to {assist_catalog.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+import redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_redis, mark_redis_unavailable
+from app.scrapers.assist_api_client import AssistApiError, get_assist_api_client
+from app.scrapers.articulation_cache import normalize_academic_year, normalize_key_part
+
+ID_KEY_PREFIX = "assist:ids:v1"
+
+ASSIST_RESULTS_URL = "https://assist.org/transfer/results"
+
+
+def agreement_ids_key(academic_year: str, institution: str, target_institution: str) -> str:
+    return "|".join([
+        ID_KEY_PREFIX,
+        "agreement",
+        normalize_academic_year(academic_year),
+        normalize_key_part(institution),
+        normalize_key_part(target_institution),
+    ])
+
+
+def major_report_key(academic_year: str, institution: str, target_institution: str, major: str) -> str:
+    return "|".join([
+        ID_KEY_PREFIX,
+        "report",
+        normalize_academic_year(academic_year),
+        normalize_key_part(institution),
+        normalize_key_part(target_institution),
+        normalize_key_part(major),
+    ])
+
+
+def agreement_url(year_id: int, sending_id: int, receiving_id: int, report_key: Optional[str] = None) -> str:
+    """
+    ASSIST results page for one agreement: the major list, or with `report_key`
+    (e.g. "75/113/to/79/Major/<uuid>") that major's articulation report.
+    """
+    params = {
+        'year': year_id,
+        'institution': sending_id,
+        'agreement': receiving_id,
+        'agreementType': 'to',
+        'view': 'agreement',
+        'viewBy': 'major',
+        'viewSendingAgreements': 'false',
+    }
+    if report_key:
+        params['viewByKey'] = report_key
+    return f"{ASSIST_RESULTS_URL}?{urlencode(params, safe='/')}"
+
+
+class AssistIdResolver:
+    """
+    Maps our normalized year/institution/major names to ASSIST's numeric IDs.
+
+    Resolved IDs are kept in process memory and in Redis so they survive
+    restarts. Entries older than the refresh interval are re-resolved against
+    the ASSIST API on the next lookup; if that fails the stale IDs are served,
+    since they almost never change between refreshes.
+    """
+
+    def __init__(self, ttl_seconds: int, refresh_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.refresh_seconds = refresh_seconds
+        self._memory: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def resolve_agreement(self, academic_year: str, institution: str, target_institution: str) -> Tuple[int, int, int]:
+        """(academic year id, sending id, receiving id); raises AssistApiError when unresolvable"""
+        key = agreement_ids_key(academic_year, institution, target_institution)
+        ids = self._resolve(
+            key, lambda: list(get_assist_api_client().resolve_agreement(academic_year, institution, target_institution))
+        )
+        return tuple(int(value) for value in ids)
+
+    def resolve_report_key(self, academic_year: str, institution: str, target_institution: str, major: str) -> str:
+        """ASSIST report key for the major labeled `major`, else the first whose label contains it"""
+        year_id, sending_id, receiving_id = self.resolve_agreement(academic_year, institution, target_institution)
+
+        def lookup():
+            report = get_assist_api_client().resolve_major_report(year_id, sending_id, receiving_id, major)
+            if not report.get('key'):
+                raise AssistApiError(f"ASSIST report for '{major}' has no key")
+            return report['key']
+
+        return self._resolve(major_report_key(academic_year, institution, target_institution, major), lookup)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        client = get_redis()
+        if client is not None:
+            try:
+                client.delete(key)
+            except redis.RedisError:
+                mark_redis_unavailable()
+
+    def _resolve(self, key: str, lookup) -> Any:
+        entry = self._load(key)
+        if entry is not None and time.time() - entry[0] < self.refresh_seconds:
+            metrics.inc("assist_ids.hits")
+            return entry[1]
+
+        try:
+            value = lookup()
+        except AssistApiError:
+            if entry is None:
+                metrics.inc("assist_ids.failures")
+                raise
+            metrics.inc("assist_ids.stale_served")
+            return entry[1]
+
+        metrics.inc("assist_ids.refreshes" if entry is not None else "assist_ids.misses")
+        self._store(key, (time.time(), value))
+        return value
+
+    def _load(self, key: str) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            payload = client.get(key)
+        except redis.RedisError:
+            mark_redis_unavailable()
+            return None
+        if payload is None:
+            return None
+        resolved_at, value = json.loads(payload)
+        entry = (float(resolved_at), value)
+        with self._lock:
+            self._memory[key] = entry
+        return entry
+
+    def _store(self, key: str, entry: Tuple[float, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(key, json.dumps(list(entry), separators=(",", ":")), ex=self.ttl_seconds)
+            except redis.RedisError:
+                mark_redis_unavailable()
+
+
+assist_id_resolver = AssistIdResolver(
+    ttl_seconds=settings.ASSIST_ID_CACHE_TTL_SECONDS,
+    refresh_seconds=settings.ASSIST_ID_REFRESH_SECONDS,
+)
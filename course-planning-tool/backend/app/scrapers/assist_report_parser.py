@@ -0,0 +1,604 @@
+"""
+Parsers for a rendered ASSIST `.reportContainer`.
+
+`parse_report` is the production path: it indexes the report with lxml in a
+single traversal and answers every lookup from that index. The BeautifulSoup
+functions below are the original implementation, kept as the reference the
+lxml parser is checked against (see test_assist_report_parser.py).
+"""
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+UNITS_PATTERN = re.compile(r'(\d+\.?\d*)\s*units?', re.IGNORECASE)
+TRAILING_DASH_PATTERN = re.compile(r'\s*-\s*$')
+SUBSECTION_PATTERN = re.compile(r'\d+Complete')
+LEADING_NUMBER_PATTERN = re.compile(r'(\d+)')
+
+NO_COURSE = {
+    'code': 'NO_COURSE',
+    'title': 'No Course Articulated',
+    'units': ''
+}
+
+# BeautifulSoup leaves these strings out of get_text()
+_NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+_COURSE_CODE_FALLBACK = '*courseCode'
+
+
+def _split_course_text(code: str, full_text: str) -> Tuple[str, str]:
+    """Title and units from a course line's text once its code is known"""
+    if not (code and code in full_text):
+        return '', ''
+
+    # Remove the code from the beginning
+    remaining = full_text.replace(code, '', 1).strip()
+
+    # Look for units pattern (e.g., "4.00units" or "5.00 units")
+    units_match = UNITS_PATTERN.search(remaining)
+    if not units_match:
+        return remaining, ''
+
+    title = remaining[:units_match.start()].strip()
+    title = TRAILING_DASH_PATTERN.sub('', title)  # Remove trailing dash
+    return title, units_match.group(1) + ' units'
+
+
+# ---------------------------------------------------------------------------
+# Reference implementation (BeautifulSoup)
+# ---------------------------------------------------------------------------
+
+def extract_course_info(course_elem):
+    """Extract course code, title, and units from a course element"""
+    # Look for course code in prefixCourseNumber class
+    code_elem = course_elem.find('div', class_='prefixCourseNumber')
+    if not code_elem:
+        # Fall back to courseCode class
+        code_elem = course_elem.find('div', class_=lambda c: c and 'courseCode' in c)
+
+    # Look for course title and units in the full text
+    full_text = course_elem.get_text(strip=True)
+    code = code_elem.get_text(strip=True) if code_elem else ''
+
+    title, units_part = _split_course_text(code, full_text)
+    return code, title, units_part
+
+
+def parse_articulation_structure(container):
+    """Parse the articulation agreement structure"""
+    sections = []
+
+    # Find group containers which represent sections
+    group_containers = container.find_all('div', class_='groupContainer')
+
+    for group_container in group_containers:
+        full_text = group_container.get_text(strip=True)
+
+        # Check for HIGHLY RECOMMENDED section
+        if 'HIGHLY RECOMMENDED' in full_text:
+            section = {
+                'number': 'HIGHLY_RECOMMENDED',
+                'title': 'Highly Recommended',
+                'subsections': [],
+                'structure': 'recommended'
+            }
+
+            # Look for numbered subsections within HIGHLY RECOMMENDED
+            subsection_containers = group_container.find_all('div', class_='sectionContainer')
+            if not subsection_containers:
+                # Fallback: look for any containers with section numbers
+                subsection_containers = group_container.find_all('div', class_='groupContainer')
+
+            for subsection_container in subsection_containers:
+                subsection_text = subsection_container.get_text(strip=True)
+
+                # Look for numbered subsections like "2Complete A"
+                if SUBSECTION_PATTERN.match(subsection_text):
+                    subsection = {
+                        'number': LEADING_NUMBER_PATTERN.match(subsection_text).group(1),
+                        'title': subsection_text.split('Complete')[1].strip(),
+                        'options': [],
+                        'structure': 'choice'
+                    }
+
+                    # Find option groups (A, B, etc.)
+                    option_containers = subsection_container.find_all('div', class_='sectionMain')
+                    if not option_containers:
+                        # Fallback: look for any div that might contain options
+                        option_containers = subsection_container.find_all('div', recursive=True)
+                        option_containers = [div for div in option_containers if div.find('div', class_='courseLine')]
+
+                    option_letter = 'A'
+                    for option_container in option_containers:
+                        # Skip if this doesn't look like an option section
+                        if not option_container.find('div', class_='courseLine'):
+                            continue
+
+                        option = {
+                            'letter': option_letter,
+                            'courses': []
+                        }
+
+                        # Find course lines in this option
+                        for course_line in option_container.find_all('div', class_='courseLine'):
+                            # Check if this is a receiving course (target institution side)
+                            if course_line.find_parent('div', class_='rowReceiving'):
+                                code, title, units = extract_course_info(course_line)
+                                if code:
+                                    option['courses'].append({
+                                        'code': code,
+                                        'title': title,
+                                        'units': units,
+                                        'type': 'receiving'
+                                    })
+
+                        if option['courses']:
+                            subsection['options'].append(option)
+                            option_letter = chr(ord(option_letter) + 1)
+
+                    if subsection['options']:
+                        section['subsections'].append(subsection)
+
+            if section['subsections']:
+                sections.append(section)
+
+        # Check if this is section 1 (Complete the following)
+        elif full_text.startswith('1Complete the following'):
+            section = {
+                'number': '1',
+                'title': 'Complete the following',
+                'courses': [],
+                'structure': 'sequence'
+            }
+
+            # For receiving courses (target institution requirements)
+            for course_line in group_container.find_all('div', class_='courseLine'):
+                # Check if this is a receiving course (target institution side)
+                if course_line.find_parent('div', class_='rowReceiving'):
+                    code, title, units = extract_course_info(course_line)
+                    if code:
+                        section['courses'].append({
+                            'code': code,
+                            'title': title,
+                            'units': units,
+                            'type': 'receiving'
+                        })
+
+            sections.append(section)
+
+        # Check if this is section 2 (Complete A or B) - but not part of HIGHLY RECOMMENDED
+        elif full_text.startswith('2Complete') and ('A' in full_text and 'B' in full_text):
+            section = {
+                'number': '2',
+                'title': 'Complete A or B',
+                'options': [],
+                'structure': 'choice'
+            }
+
+            option_letter = 'A'
+            for section_main in group_container.find_all('div', class_='sectionMain'):
+                option = {
+                    'letter': option_letter,
+                    'courses': []
+                }
+
+                # Find course lines in this section
+                for course_line in section_main.find_all('div', class_='courseLine'):
+                    # Check if this is a receiving course (target institution side)
+                    if course_line.find_parent('div', class_='rowReceiving'):
+                        code, title, units = extract_course_info(course_line)
+                        if code:
+                            option['courses'].append({
+                                'code': code,
+                                'title': title,
+                                'units': units
+                            })
+
+                if option['courses']:
+                    section['options'].append(option)
+                    option_letter = chr(ord(option_letter) + 1)
+
+            sections.append(section)
+
+    return sections
+
+
+def _collect_courses(course_lines) -> List[Dict[str, str]]:
+    group = []
+    for course_line in course_lines:
+        code, title, units = extract_course_info(course_line)
+        if code:
+            group.append({
+                'code': code,
+                'title': title,
+                'units': units
+            })
+    return group
+
+
+def get_sending_requirements(container):
+    """Get the sending institution (source college) course requirements"""
+    # Find all bracket wrappers which contain the source institution course requirements
+    bracket_wrappers = container.find_all('div', class_='bracketWrapper')
+
+    # Group courses by their section/requirement
+    section_groups = {}
+
+    # Also look for articulation rows that contain course mappings
+    for artic_row in container.find_all('div', class_='articRow'):
+        # Get the target institution course this fulfills
+        receiving_course = artic_row.find('div', class_='rowReceiving')
+        if not receiving_course:
+            continue
+        target_course_line = receiving_course.find('div', class_='courseLine')
+        if not target_course_line:
+            continue
+        target_code, _, _ = extract_course_info(target_course_line)
+        if not target_code:
+            continue
+
+        key = target_code
+        groups = section_groups.setdefault(key, [])
+
+        # Get source institution courses that fulfill this requirement
+        sending_side = artic_row.find('div', class_='rowSending')
+        if not sending_side:
+            continue
+
+        # Look for bracket wrappers (OR groups)
+        bracket_wrappers_in_row = sending_side.find_all('div', class_='bracketWrapper')
+        if bracket_wrappers_in_row:
+            for wrapper in bracket_wrappers_in_row:
+                group = _collect_courses(wrapper.find_all('div', class_='courseLine'))
+                if group:
+                    groups.append(group)
+            continue
+
+        # Handle single courses (no OR groups)
+        course_lines = sending_side.find_all('div', class_='courseLine')
+        if course_lines:
+            group = _collect_courses(course_lines)
+            if group:
+                groups.append(group)
+        else:
+            groups.append([dict(NO_COURSE)])
+
+    # Fallback: use the original bracket wrapper method for any missed courses
+    for wrapper in bracket_wrappers:
+        # Find parent articRow to determine which target requirement this fulfills
+        parent_row = wrapper.find_parent('div', class_='articRow')
+        if not parent_row:
+            continue
+        receiving_course = parent_row.find('div', class_='rowReceiving')
+        if not receiving_course:
+            continue
+        target_course_line = receiving_course.find('div', class_='courseLine')
+        if not target_course_line:
+            continue
+        target_code, _, _ = extract_course_info(target_course_line)
+
+        # Only add if we haven't already processed this target course
+        if target_code not in section_groups:
+            section_groups[target_code] = []
+            group = _collect_courses(wrapper.find_all('div', class_='courseLine'))
+            if group:
+                section_groups[target_code].append(group)
+
+    return section_groups
+
+
+def parse_report_reference(report_html: str) -> Tuple[List[Dict[str, Any]], Dict[str, List]]:
+    """Parse with the BeautifulSoup implementation; slow, used to check `parse_report`"""
+    soup = BeautifulSoup(report_html, 'html.parser')
+    return parse_articulation_structure(soup), get_sending_requirements(soup)
+
+
+# ---------------------------------------------------------------------------
+# Single-pass implementation (lxml)
+# ---------------------------------------------------------------------------
+
+class ReportIndex:
+    """
+    One traversal of the report DOM, recorded so the parsing rules above can
+    be answered without re-walking the tree.
+
+    Every element gets a document-order position and the position of its
+    last descendant, so "all div.X under element E" is a bisect into a
+    per-class position list. Stripped text is gathered once in document
+    order, making get_text(strip=True) a slice join. Ancestor checks
+    (inside a rowReceiving, nearest articRow) are resolved on the way down.
+    """
+
+    def __init__(self, root):
+        self.nodes: List[Any] = []
+        self._start: Dict[Any, int] = {}
+        self._end: Dict[Any, int] = {}
+        self._text_span: Dict[Any, Tuple[int, int]] = {}
+        self._strings: List[str] = []
+        self._divs: List[int] = []
+        self._by_class: Dict[str, List[int]] = defaultdict(list)
+        self._in_receiving = set()
+        self._artic_row_of: Dict[Any, Any] = {}
+        self._text_cache: Dict[Any, str] = {}
+        self._course_cache: Dict[Any, Tuple[str, str, str]] = {}
+        if root is not None:
+            self._index(root)
+
+    @classmethod
+    def from_html(cls, report_html: str) -> 'ReportIndex':
+        if not report_html or not report_html.strip():
+            return cls(None)
+        return cls(etree.fromstring(report_html, etree.HTMLParser()))
+
+    def _index(self, root) -> None:
+        strings = self._strings
+        receiving_depth = 0
+        artic_rows: List[Any] = []
+        # (element, children iterator, first string index, is rowReceiving, is articRow)
+        stack: List[Tuple[Any, Any, int, bool, bool]] = []
+
+        def add_string(value):
+            if value:
+                value = value.strip()
+                if value:
+                    strings.append(value)
+
+        def open_element(el):
+            nonlocal receiving_depth
+            position = len(self.nodes)
+            self.nodes.append(el)
+            self._start[el] = position
+            if receiving_depth:
+                self._in_receiving.add(el)
+            if artic_rows:
+                self._artic_row_of[el] = artic_rows[-1]
+
+            text_start = len(strings)
+            if el.tag not in _NON_TEXT_TAGS:
+                add_string(el.text)
+
+            is_receiving = is_artic_row = False
+            if el.tag == 'div':
+                self._divs.append(position)
+                classes = (el.get('class') or '').split()
+                for name in classes:
+                    self._by_class[name].append(position)
+                if any('courseCode' in name for name in classes):
+                    self._by_class[_COURSE_CODE_FALLBACK].append(position)
+                is_receiving = 'rowReceiving' in classes
+                is_artic_row = 'articRow' in classes
+                if is_receiving:
+                    receiving_depth += 1
+                if is_artic_row:
+                    artic_rows.append(el)
+            stack.append((el, iter(el), text_start, is_receiving, is_artic_row))
+
+        open_element(root)
+        while stack:
+            el, children, text_start, is_receiving, is_artic_row = stack[-1]
+            child = next(children, None)
+            if child is not None:
+                if isinstance(child.tag, str):
+                    open_element(child)
+                else:
+                    # Comments and processing instructions only contribute their tail
+                    add_string(child.tail)
+                continue
+
+            stack.pop()
+            self._end[el] = len(self.nodes) - 1
+            self._text_span[el] = (text_start, len(strings))
+            if is_receiving:
+                receiving_depth -= 1
+            if is_artic_row:
+                artic_rows.pop()
+            # The tail belongs to the parent's text, after this element
+            if stack:
+                add_string(el.tail)
+
+    # -- lookups ------------------------------------------------------------
+
+    def text(self, el) -> str:
+        """Equivalent of BeautifulSoup's get_text(strip=True)"""
+        cached = self._text_cache.get(el)
+        if cached is None:
+            start, end = self._text_span[el]
+            cached = self._text_cache[el] = ''.join(self._strings[start:end])
+        return cached
+
+    def _positions_within(self, el, positions: List[int]) -> List[int]:
+        lo = bisect_right(positions, self._start[el])
+        hi = bisect_right(positions, self._end[el])
+        return positions[lo:hi]
+
+    def find_all(self, el, class_name: Optional[str] = None) -> List[Any]:
+        """Descendant divs of `el` (optionally with a class), in document order"""
+        positions = self._by_class.get(class_name, []) if class_name else self._divs
+        return [self.nodes[i] for i in self._positions_within(el, positions)]
+
+    def find(self, el, class_name: str):
+        positions = self._by_class.get(class_name)
+        if not positions:
+            return None
+        lo = bisect_right(positions, self._start[el])
+        if lo < len(positions) and positions[lo] <= self._end[el]:
+            return self.nodes[positions[lo]]
+        return None
+
+    def course_info(self, course_line) -> Tuple[str, str, str]:
+        """Same contract as extract_course_info, memoised per course line"""
+        cached = self._course_cache.get(course_line)
+        if cached is None:
+            code_elem = self.find(course_line, 'prefixCourseNumber')
+            if code_elem is None:
+                code_elem = self.find(course_line, _COURSE_CODE_FALLBACK)
+            code = self.text(code_elem) if code_elem is not None else ''
+            title, units = _split_course_text(code, self.text(course_line))
+            cached = self._course_cache[course_line] = (code, title, units)
+        return cached
+
+    def _receiving_courses(self, el, with_type: bool) -> List[Dict[str, str]]:
+        courses = []
+        for course_line in self.find_all(el, 'courseLine'):
+            if course_line not in self._in_receiving:
+                continue
+            code, title, units = self.course_info(course_line)
+            if code:
+                course = {'code': code, 'title': title, 'units': units}
+                if with_type:
+                    course['type'] = 'receiving'
+                courses.append(course)
+        return courses
+
+    def _sending_courses(self, course_lines) -> List[Dict[str, str]]:
+        group = []
+        for course_line in course_lines:
+            code, title, units = self.course_info(course_line)
+            if code:
+                group.append({'code': code, 'title': title, 'units': units})
+        return group
+
+    # -- parsing rules --------------------------------------------------------
+
+    def articulation_structure(self) -> List[Dict[str, Any]]:
+        sections = []
+        if not self.nodes:
+            return sections
+
+        for group_container in self.find_all(self.nodes[0], 'groupContainer'):
+            full_text = self.text(group_container)
+
+            if 'HIGHLY RECOMMENDED' in full_text:
+                section = {
+                    'number': 'HIGHLY_RECOMMENDED',
+                    'title': 'Highly Recommended',
+                    'subsections': [],
+                    'structure': 'recommended'
+                }
+                subsection_containers = (self.find_all(group_container, 'sectionContainer') or
+                                         self.find_all(group_container, 'groupContainer'))
+                for subsection_container in subsection_containers:
+                    subsection = self._recommended_subsection(subsection_container)
+                    if subsection:
+                        section['subsections'].append(subsection)
+                if section['subsections']:
+                    sections.append(section)
+
+            elif full_text.startswith('1Complete the following'):
+                sections.append({
+                    'number': '1',
+                    'title': 'Complete the following',
+                    'courses': self._receiving_courses(group_container, with_type=True),
+                    'structure': 'sequence'
+                })
+
+            elif full_text.startswith('2Complete') and ('A' in full_text and 'B' in full_text):
+                section = {
+                    'number': '2',
+                    'title': 'Complete A or B',
+                    'options': [],
+                    'structure': 'choice'
+                }
+                option_letter = 'A'
+                for section_main in self.find_all(group_container, 'sectionMain'):
+                    courses = self._receiving_courses(section_main, with_type=False)
+                    if courses:
+                        section['options'].append({'letter': option_letter, 'courses': courses})
+                        option_letter = chr(ord(option_letter) + 1)
+                sections.append(section)
+
+        return sections
+
+    def _recommended_subsection(self, subsection_container) -> Optional[Dict[str, Any]]:
+        subsection_text = self.text(subsection_container)
+        if not SUBSECTION_PATTERN.match(subsection_text):
+            return None
+
+        subsection = {
+            'number': LEADING_NUMBER_PATTERN.match(subsection_text).group(1),
+            'title': subsection_text.split('Complete')[1].strip(),
+            'options': [],
+            'structure': 'choice'
+        }
+        option_containers = self.find_all(subsection_container, 'sectionMain')
+        if not option_containers:
+            option_containers = [
+                div for div in self.find_all(subsection_container)
+                if self.find(div, 'courseLine') is not None
+            ]
+
+        option_letter = 'A'
+        for option_container in option_containers:
+            courses = self._receiving_courses(option_container, with_type=True)
+            if courses:
+                subsection['options'].append({'letter': option_letter, 'courses': courses})
+                option_letter = chr(ord(option_letter) + 1)
+
+        return subsection if subsection['options'] else None
+
+    def _target_code(self, artic_row) -> Optional[str]:
+        """Code of the receiving course an articRow maps to; None when there isn't one"""
+        receiving_course = self.find(artic_row, 'rowReceiving')
+        if receiving_course is None:
+            return None
+        target_course_line = self.find(receiving_course, 'courseLine')
+        if target_course_line is None:
+            return None
+        return self.course_info(target_course_line)[0]
+
+    def sending_requirements(self) -> Dict[str, List[List[Dict[str, str]]]]:
+        section_groups: Dict[str, List] = {}
+        if not self.nodes:
+            return section_groups
+        root = self.nodes[0]
+
+        for artic_row in self.find_all(root, 'articRow'):
+            target_code = self._target_code(artic_row)
+            if not target_code:
+                continue
+            groups = section_groups.setdefault(target_code, [])
+
+            sending_side = self.find(artic_row, 'rowSending')
+            if sending_side is None:
+                continue
+
+            wrappers = self.find_all(sending_side, 'bracketWrapper')
+            if wrappers:
+                for wrapper in wrappers:
+                    group = self._sending_courses(self.find_all(wrapper, 'courseLine'))
+                    if group:
+                        groups.append(group)
+                continue
+
+            course_lines = self.find_all(sending_side, 'courseLine')
+            if course_lines:
+                group = self._sending_courses(course_lines)
+                if group:
+                    groups.append(group)
+            else:
+                groups.append([dict(NO_COURSE)])
+
+        # Brackets whose row produced no key yet (the reference's fallback pass)
+        for wrapper in self.find_all(root, 'bracketWrapper'):
+            parent_row = self._artic_row_of.get(wrapper)
+            if parent_row is None:
+                continue
+            target_code = self._target_code(parent_row)
+            if target_code is None or target_code in section_groups:
+                continue
+            section_groups[target_code] = []
+            group = self._sending_courses(self.find_all(wrapper, 'courseLine'))
+            if group:
+                section_groups[target_code].append(group)
+
+        return section_groups
+
+
+def parse_report(report_html: str) -> Tuple[List[Dict[str, Any]], Dict[str, List]]:
+    """Target-side sections and source-side requirement groups from report HTML"""
+    index = ReportIndex.from_html(report_html)
+    return index.articulation_structure(), index.sending_requirements()
@@ -1,20 +1,30 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.keys import Keys
+import asyncio
 import time
-import re
-from bs4 import BeautifulSoup
+from contextlib import contextmanager
 import argparse
 import sys
-import os
 from selenium.common.exceptions import TimeoutException
 from app.core.config import settings
+from app.core.executors import get_scraper_executor
+from app.core.metrics import metrics
+from app.scrapers.assist_api_client import (
+    AssistApiError, major_label_index, scrape_assist_batch_via_api, scrape_assist_via_api
+)
+from app.scrapers.assist_ids import agreement_url, assist_id_resolver, major_report_key
+from app.scrapers.assist_report_parser import parse_report
+from app.scrapers.articulation_cache import articulation_cache, articulation_cache_key
+from app.scrapers.driver_pool import get_driver_pool, load_assist_home
+from app.scrapers.request_blocking import track_network_usage
+from app.scrapers.single_flight import scrape_flight
 
-def scrape_assist_data(academic_year, institution, target_institution, major_filter):
+SCRAPER_BACKENDS = ("http", "selenium")
+
+def scrape_assist_data(academic_year, institution, target_institution, major_filter, backend=None, use_cache=True,
+                       on_progress=None):
     """
     Scrape ASSIST.org for transfer requirements - REAL DATA ONLY
     
@@ -23,6 +33,11 @@ def scrape_assist_data(academic_year, institution, target_institution, major_fil
         institution (str): Source institution name (e.g., "De Anza College")
         target_institution (str): Target institution name (e.g., "University of California, Berkeley")
         major_filter (str): Major to filter for (e.g., "Applied Math")
+        backend (str): "http" (ASSIST JSON API) or "selenium"; defaults to settings.ASSIST_SCRAPER_BACKEND
+        use_cache (bool): Serve and store results through the articulation cache
+        on_progress (callable): Called with a stage name ("browser_leased",
+            "agreement_loaded", "major_selected") as the scrape advances; runs on
+            the scraping thread
     
     Returns:
         dict: Structured data containing transfer requirements OR raises exception
@@ -31,16 +46,42 @@ def scrape_assist_data(academic_year, institution, target_institution, major_fil
         Exception: When ASSIST.org scraping fails - NO FALLBACK DATA
     """
     
+    backend = (backend or settings.ASSIST_SCRAPER_BACKEND).lower()
+    if backend not in SCRAPER_BACKENDS:
+        raise ValueError(f"Unknown ASSIST scraper backend: {backend}")
+    
     print(f"🚀 Starting ASSIST.org scraping...")
     print(f"   Academic Year: {academic_year}")
     print(f"   From: {institution}")
     print(f"   To: {target_institution}")
     print(f"   Major: {major_filter}")
+    print(f"   Backend: {backend}")
+    
+    use_cache = use_cache and settings.ARTICULATION_CACHE_ENABLED
+    cache_key = articulation_cache_key(academic_year, institution, target_institution, major_filter)
+    if use_cache:
+        cached = articulation_cache.get(cache_key)
+        if cached is not None:
+            print(f"⚡ ASSIST.org data served from cache")
+            return {
+                "success": True,
+                "data": cached,
+                "error": None
+            }
     
     try:
-        result = _scrape_assist_with_selenium(academic_year, institution, target_institution, major_filter)
+        result = None
+        if backend == "http":
+            result = scrape_assist_via_api(academic_year, institution, target_institution, major_filter, on_progress)
+            if not result.get("success", False) and settings.ASSIST_HTTP_FALLBACK_TO_SELENIUM:
+                print(f"⚠️ ASSIST API backend failed ({result.get('error')}), falling back to Selenium")
+                result = None
+        if result is None:
+            result = _scrape_assist_with_selenium(academic_year, institution, target_institution, major_filter, on_progress)
         if result.get("success", False):
             print(f"✅ ASSIST.org scraping successful!")
+            if use_cache:
+                articulation_cache.set(cache_key, result["data"])
             return result
         else:
             error_msg = result.get('error', 'Unknown error')
@@ -50,604 +91,390 @@ def scrape_assist_data(academic_year, institution, target_institution, major_fil
         print(f"❌ ASSIST.org scraping crashed: {str(e)}")
         raise Exception(f"ASSIST.org scraping crashed: {str(e)}")
 
-def _scrape_assist_with_selenium(academic_year, institution, target_institution, major_filter):
-    
-    # Set up Chrome options for maximum stability in production environments
-    chrome_options = Options()
+async def scrape_assist_data_async(academic_year, institution, target_institution, major_filter, backend=None,
+                                   on_progress=None):
+    """
+    Async entry point for request handlers.
     
-    # Essential options for Docker/containerized environments
-    chrome_options.add_argument("--no-sandbox")                    # Critical for Docker/containers
-    chrome_options.add_argument("--disable-dev-shm-usage")         # Critical for limited memory
-    chrome_options.add_argument("--disable-gpu")                   # Disable GPU for headless
-    chrome_options.add_argument("--disable-extensions")
-    chrome_options.add_argument("--disable-plugins")
-    chrome_options.add_argument("--disable-images")               # Faster loading
-    chrome_options.add_argument("--disable-javascript")          # Faster, we only need DOM
-    chrome_options.add_argument("--disable-css")                 # Faster loading
-    chrome_options.add_argument("--disable-web-security")        # Avoid CORS issues
-    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-    chrome_options.add_argument("--disable-software-rasterizer")
-    chrome_options.add_argument("--disable-background-timer-throttling")
-    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
-    chrome_options.add_argument("--disable-renderer-backgrounding")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("--no-zygote")                   # Disable zygote process
-    chrome_options.add_argument("--disable-background-networking")
-    chrome_options.add_argument("--disable-default-apps")
-    chrome_options.add_argument("--disable-sync")
-    chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36")
+    Serves cached results directly; otherwise concurrent requests for the same
+    normalized key share a single scrape, which runs on the scraper executor.
+    `on_progress(stage)` is called on the event loop as the scrape advances; only
+    the request that starts a scrape sees its stages, and none are reported when
+    scrapes run in worker processes.
+    """
+    loop = asyncio.get_running_loop()
+    cache_key = articulation_cache_key(academic_year, institution, target_institution, major_filter)
     
-    # Enhanced stability options for production
-    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-    chrome_options.add_argument("--disable-web-security")
-    chrome_options.add_argument("--allow-running-insecure-content")
-    chrome_options.add_argument("--disable-logging")
-    chrome_options.add_argument("--disable-dev-tools")
-    chrome_options.add_argument("--ignore-certificate-errors")
-    chrome_options.add_argument("--ignore-ssl-errors")
-    chrome_options.add_argument("--ignore-certificate-errors-spki-list")
-    chrome_options.add_argument("--disable-site-isolation-trials")
-    chrome_options.add_argument("--disable-features=VizDisplayCompositor,VizServiceDisplay")
-    chrome_options.add_argument("--memory-pressure-off")
-    chrome_options.add_argument("--max_old_space_size=4096")
+    async def lookup():
+        if not settings.ARTICULATION_CACHE_ENABLED:
+            return None
+        cached = await articulation_cache.get_async(cache_key)
+        if cached is None:
+            return None
+        return {
+            "success": True,
+            "data": cached,
+            "error": None
+        }
     
-    # ALWAYS run headless in production (Render doesn't have display)
-    chrome_options.add_argument("--headless=new")  # Use new headless mode
+    async def scrape():
+        executor = get_scraper_executor()
+        progress = None
+        if on_progress is not None and not executor.is_process_pool:
+            # Hop from the scraping thread back onto the loop that owns the callback
+            progress = lambda stage: loop.call_soon_threadsafe(on_progress, stage)
+        result = await executor.run(
+            scrape_assist_data, academic_year, institution, target_institution, major_filter, backend=backend,
+            on_progress=progress
+        )
+        if executor.is_process_pool and settings.ARTICULATION_CACHE_ENABLED:
+            # The worker process cached into its own memory; keep a copy in ours too
+            articulation_cache.set(cache_key, result["data"], remote=False)
+        return result
     
-    # Advanced session persistence options
-    chrome_options.add_argument("--aggressive-cache-discard")
-    chrome_options.add_argument("--disable-hang-monitor")
-    chrome_options.add_argument("--disable-prompt-on-repost")
-    chrome_options.add_argument("--disable-client-side-phishing-detection")
-    chrome_options.add_argument("--disable-component-update")
-    chrome_options.add_argument("--disable-domain-reliability")
+    cached = await lookup()
+    if cached is not None:
+        return cached
+    return await scrape_flight.do(cache_key, scrape, lookup)
+
+def scrape_assist_batch(academic_year, institution, target_institution, majors=None, backend=None, use_cache=True):
+    """
+    Scrape many majors for one source/target pair, navigating to the agreement once
     
-    # Set Chrome binary path - try common production paths
-    chrome_paths = [
-        "/usr/bin/chromium",                # Chromium binary (from our Dockerfile)
-        "/usr/bin/chromium-browser",       # Alternative Chromium path
-        "/usr/bin/chromium-browser",       # Debian/Ubuntu Chromium
-        "/snap/bin/chromium",              # Snap package Chromium
-        "/usr/lib/chromium-browser/chromium-browser", # Another Ubuntu path
-        "/usr/bin/google-chrome",           # Chrome fallback
-        "/usr/bin/google-chrome-stable",   # Alternative Chrome path  
-        "/opt/google/chrome/chrome",       # Another common Chrome path
-        "/usr/bin/chrome",                 # Generic chrome
-        "/opt/chrome/chrome",              # Alternative Chrome location
-    ]
+    Args:
+        academic_year (str): Academic year (e.g., "2024-2025")
+        institution (str): Source institution name
+        target_institution (str): Target institution name
+        majors (list): Major filters to scrape; None scrapes every major in the agreement
+        backend (str): "http" or "selenium"; defaults to settings.ASSIST_SCRAPER_BACKEND
+        use_cache (bool): Serve cached majors without scraping and store fresh results
     
-    chrome_binary = os.getenv("CHROME_BINARY_PATH")
-    if chrome_binary:
-        chrome_options.binary_location = chrome_binary
-        print(f"🔧 Using specified Chrome binary: {chrome_binary}")
-    else:
-        # Auto-detect Chrome/Chromium binary
-        for path in chrome_paths:
-            if os.path.exists(path):
-                chrome_options.binary_location = path
-                print(f"🔧 Auto-detected Chrome/Chromium binary: {path}")
-                break
+    Yields:
+        tuple: (major, result envelope) as each major completes. A failed major
+        yields success=False and the batch moves on to the next one.
     
-    # Set ChromeDriver path - try common paths
-    chromedriver_paths = [
-        "/usr/bin/chromedriver",            # ChromeDriver from chromium-driver package (confirmed working)
-        "/usr/local/bin/chromedriver",      # Alternative path
-        "/opt/chromedriver/chromedriver",   # Another common path
-    ]
+    Raises:
+        Exception: When the agreement page itself can't be reached
+    """
+    backend = (backend or settings.ASSIST_SCRAPER_BACKEND).lower()
+    if backend not in SCRAPER_BACKENDS:
+        raise ValueError(f"Unknown ASSIST scraper backend: {backend}")
+    use_cache = use_cache and settings.ARTICULATION_CACHE_ENABLED
     
-    chromedriver_path = os.getenv("CHROME_DRIVER_PATH")
-    if chromedriver_path:
-        print(f"🔧 Using specified ChromeDriver: {chromedriver_path}")
-    else:
-        # Auto-detect ChromeDriver
-        for path in chromedriver_paths:
-            if os.path.exists(path):
-                chromedriver_path = path
-                print(f"🔧 Auto-detected ChromeDriver: {path}")
-                break
-        if not chromedriver_path:
-            chromedriver_path = settings.CHROME_DRIVER_PATH  # Use config default
+    print(f"🚀 Starting ASSIST.org batch scraping...")
+    print(f"   Academic Year: {academic_year}")
+    print(f"   From: {institution}")
+    print(f"   To: {target_institution}")
+    print(f"   Majors: {'all' if majors is None else len(majors)}")
+    print(f"   Backend: {backend}")
     
-    print(f"🚀 Initializing Chrome WebDriver with enhanced stability...")
-    print(f"   ChromeDriver path: {chromedriver_path}")
-    print(f"   Chrome binary: {chrome_options.binary_location}")
+    pending = None if majors is None else list(majors)
+    if pending is not None and use_cache:
+        remaining = []
+        for major in pending:
+            cached = articulation_cache.get(articulation_cache_key(academic_year, institution, target_institution, major))
+            if cached is None:
+                remaining.append(major)
+                continue
+            yield major, {
+                "success": True,
+                "data": cached,
+                "error": None
+            }
+        pending = remaining
+        if not pending:
+            return
     
-    driver = None
-    max_retries = 3
-    retry_count = 0
+    def finish(major, result):
+        metrics.inc("scraper.batch.majors" if result.get("success") else "scraper.batch.failures")
+        if result.get("success") and use_cache:
+            articulation_cache.set(
+                articulation_cache_key(academic_year, institution, target_institution, major), result["data"]
+            )
+        return major, result
     
-    while retry_count < max_retries:
+    completed = set()
+    if backend == "http":
         try:
-            retry_count += 1
-            print(f"🔄 Chrome initialization attempt {retry_count}/{max_retries}")
-            
-            # Try to create service with specified path
-            if chromedriver_path and os.path.exists(chromedriver_path):
-                print(f"✅ Found ChromeDriver at: {chromedriver_path}")
-                service = Service(chromedriver_path)
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                print(f"✅ Chrome WebDriver initialized successfully!")
-                break
-            else:
-                print(f"❌ ChromeDriver not found at: {chromedriver_path}")
-                # Fallback: let webdriver-manager handle it (for local development)
-                try:
-                    print(f"🔄 Trying webdriver-manager fallback...")
-                    from webdriver_manager.chrome import ChromeDriverManager
-                    service = Service(ChromeDriverManager().install())
-                    driver = webdriver.Chrome(service=service, options=chrome_options)
-                    print(f"✅ Chrome WebDriver initialized with webdriver-manager!")
-                    break
-                except ImportError:
-                    print(f"❌ webdriver-manager not available")
-                    # Last resort: try without service specification
-                    print(f"🔄 Trying without service specification...")
-                    driver = webdriver.Chrome(options=chrome_options)
-                    print(f"✅ Chrome WebDriver initialized without service!")
-                    break
-                    
-        except Exception as e:
-            print(f"❌ Chrome initialization attempt {retry_count} failed: {e}")
-            if retry_count >= max_retries:
-                print(f"❌ All Chrome initialization attempts failed after {max_retries} retries")
-                raise Exception(f"Could not initialize Chrome WebDriver after {max_retries} attempts. Check if Chrome and ChromeDriver are properly installed and configured. Last error: {e}")
-            
-            # Wait before retry
-            time.sleep(2)
-            
-    if not driver:
-        raise Exception("Failed to initialize Chrome WebDriver - driver is None")
-    
-    # Set aggressive timeouts for stability
-    driver.set_page_load_timeout(30)  # 30 second page load timeout
-    driver.implicitly_wait(10)        # 10 second implicit wait
-    
-    print(f"🌐 Navigating to ASSIST.org...")
+            for major, result in scrape_assist_batch_via_api(academic_year, institution, target_institution, pending):
+                completed.add(major)
+                yield finish(major, result)
+            return
+        except AssistApiError as e:
+            if not settings.ASSIST_HTTP_FALLBACK_TO_SELENIUM:
+                raise Exception(f"ASSIST.org batch scraping failed: {str(e)}")
+            print(f"⚠️ ASSIST API backend failed ({str(e)}), falling back to Selenium")
     
-    # Retry mechanism for page loading
-    max_page_retries = 2
-    page_retry = 0
-    
-    while page_retry < max_page_retries:
+    if pending is not None:
+        pending = [major for major in pending if major not in completed]
+    for major, result in _scrape_batch_with_selenium(academic_year, institution, target_institution, pending):
+        yield finish(major, result)
+
+def _scrape_assist_with_selenium(academic_year, institution, target_institution, major_filter, on_progress=None):
+    # Lease a warm driver instead of launching Chrome for every request
+    with get_driver_pool().lease() as driver:
+        if on_progress:
+            on_progress("browser_leased")
+        with track_network_usage(driver, label=major_filter):
+            return _scrape_with_driver(driver, academic_year, institution, target_institution, major_filter,
+                                       on_progress)
+
+def _scrape_batch_with_selenium(academic_year, institution, target_institution, majors):
+    """One leased driver, one trip through the form, then one report per major"""
+    with get_driver_pool().lease() as driver, track_network_usage(driver, label="batch"):
+        wait = WebDriverWait(driver, 20)
+        step_timings = {}
         try:
-            page_retry += 1
-            print(f"🔄 Page load attempt {page_retry}/{max_page_retries}")
-            driver.get("https://assist.org/")
-            
-            # Verify page loaded
-            wait = WebDriverWait(driver, 20)
-            wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-            print(f"✅ ASSIST.org page loaded successfully")
-            break
-            
+            _navigate_to_major_list(driver, wait, academic_year, institution, target_institution, step_timings)
         except Exception as e:
-            print(f"❌ Page load attempt {page_retry} failed: {e}")
-            if page_retry >= max_page_retries:
-                driver.quit()
-                raise Exception(f"Failed to load ASSIST.org after {max_page_retries} attempts: {e}")
-            
-            # Wait before retry
-            time.sleep(3)
+            print(f"❌ Selenium error during batch navigation: {str(e)}")
+            raise Exception(f"ASSIST.org batch scraping failed: {str(e)}")
+        print(f"⏱️ Batch navigation timings (s): {step_timings}")
+        
+        if majors is None:
+            # Walk the unfiltered list by position; labels become the major names
+            _clear_major_filter(driver)
+            labels = _major_labels(driver)
+            print(f"📚 {len(labels)} majors in this agreement")
+            for index, label in enumerate(labels):
+                yield label, _scrape_major(
+                    driver, wait, academic_year, institution, target_institution, label, {}, row_index=index
+                )
+        else:
+            for major in majors:
+                yield major, _scrape_major(driver, wait, academic_year, institution, target_institution, major, {})
 
-    wait = WebDriverWait(driver, 20)
+@contextmanager
+def _timed_step(name, step_timings):
+    """Record a scraper step's latency into the scraper.step.* histograms"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        step_timings[name] = round(elapsed, 3)
+        metrics.observe(f"scraper.step.{name}_seconds", elapsed)
+
+def _xpath_literal(value):
+    """Quote a string for use inside an XPath expression (handles apostrophes)"""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    return "concat('" + value.replace("'", "', \"'\", '") + "')"
+
+def _major_rows(driver):
+    return driver.find_elements(By.CSS_SELECTOR, ".viewByRowColRadio")
+
+def _major_labels(driver):
+    """Visible text of each row in the major list, in list order"""
+    return driver.execute_script(
+        "return Array.from(document.querySelectorAll('.viewByRowColRadio')).map(r =>"
+        " (r.getAttribute('aria-label') || (r.closest('label') || r.parentElement || r).textContent || '').trim());"
+    )
+
+def _major_list_filtered(driver, wanted):
+    """(labels,) once every row left in the major list matches `wanted` - possibly none - else False"""
+    labels = _major_labels(driver)
+    return (labels,) if all(wanted in label.lower() for label in labels) else False
+
+def _populated_report_html(driver):
+    """
+    outerHTML of the report container once it has rendered articulation rows, else False.
+    The rendered rows are tagged so switching majors waits for the next report
+    instead of re-reading the previous one.
+    """
+    return driver.execute_script(
+        "const c = document.querySelector('.reportContainer');"
+        "const row = c && c.querySelector('.groupContainer, .articRow');"
+        "if (!row || row.hasAttribute('data-scraped')) return false;"
+        "const html = c.outerHTML;"
+        "row.setAttribute('data-scraped', '');"
+        "return html;"
+    )
 
+def _select_academic_year(driver, wait, left_panel, academic_year):
+    year_dropdown = left_panel.find_element(By.CSS_SELECTOR, "ng-select[formcontrolname='academicYear'] .ng-select-container")
+    year_dropdown.click()
+    year_option = wait.until(EC.element_to_be_clickable((By.XPATH, f"//div[@role='option' and contains(@class, 'ng-option') and .={_xpath_literal(academic_year)}]")))
+    year_option.click()
+    # The option list closes once Angular has registered the selection
+    wait.until(EC.invisibility_of_element_located((By.CSS_SELECTOR, "ng-dropdown-panel")))
+
+def _select_institution(driver, wait, institution):
+    # Click the wrapper div to open the dropdown, then the option once it renders
+    wrapper = wait.until(EC.element_to_be_clickable(
+        (By.CSS_SELECTOR, ".mat-mdc-text-field-wrapper.mdc-text-field--filled")
+    ))
+    wrapper.click()
+    dropdown_option = wait.until(EC.element_to_be_clickable(
+        (By.XPATH, f"//span[contains(@class, 'option__primary-text') and contains(text(), {_xpath_literal(institution)})]")
+    ))
+    dropdown_option.click()
+    # Selecting a sending institution enables the 'Agreements with Other Institutions' field
+    wait.until(lambda d: len(d.find_elements(By.CSS_SELECTOR, ".mat-mdc-text-field-wrapper.mdc-text-field--filled")) >= 2)
+
+def _select_target_institution(driver, wait, target_institution):
+    wrappers = driver.find_elements(By.CSS_SELECTOR, ".mat-mdc-text-field-wrapper.mdc-text-field--filled")
+    if len(wrappers) < 2:
+        raise Exception("Could not find the target institution input wrapper.")
+    target_wrapper = wrappers[1]  # The second wrapper is for 'Agreements with Other Institutions'
+    target_wrapper.click()
+
+    # Typing the whole name still fires per-key input events for the autocomplete filter
+    target_input = target_wrapper.find_element(By.XPATH, ".//input")
+    target_input.clear()
+    target_input.send_keys(target_institution)
+
+    option_xpath = f"//span[contains(text(), {_xpath_literal('To: ' + target_institution)})]"
+    dropdown_option = wait.until(EC.presence_of_element_located((By.XPATH, option_xpath)))
+    # Use JavaScript to click the option to avoid any overlay issues
+    driver.execute_script("arguments[0].click();", dropdown_option)
+    # The selection is registered once the autocomplete panel closes and the button enables
+    wait.until(EC.invisibility_of_element_located((By.XPATH, option_xpath)))
+
+def _wait_for_major_list(wait):
+    # The major list is ready once its filter box and at least one major row have rendered
+    wait.until(EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Filter Major List']")))
+    wait.until(lambda d: len(_major_rows(d)) > 0)
+
+def _open_agreements(driver, wait):
+    view_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'View Agreements')]")))
+    view_btn.click()
+    _wait_for_major_list(wait)
+
+def _deep_link_major_list(driver, wait, academic_year, institution, target_institution):
+    """Load the agreement's major list by URL; raises AssistApiError if the IDs can't be resolved"""
+    ids = assist_id_resolver.resolve_agreement(academic_year, institution, target_institution)
+    driver.get(agreement_url(*ids))
+    _wait_for_major_list(wait)
+
+def _deep_link_report(driver, wait, academic_year, institution, target_institution, major_filter, step_timings):
+    """
+    Load one major's report by URL, skipping the form and the major filter.
+    Returns the report's outerHTML, or None so the caller can navigate instead.
+    """
+    if not settings.ASSIST_DEEP_LINK_ENABLED:
+        return None
     try:
-        # Find the left panel form
-        left_panel = wait.until(EC.presence_of_element_located((By.ID, "agreementInformationForm")))
-
-        # Print debug info about form elements
-        ng_selects = left_panel.find_elements(By.TAG_NAME, "ng-select")
-        print(f"Found ng-selects in left panel: {len(ng_selects)}")
-        for idx, elem in enumerate(ng_selects):
-            print(f"ng-select {idx}:")
-            print("formcontrolname:", elem.get_attribute("formcontrolname"))
-
-        omniselects = left_panel.find_elements(By.TAG_NAME, "awc-omniselect")
-        print(f"Found awc-omniselects in left panel: {len(omniselects)}")
-
-        # 1. Select Academic Year
-        print(f"Selecting academic year: {academic_year}...")
-        year_dropdown = left_panel.find_element(By.CSS_SELECTOR, "ng-select[formcontrolname='academicYear'] .ng-select-container")
-        year_dropdown.click()
-        time.sleep(1)
-        year_option = wait.until(EC.element_to_be_clickable((By.XPATH, f"//div[@role='option' and contains(@class, 'ng-option') and .='{academic_year}']")))
-        year_option.click()
-        print("Academic year selected.")
-
-        # 2. Select Institution
-        print(f"Selecting institution: {institution}...")
-        try:
-            # 1. Click the wrapper div to open the dropdown
-            wrapper = wait.until(EC.element_to_be_clickable(
-                (By.CSS_SELECTOR, ".mat-mdc-text-field-wrapper.mdc-text-field--filled")
-            ))
-            print("Institution input wrapper found, clicking...")
-            wrapper.click()
-            time.sleep(1)  # Wait for dropdown to open
-
-            # 2. Wait for the dropdown options to appear and click the desired one
-            dropdown_option = wait.until(EC.element_to_be_clickable(
-                (By.XPATH, f"//span[contains(@class, 'option__primary-text') and contains(text(), '{institution}')]")
-            ))
-            print("Dropdown option found, clicking...")
-            dropdown_option.click()
-            print("Institution selected.")
-
-        except Exception as inst_error:
-            print(f"Institution selection failed: {inst_error}")
-            print(f"Current URL: {driver.current_url}")
-            print(f"Page title: {driver.title}")
-            raise
-
-        # 3. Select Target Institution (Agreements with Other Institutions)
-        print(f"Selecting target institution: {target_institution}...")
-        try:
-            # Find the wrapper for the 'Agreements with Other Institutions' field
-            wrappers = driver.find_elements(By.CSS_SELECTOR, ".mat-mdc-text-field-wrapper.mdc-text-field--filled")
-            if len(wrappers) < 2:
-                raise Exception("Could not find the target institution input wrapper.")
-            target_wrapper = wrappers[1]  # The second wrapper is for 'Agreements with Other Institutions'
-            print("Target institution input wrapper found")
-
-            # Click wrapper to open dropdown
-            print("Clicking wrapper to open dropdown...")
-            target_wrapper.click()
-            time.sleep(1)  # Wait for dropdown to open
-
-            # Input the name to filter the dropdown options
-            print("Finding input field and typing institution name...")
-            target_input = target_wrapper.find_element(By.XPATH, ".//input")
-            target_input.clear()
-            
-            # Type the institution name character by character
-            for char in target_institution:
-                target_input.send_keys(char)
-                time.sleep(0.05)
-            print(f"Typed: {target_institution}")
-            
-            time.sleep(2)  # Wait for dropdown options to filter
-
-            # Click the correct option from the filtered dropdown (use the working selector)
-            print("Looking for and clicking the dropdown option...")
-            dropdown_option = wait.until(EC.presence_of_element_located((By.XPATH, f"//span[contains(text(), 'To: {target_institution}')]")))
-            print("Target institution dropdown option found, clicking with JavaScript...")
-            # Use JavaScript to click the option to avoid any overlay issues
-            driver.execute_script("arguments[0].click();", dropdown_option)
-            print("Target institution selected.")
-            time.sleep(1)  # Wait for selection to register
-
-        except Exception as tgt_error:
-            print(f"Target institution selection failed: {tgt_error}")
-            print(f"Current URL: {driver.current_url}")
-            print(f"Page title: {driver.title}")
-            raise
-
-        # 4. Click "View Agreements"
-        print("Clicking View Agreements...")
-        view_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'View Agreements')]")))
-        view_btn.click()
-        print("View Agreements clicked.")
-
-        # Wait for results to load
-        time.sleep(5)
-        print(driver.title)
-
-        # 5. Input major name in the filter major box
-        print(f"Filtering for major: {major_filter}")
-        filter_input = wait.until(EC.presence_of_element_located((By.XPATH, "//input[@placeholder='Filter Major List']")))
+        with _timed_step("deep_link_report", step_timings):
+            ids = assist_id_resolver.resolve_agreement(academic_year, institution, target_institution)
+            report_key = assist_id_resolver.resolve_report_key(academic_year, institution, target_institution, major_filter)
+            driver.get(agreement_url(*ids, report_key=report_key))
+            report_html = wait.until(_populated_report_html)
+        metrics.inc("scraper.deep_link.reports")
+        return report_html
+    except Exception as e:
+        print(f"⚠️ Deep link to the {major_filter} report failed ({str(e)}), navigating instead")
+        metrics.inc("scraper.deep_link.failures")
+        # A renamed or withdrawn major would keep failing on the cached key
+        assist_id_resolver.invalidate(major_report_key(academic_year, institution, target_institution, major_filter))
+        return None
+
+def _filter_major(driver, wait, major_filter):
+    """Filter the major list by name; returns the row to open - the exact label if one is listed"""
+    filter_input = driver.find_element(By.XPATH, "//input[@placeholder='Filter Major List']")
+    filter_input.clear()
+    filter_input.send_keys(major_filter)
+    # Wait for the list to re-render with only matching rows; comparing row counts
+    # misses the switch between two filters that match the same number of majors.
+    # A list that never filters must not fall through to clicking an unrelated row.
+    wanted = major_filter.strip().lower()
+    try:
+        labels, = wait.until(lambda d: _major_list_filtered(d, wanted))
+    except TimeoutException:
+        raise Exception(f"ASSIST.org's major list didn't filter to '{major_filter}'")
+    if not labels:
+        raise Exception(f"No majors on ASSIST.org match '{major_filter}'")
+    # "Mathematics, B.A." also lists "Applied Mathematics, B.A.", possibly first
+    return major_label_index(labels, major_filter)
+
+def _clear_major_filter(driver):
+    filter_input = driver.find_element(By.XPATH, "//input[@placeholder='Filter Major List']")
+    if filter_input.get_attribute("value"):
         filter_input.clear()
-        filter_input.send_keys(major_filter)
-        time.sleep(2)  # Wait for the filter to apply
-        print("Major filter applied.")
+        filter_input.send_keys(" ", Keys.BACKSPACE)  # clear() alone doesn't fire Angular's input event
+
+def _open_major_report(driver, wait, row_index=0):
+    radio = wait.until(lambda d: len(_major_rows(d)) > row_index and _major_rows(d)[row_index])
+    wait.until(EC.element_to_be_clickable(radio)).click()
+    return wait.until(_populated_report_html)
+
+def _navigate_to_major_list(driver, wait, academic_year, institution, target_institution, step_timings):
+    """Open the agreement's major list by URL, or by filling in year, source and target"""
+    if settings.ASSIST_DEEP_LINK_ENABLED:
+        try:
+            print("Loading the agreement page directly...")
+            with _timed_step("deep_link_agreement", step_timings):
+                _deep_link_major_list(driver, wait, academic_year, institution, target_institution)
+            metrics.inc("scraper.deep_link.agreements")
+            return
+        except Exception as e:
+            print(f"⚠️ Deep link to the agreement failed ({str(e)}), filling in the form instead")
+            metrics.inc("scraper.deep_link.failures")
+            load_assist_home(driver, retries=1)
 
-        # 6. Click the first 'viewByRowColRadio' button
-        print("Clicking the first major radio button...")
-        first_radio = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".viewByRowColRadio")))
-        first_radio.click()
-        print("First major selected.")
+    # Find the left panel form
+    left_panel = wait.until(EC.presence_of_element_located((By.ID, "agreementInformationForm")))
+
+    # 1. Select Academic Year
+    print(f"Selecting academic year: {academic_year}...")
+    with _timed_step("select_year", step_timings):
+        _select_academic_year(driver, wait, left_panel, academic_year)
+
+    # 2. Select Institution
+    print(f"Selecting institution: {institution}...")
+    try:
+        with _timed_step("select_institution", step_timings):
+            _select_institution(driver, wait, institution)
+    except Exception as inst_error:
+        print(f"Institution selection failed: {inst_error}")
+        print(f"Current URL: {driver.current_url}")
+        raise
+
+    # 3. Select Target Institution (Agreements with Other Institutions)
+    print(f"Selecting target institution: {target_institution}...")
+    try:
+        with _timed_step("select_target", step_timings):
+            _select_target_institution(driver, wait, target_institution)
+    except Exception as tgt_error:
+        print(f"Target institution selection failed: {tgt_error}")
+        print(f"Current URL: {driver.current_url}")
+        raise
+
+    # 4. Click "View Agreements" and wait for the major list
+    print("Clicking View Agreements...")
+    with _timed_step("view_agreements", step_timings):
+        _open_agreements(driver, wait)
+
+def _scrape_major(driver, wait, academic_year, institution, target_institution, major_filter, step_timings, row_index=None,
+                  on_progress=None, report_html=None):
+    """
+    Open one major's report from the major list and parse it.
+    With row_index, click that row of the unfiltered list instead of filtering by name;
+    with report_html, parse an already loaded report.
+    """
+    try:
+        if report_html is None:
+            if row_index is None:
+                # 5. Input major name in the filter major box
+                print(f"Filtering for major: {major_filter}")
+                with _timed_step("filter_major", step_timings):
+                    row_index = _filter_major(driver, wait, major_filter)
+
+            # 6. Click the major's 'viewByRowColRadio' button and wait for the report to render
+            print("Clicking the major radio button...")
+            with _timed_step("load_report", step_timings):
+                report_html = _open_major_report(driver, wait, row_index)
+        if on_progress:
+            on_progress("major_selected")
 
         # 7. Scrape and parse the requirements
         print(f"\n===== {major_filter} Transfer Requirements =====")
-        # Wait for the report container to be present
-        report_container = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, ".reportContainer")))
-        
-        # Get the HTML of the entire report container
-        report_html = report_container.get_attribute('outerHTML')
-        soup = BeautifulSoup(report_html, 'html.parser')
-
-        def extract_course_info(course_elem):
-            """Extract course code, title, and units from a course element"""
-            # Look for course code in prefixCourseNumber class
-            code_elem = course_elem.find('div', class_='prefixCourseNumber')
-            if not code_elem:
-                # Fall back to courseCode class
-                code_elem = course_elem.find('div', class_=lambda c: c and 'courseCode' in c)
-            
-            # Look for course title and units in the full text
-            full_text = course_elem.get_text(strip=True)
-            code = code_elem.get_text(strip=True) if code_elem else ''
-            
-            # Extract title and units from the full text
-            if code and code in full_text:
-                # Remove the code from the beginning
-                remaining = full_text.replace(code, '', 1).strip()
-                
-                # Look for units pattern (e.g., "4.00units" or "5.00 units")
-                units_match = re.search(r'(\d+\.?\d*)\s*units?', remaining, re.IGNORECASE)
-                if units_match:
-                    units_part = units_match.group(1) + ' units'
-                    # Extract title by removing units from the end
-                    title = remaining[:units_match.start()].strip()
-                    # Clean up common suffixes/prefixes in title
-                    title = re.sub(r'\s*-\s*$', '', title)  # Remove trailing dash
-                else:
-                    title = remaining
-                    units_part = ''
-            else:
-                title = ''
-                units_part = ''
-            
-            return code, title, units_part
-
-        def parse_articulation_structure(container):
-            """Parse the articulation agreement structure"""
-            sections = []
-            
-            # Find group containers which represent sections
-            group_containers = container.find_all('div', class_='groupContainer')
-            
-            for group_container in group_containers:
-                full_text = group_container.get_text(strip=True)
-                
-                # Check for HIGHLY RECOMMENDED section
-                if 'HIGHLY RECOMMENDED' in full_text:
-                    section = {
-                        'number': 'HIGHLY_RECOMMENDED',
-                        'title': 'Highly Recommended',
-                        'subsections': [],
-                        'structure': 'recommended'
-                    }
-                    
-                    # Look for numbered subsections within HIGHLY RECOMMENDED
-                    subsection_containers = group_container.find_all('div', class_='sectionContainer')
-                    if not subsection_containers:
-                        # Fallback: look for any containers with section numbers
-                        subsection_containers = group_container.find_all('div', class_='groupContainer')
-                    
-                    for subsection_container in subsection_containers:
-                        subsection_text = subsection_container.get_text(strip=True)
-                        
-                        # Look for numbered subsections like "2Complete A"
-                        if re.match(r'\d+Complete', subsection_text):
-                            subsection_number = re.match(r'(\d+)', subsection_text).group(1)
-                            
-                            subsection = {
-                                'number': subsection_number,
-                                'title': subsection_text.split('Complete')[1].strip() if 'Complete' in subsection_text else 'Complete Requirements',
-                                'options': [],
-                                'structure': 'choice'
-                            }
-                            
-                            # Find option groups (A, B, etc.)
-                            option_containers = subsection_container.find_all('div', class_='sectionMain')
-                            if not option_containers:
-                                # Fallback: look for any div that might contain options
-                                option_containers = subsection_container.find_all('div', recursive=True)
-                                option_containers = [div for div in option_containers if div.find('div', class_='courseLine')]
-                            
-                            option_letter = 'A'
-                            for option_container in option_containers:
-                                option_text = option_container.get_text(strip=True)
-                                
-                                # Skip if this doesn't look like an option section
-                                if not option_container.find('div', class_='courseLine'):
-                                    continue
-                                
-                                option = {
-                                    'letter': option_letter,
-                                    'courses': []
-                                }
-                                
-                                # Find course lines in this option
-                                course_lines = option_container.find_all('div', class_='courseLine')
-                                for course_line in course_lines:
-                                    # Check if this is a receiving course (target institution side)
-                                    if course_line.find_parent('div', class_='rowReceiving'):
-                                        code, title, units = extract_course_info(course_line)
-                                        if code:
-                                            option['courses'].append({
-                                                'code': code,
-                                                'title': title,
-                                                'units': units,
-                                                'type': 'receiving'
-                                            })
-                                
-                                if option['courses']:
-                                    subsection['options'].append(option)
-                                    option_letter = chr(ord(option_letter) + 1)
-                            
-                            if subsection['options']:
-                                section['subsections'].append(subsection)
-                    
-                    if section['subsections']:
-                        sections.append(section)
-                
-                # Check if this is section 1 (Complete the following)
-                elif full_text.startswith('1Complete the following'):
-                    section = {
-                        'number': '1',
-                        'title': 'Complete the following',
-                        'courses': [],
-                        'structure': 'sequence'
-                    }
-                    
-                    # Find all course rows in this section
-                    course_lines = group_container.find_all('div', class_='courseLine')
-                    
-                    # For receiving courses (target institution requirements)
-                    for course_line in course_lines:
-                        # Check if this is a receiving course (target institution side)
-                        if course_line.find_parent('div', class_='rowReceiving'):
-                            code, title, units = extract_course_info(course_line)
-                            if code:
-                                section['courses'].append({
-                                    'code': code,
-                                    'title': title,
-                                    'units': units,
-                                    'type': 'receiving'
-                                })
-                    
-                    sections.append(section)
-                    
-                # Check if this is section 2 (Complete A or B) - but not part of HIGHLY RECOMMENDED
-                elif full_text.startswith('2Complete') and ('A' in full_text and 'B' in full_text) and 'HIGHLY RECOMMENDED' not in full_text:
-                    section = {
-                        'number': '2',
-                        'title': 'Complete A or B',
-                        'options': [],
-                        'structure': 'choice'
-                    }
-                    
-                    # Find sections marked with emphasis--section
-                    section_mains = group_container.find_all('div', class_='sectionMain')
-                    
-                    option_letter = 'A'
-                    for section_main in section_mains:
-                        option = {
-                            'letter': option_letter,
-                            'courses': []
-                        }
-                        
-                        # Find course lines in this section
-                        course_lines = section_main.find_all('div', class_='courseLine')
-                        for course_line in course_lines:
-                            # Check if this is a receiving course (target institution side)
-                            if course_line.find_parent('div', class_='rowReceiving'):
-                                code, title, units = extract_course_info(course_line)
-                                if code:
-                                    option['courses'].append({
-                                        'code': code,
-                                        'title': title,
-                                        'units': units
-                                    })
-                        
-                        if option['courses']:
-                            section['options'].append(option)
-                            option_letter = chr(ord(option_letter) + 1)
-                    
-                    sections.append(section)
-            
-            return sections
-
-        def get_sending_requirements(container):
-            """Get the sending institution (source college) course requirements"""
-            # Find all bracket wrappers which contain the source institution course requirements
-            bracket_wrappers = container.find_all('div', class_='bracketWrapper')
-            
-            # Group courses by their section/requirement
-            section_groups = {}
-            
-            # Also look for articulation rows that contain course mappings
-            artic_rows = container.find_all('div', class_='articRow')
-            
-            for artic_row in artic_rows:
-                # Get the target institution course this fulfills
-                receiving_course = artic_row.find('div', class_='rowReceiving')
-                if receiving_course:
-                    target_course_line = receiving_course.find('div', class_='courseLine')
-                    if target_course_line:
-                        target_code, target_title, target_units = extract_course_info(target_course_line)
-                        
-                        # Create a key for this target course
-                        if target_code:
-                            key = f"{target_code}"
-                            if key not in section_groups:
-                                section_groups[key] = []
-                            
-                            # Get source institution courses that fulfill this requirement
-                            sending_side = artic_row.find('div', class_='rowSending')
-                            if sending_side:
-                                # Look for bracket wrappers (OR groups)
-                                bracket_wrappers_in_row = sending_side.find_all('div', class_='bracketWrapper')
-                                
-                                if bracket_wrappers_in_row:
-                                    # Handle OR groups
-                                    for wrapper in bracket_wrappers_in_row:
-                                        group = []
-                                        course_lines = wrapper.find_all('div', class_='courseLine')
-                                        for course_line in course_lines:
-                                            code, title, units = extract_course_info(course_line)
-                                            if code:
-                                                group.append({
-                                                    'code': code,
-                                                    'title': title,
-                                                    'units': units
-                                                })
-                                        
-                                        if group:
-                                            section_groups[key].append(group)
-                                else:
-                                    # Handle single courses (no OR groups)
-                                    course_lines = sending_side.find_all('div', class_='courseLine')
-                                    if course_lines:
-                                        group = []
-                                        for course_line in course_lines:
-                                            code, title, units = extract_course_info(course_line)
-                                            if code:
-                                                group.append({
-                                                    'code': code,
-                                                    'title': title,
-                                                    'units': units
-                                                })
-                                        
-                                        if group:
-                                            section_groups[key].append(group)
-                                    else:
-                                        # No course articulated
-                                        section_groups[key].append([{
-                                            'code': 'NO_COURSE',
-                                            'title': 'No Course Articulated',
-                                            'units': ''
-                                        }])
-            
-            # Fallback: use the original bracket wrapper method for any missed courses
-            for wrapper in bracket_wrappers:
-                # Find parent articRow to determine which target requirement this fulfills
-                parent_row = wrapper.find_parent('div', class_='articRow')
-                if parent_row:
-                    # Get the target institution course this fulfills
-                    receiving_course = parent_row.find('div', class_='rowReceiving')
-                    if receiving_course:
-                        target_course_line = receiving_course.find('div', class_='courseLine')
-                        if target_course_line:
-                            target_code, target_title, target_units = extract_course_info(target_course_line)
-                            key = f"{target_code}"
-                            
-                            # Only add if we haven't already processed this target course
-                            if key not in section_groups:
-                                section_groups[key] = []
-                                
-                                # Get source institution courses in this option
-                                group = []
-                                course_lines = wrapper.find_all('div', class_='courseLine')
-                                for course_line in course_lines:
-                                    code, title, units = extract_course_info(course_line)
-                                    if code:
-                                        group.append({
-                                            'code': code,
-                                            'title': title,
-                                            'units': units
-                                        })
-                                
-                                if group:
-                                    section_groups[key].append(group)
-            
-            return section_groups
-
-        # Parse the data
-        sections = parse_articulation_structure(soup)
-        sending_requirements = get_sending_requirements(soup)
-        
+        with _timed_step("parse_report", step_timings):
+            sections, sending_requirements = parse_report(report_html)
+        print(f"⏱️ Scraper step timings (s): {step_timings}")
+
         # Create structured data to return
         result = {
             'academic_year': academic_year,
@@ -671,11 +498,33 @@ def _scrape_assist_with_selenium(academic_year, institution, target_institution,
             "error": str(e),
             "data": {}
         }
-    finally:
-        try:
-            driver.quit()
-        except:
-            pass  # Ignore errors when closing driver
+
+def _scrape_with_driver(driver, academic_year, institution, target_institution, major_filter, on_progress=None):
+    """Open the report on a leased driver that is on the landing page, by URL when possible"""
+    wait = WebDriverWait(driver, 20)
+    step_timings = {}
+
+    report_html = _deep_link_report(driver, wait, academic_year, institution, target_institution, major_filter,
+                                    step_timings)
+    if report_html is not None:
+        if on_progress:
+            on_progress("agreement_loaded")
+        return _scrape_major(driver, wait, academic_year, institution, target_institution, major_filter, step_timings,
+                             on_progress=on_progress, report_html=report_html)
+
+    try:
+        _navigate_to_major_list(driver, wait, academic_year, institution, target_institution, step_timings)
+    except Exception as e:
+        print(f"❌ Selenium error during scraping: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "data": {}
+        }
+    if on_progress:
+        on_progress("agreement_loaded")
+    return _scrape_major(driver, wait, academic_year, institution, target_institution, major_filter, step_timings,
+                         on_progress=on_progress)
 
 def print_formatted_output(sections, source_requirements):
     """Print the De Anza College course requirements (right side data)"""
@@ -732,29 +581,54 @@ def main():
     parser.add_argument('--academic-year', required=True, help='Academic year (e.g., 2024-2025)')
     parser.add_argument('--institution', required=True, help='Source institution name')
     parser.add_argument('--target-institution', required=True, help='Target institution name')
-    parser.add_argument('--major', required=True, help='Major to filter for')
+    major_group = parser.add_mutually_exclusive_group(required=True)
+    major_group.add_argument('--major', help='Major to filter for')
+    major_group.add_argument('--majors', nargs='+', help='Several majors, scraped in one browser session')
+    major_group.add_argument('--all-majors', action='store_true', help='Every major in the agreement, in one browser session')
     parser.add_argument('--json-output', action='store_true', help='Output as JSON instead of formatted text')
+    parser.add_argument('--backend', choices=SCRAPER_BACKENDS, help='Scraper backend (defaults to ASSIST_SCRAPER_BACKEND)')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore cached articulation data')
     
     args = parser.parse_args()
     
-    # Scrape the data
-    data = scrape_assist_data(
-        academic_year=args.academic_year,
-        institution=args.institution,
-        target_institution=args.target_institution,
-        major_filter=args.major
-    )
+    if args.major:
+        # Scrape the data
+        data = scrape_assist_data(
+            academic_year=args.academic_year,
+            institution=args.institution,
+            target_institution=args.target_institution,
+            major_filter=args.major,
+            backend=args.backend,
+            use_cache=not args.no_cache
+        )
+        results = [(args.major, data)]
+    else:
+        # Printed as each major completes
+        results = scrape_assist_batch(
+            academic_year=args.academic_year,
+            institution=args.institution,
+            target_institution=args.target_institution,
+            majors=None if args.all_majors else args.majors,
+            backend=args.backend,
+            use_cache=not args.no_cache
+        )
     
-    if data is None:
-        print("Failed to scrape data. Please check the error messages above.")
-        return
+    import json
+    failures = 0
+    for major, result in results:
+        if not result.get("success"):
+            failures += 1
+            print(f"Failed to scrape {major}: {result.get('error')}")
+            continue
+        if args.json_output:
+            # One JSON document per line so batch output can be streamed
+            print(json.dumps(result) if not args.major else json.dumps(result, indent=2))
+        else:
+            # Pass the target_requirements (sections) to the print function
+            print_formatted_output(result['data']['target_requirements'], result['data']['source_requirements'])
     
-    if args.json_output:
-        import json
-        print(json.dumps(data, indent=2))
-    else:
-        # Pass the target_requirements (sections) to the print function
-        print_formatted_output(data['target_requirements'], data['source_requirements'])
+    if failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
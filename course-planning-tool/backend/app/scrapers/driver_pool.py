@@ -0,0 +1,500 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Any
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from app.core.config import settings
+from app.scrapers.request_blocking import configure_chrome_options, install_request_blocking
+
+logger = logging.getLogger(__name__)
+
+ASSIST_HOME_URL = "https://assist.org/"
+
+# Chrome/Chromium binaries - try common production paths
+CHROME_BINARY_PATHS = [
+    "/usr/bin/chromium",                # Chromium binary (from our Dockerfile)
+    "/usr/bin/chromium-browser",       # Alternative Chromium path
+    "/snap/bin/chromium",              # Snap package Chromium
+    "/usr/lib/chromium-browser/chromium-browser", # Another Ubuntu path
+    "/usr/bin/google-chrome",           # Chrome fallback
+    "/usr/bin/google-chrome-stable",   # Alternative Chrome path
+    "/opt/google/chrome/chrome",       # Another common Chrome path
+    "/usr/bin/chrome",                 # Generic chrome
+    "/opt/chrome/chrome",              # Alternative Chrome location
+]
+
+CHROMEDRIVER_PATHS = [
+    "/usr/bin/chromedriver",            # ChromeDriver from chromium-driver package (confirmed working)
+    "/usr/local/bin/chromedriver",      # Alternative path
+    "/opt/chromedriver/chromedriver",   # Another common path
+]
+
+
+class DriverPoolTimeout(Exception):
+    """Raised when no Chrome driver could be leased before the timeout"""
+
+
+def build_chrome_options() -> Options:
+    """Chrome options tuned for stability in containerized production environments"""
+    chrome_options = Options()
+
+    # Essential options for Docker/containerized environments
+    chrome_options.add_argument("--no-sandbox")                    # Critical for Docker/containers
+    chrome_options.add_argument("--disable-dev-shm-usage")         # Critical for limited memory
+    chrome_options.add_argument("--disable-gpu")                   # Disable GPU for headless
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-plugins")
+    chrome_options.add_argument("--disable-javascript")          # Faster, we only need DOM
+    chrome_options.add_argument("--disable-web-security")        # Avoid CORS issues
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    chrome_options.add_argument("--disable-background-timer-throttling")
+    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+    chrome_options.add_argument("--disable-renderer-backgrounding")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("--no-zygote")                   # Disable zygote process
+    chrome_options.add_argument("--disable-background-networking")
+    chrome_options.add_argument("--disable-default-apps")
+    chrome_options.add_argument("--disable-sync")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36")
+
+    # Enhanced stability options for production
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--allow-running-insecure-content")
+    chrome_options.add_argument("--disable-logging")
+    chrome_options.add_argument("--disable-dev-tools")
+    chrome_options.add_argument("--ignore-certificate-errors")
+    chrome_options.add_argument("--ignore-ssl-errors")
+    chrome_options.add_argument("--ignore-certificate-errors-spki-list")
+    chrome_options.add_argument("--disable-site-isolation-trials")
+    chrome_options.add_argument("--disable-features=VizDisplayCompositor,VizServiceDisplay")
+    chrome_options.add_argument("--memory-pressure-off")
+    chrome_options.add_argument("--max_old_space_size=4096")
+
+    # ALWAYS run headless in production (Render doesn't have display)
+    chrome_options.add_argument("--headless=new")  # Use new headless mode
+
+    # Advanced session persistence options
+    chrome_options.add_argument("--aggressive-cache-discard")
+    chrome_options.add_argument("--disable-hang-monitor")
+    chrome_options.add_argument("--disable-prompt-on-repost")
+    chrome_options.add_argument("--disable-client-side-phishing-detection")
+    chrome_options.add_argument("--disable-component-update")
+    chrome_options.add_argument("--disable-domain-reliability")
+
+    # Images, fonts and third-party origins are blocked here and over DevTools
+    # (headless Chrome ignores --disable-images / --disable-css)
+    configure_chrome_options(chrome_options)
+
+    chrome_binary = os.getenv("CHROME_BINARY_PATH")
+    if chrome_binary:
+        chrome_options.binary_location = chrome_binary
+    else:
+        # Auto-detect Chrome/Chromium binary
+        for path in CHROME_BINARY_PATHS:
+            if os.path.exists(path):
+                chrome_options.binary_location = path
+                break
+
+    return chrome_options
+
+
+def _resolve_chromedriver_path() -> str:
+    """Find ChromeDriver from the environment, common paths or the config default"""
+    chromedriver_path = os.getenv("CHROME_DRIVER_PATH")
+    if chromedriver_path:
+        return chromedriver_path
+    for path in CHROMEDRIVER_PATHS:
+        if os.path.exists(path):
+            return path
+    return settings.CHROME_DRIVER_PATH
+
+
+def load_assist_home(driver, retries: int = 2) -> None:
+    """Navigate to the ASSIST.org landing page and wait for the agreement form"""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            driver.get(ASSIST_HOME_URL)
+            WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located((By.ID, "agreementInformationForm"))
+            )
+            return
+        except Exception as e:
+            print(f"❌ ASSIST.org page load attempt {attempt}/{retries} failed: {e}")
+            if attempt >= retries:
+                raise Exception(f"Failed to load ASSIST.org after {retries} attempts: {e}")
+            time.sleep(1)
+
+
+def create_chrome_driver(max_retries: int = 3):
+    """
+    Launch a new Chrome WebDriver and load the ASSIST.org landing page.
+
+    Binary probing and the init retries live here so they are only paid
+    when the pool grows or recycles a driver, not on every request.
+    """
+    chrome_options = build_chrome_options()
+    chromedriver_path = _resolve_chromedriver_path()
+
+    print(f"🚀 Initializing Chrome WebDriver with enhanced stability...")
+    print(f"   ChromeDriver path: {chromedriver_path}")
+    print(f"   Chrome binary: {chrome_options.binary_location}")
+
+    driver = None
+    retry_count = 0
+
+    while retry_count < max_retries:
+        try:
+            retry_count += 1
+            print(f"🔄 Chrome initialization attempt {retry_count}/{max_retries}")
+
+            if chromedriver_path and os.path.exists(chromedriver_path):
+                service = Service(chromedriver_path)
+                driver = webdriver.Chrome(service=service, options=chrome_options)
+            else:
+                print(f"❌ ChromeDriver not found at: {chromedriver_path}")
+                # Fallback: let webdriver-manager handle it (for local development)
+                try:
+                    from webdriver_manager.chrome import ChromeDriverManager
+                    service = Service(ChromeDriverManager().install())
+                    driver = webdriver.Chrome(service=service, options=chrome_options)
+                except ImportError:
+                    # Last resort: try without service specification
+                    driver = webdriver.Chrome(options=chrome_options)
+            print(f"✅ Chrome WebDriver initialized successfully!")
+            break
+
+        except Exception as e:
+            print(f"❌ Chrome initialization attempt {retry_count} failed: {e}")
+            if retry_count >= max_retries:
+                raise Exception(f"Could not initialize Chrome WebDriver after {max_retries} attempts. Check if Chrome and ChromeDriver are properly installed and configured. Last error: {e}")
+            time.sleep(2)
+
+    if not driver:
+        raise Exception("Failed to initialize Chrome WebDriver - driver is None")
+
+    # Set aggressive timeouts for stability; explicit waits drive every scraper step,
+    # so no implicit wait (it would stall every find_elements that matches nothing)
+    driver.set_page_load_timeout(30)  # 30 second page load timeout
+    driver.implicitly_wait(0)
+    install_request_blocking(driver)
+
+    try:
+        load_assist_home(driver)
+    except Exception:
+        _quit_quietly(driver)
+        raise
+
+    return driver
+
+
+def _quit_quietly(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass  # Ignore errors when closing driver
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Resident memory of a process and all its descendants, in MB (Linux only)"""
+    if not os.path.isdir("/proc"):
+        return None
+
+    parents: Dict[int, int] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name: state, ppid, ... rss is the 22nd
+        fields = stat.rsplit(")", 1)[1].split()
+        pid = int(entry)
+        parents[pid] = int(fields[1])
+        rss_pages[pid] = int(fields[21])
+
+    if root_pid not in rss_pages:
+        return None
+
+    tree = {root_pid}
+    grew = True
+    while grew:
+        grew = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                grew = True
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    return sum(rss_pages[pid] for pid in tree) * page_size / (1024 * 1024)
+
+
+def _auto_pool_size(max_rss_mb: int) -> int:
+    """Size the pool from available memory when SCRAPER_POOL_SIZE is 0"""
+    available_mb = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available_mb = int(line.split()[1]) / 1024
+                    break
+    except OSError:
+        pass
+
+    cpu_bound = max(1, (os.cpu_count() or 1))
+    if not available_mb or max_rss_mb <= 0:
+        return min(2, cpu_bound)
+    return max(1, min(cpu_bound, int(available_mb // max_rss_mb)))
+
+
+class PooledDriver:
+    """A Chrome WebDriver owned by the pool, with its usage bookkeeping"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created_at = time.monotonic()
+
+    def rss_mb(self) -> Optional[float]:
+        try:
+            pid = self.driver.service.process.pid
+        except Exception:
+            return None
+        return _process_tree_rss_mb(pid)
+
+
+class ChromeDriverPool:
+    """
+    Bounded pool of warm, health-checked Chrome WebDrivers.
+
+    At most `size` browsers exist at once; callers beyond that wait for a
+    lease instead of launching another Chrome. Drivers are recycled after
+    `max_uses` leases or once their process tree exceeds `max_rss_mb`.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        max_uses: int = 25,
+        max_rss_mb: int = 1024,
+        lease_timeout: float = 120.0,
+        driver_factory: Callable[[], Any] = create_chrome_driver,
+    ):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+        self._driver_factory = driver_factory
+
+        self._cond = threading.Condition()
+        self._idle: List[PooledDriver] = []
+        self._total = 0  # idle + leased + being created/reset
+        self._closed = False
+
+        self._stats = {
+            "leases": 0,
+            "launched": 0,
+            "recycled": 0,
+            "discarded_unhealthy": 0,
+            "lease_timeouts": 0,
+            "lease_wait_seconds_total": 0.0,
+        }
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Lease a driver for the duration of a `with` block"""
+        pooled = self._acquire(self.lease_timeout if timeout is None else timeout)
+        broken = False
+        try:
+            yield pooled.driver
+        except Exception:
+            broken = not self._is_healthy(pooled)
+            raise
+        finally:
+            self._release(pooled, broken)
+
+    def prewarm(self, count: int) -> None:
+        """Launch drivers ahead of the first request, up to the pool size"""
+        for _ in range(min(count, self.size)):
+            with self._cond:
+                if self._closed or self._total >= self.size:
+                    return
+                self._total += 1
+            try:
+                pooled = self._launch()
+            except Exception as e:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                logger.warning(f"⚠️ Chrome driver prewarm failed: {e}")
+                return
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    def shutdown(self) -> None:
+        """Quit every idle driver; leased drivers are quit when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            _quit_quietly(pooled.driver)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "total": self._total,
+                "idle": len(self._idle),
+                "leased": self._total - len(self._idle),
+                "max_uses": self.max_uses,
+                "max_rss_mb": self.max_rss_mb,
+                **self._stats,
+            }
+
+    def _launch(self) -> PooledDriver:
+        pooled = PooledDriver(self._driver_factory())
+        with self._cond:
+            self._stats["launched"] += 1
+        return pooled
+
+    def _acquire(self, timeout: float) -> PooledDriver:
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            pooled = None
+            launch = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise Exception("Chrome driver pool is shut down")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._total < self.size:
+                        self._total += 1
+                        launch = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["lease_timeouts"] += 1
+                        raise DriverPoolTimeout(
+                            f"Timed out after {timeout:.0f}s waiting for a Chrome driver ({self.size} in use)"
+                        )
+                    self._cond.wait(remaining)
+
+            if launch:
+                try:
+                    pooled = self._launch()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(pooled):
+                self._discard(pooled, "discarded_unhealthy")
+                continue
+
+            with self._cond:
+                self._stats["leases"] += 1
+                self._stats["lease_wait_seconds_total"] += time.monotonic() - started
+            return pooled
+
+    def _release(self, pooled: PooledDriver, broken: bool) -> None:
+        pooled.uses += 1
+        if broken:
+            self._discard(pooled, "discarded_unhealthy")
+            return
+        # Resetting the page takes a round trip to ASSIST.org, so do it off the
+        # caller's thread; the driver still counts against the pool bound meanwhile.
+        threading.Thread(target=self._recycle_or_return, args=(pooled,), daemon=True).start()
+
+    def _recycle_or_return(self, pooled: PooledDriver) -> None:
+        if self._should_recycle(pooled):
+            self._discard(pooled, "recycled")
+            return
+        try:
+            load_assist_home(pooled.driver, retries=1)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not reset pooled Chrome driver: {e}")
+            self._discard(pooled, "discarded_unhealthy")
+            return
+        with self._cond:
+            if self._closed:
+                self._total -= 1
+                closed = True
+            else:
+                self._idle.append(pooled)
+                closed = False
+            self._cond.notify()
+        if closed:
+            _quit_quietly(pooled.driver)
+
+    def _should_recycle(self, pooled: PooledDriver) -> bool:
+        if self.max_uses and pooled.uses >= self.max_uses:
+            return True
+        if self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                logger.info(f"♻️ Recycling Chrome driver at {rss:.0f} MB RSS")
+                return True
+        return False
+
+    def _is_healthy(self, pooled: PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return document.readyState")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, pooled: PooledDriver, reason: str) -> None:
+        _quit_quietly(pooled.driver)
+        with self._cond:
+            self._total -= 1
+            self._stats[reason] += 1
+            self._cond.notify()
+
+
+_pool: Optional[ChromeDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> ChromeDriverPool:
+    """Process-wide driver pool, sized from settings on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                size = settings.SCRAPER_POOL_SIZE or _auto_pool_size(settings.SCRAPER_DRIVER_MAX_RSS_MB)
+                _pool = ChromeDriverPool(
+                    size=size,
+                    max_uses=settings.SCRAPER_DRIVER_MAX_USES,
+                    max_rss_mb=settings.SCRAPER_DRIVER_MAX_RSS_MB,
+                    lease_timeout=settings.SCRAPER_POOL_LEASE_TIMEOUT,
+                )
+    return _pool
+
+
+def shutdown_driver_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
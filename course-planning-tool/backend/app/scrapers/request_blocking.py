@@ -0,0 +1,170 @@
+import fnmatch
+import json
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# URL patterns Chrome can block per resource type. The DevTools protocol has no
+# allowlist, so types are blocked by what they look like on the wire.
+RESOURCE_TYPE_PATTERNS: Dict[str, List[str]] = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*"],
+    "Font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*", "*.m3u8*"],
+    "Stylesheet": ["*.css*"],
+}
+
+# Failures that mean the request never left the browser because we blocked it
+_BLOCKED_ERRORS = ("net::ERR_BLOCKED_BY_CLIENT", "net::ERR_NAME_NOT_RESOLVED")
+
+
+def _split_setting(value: str) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def allowed_hosts() -> List[str]:
+    return _split_setting(settings.SCRAPER_ALLOWED_HOSTS)
+
+
+def allowed_resource_types() -> List[str]:
+    return _split_setting(settings.SCRAPER_ALLOWED_RESOURCE_TYPES)
+
+
+def host_allowed(host: str) -> bool:
+    host = (host or "").lower()
+    if host in ("localhost", "127.0.0.1", ""):
+        return True
+    return any(fnmatch.fnmatch(host, pattern.lower()) for pattern in allowed_hosts())
+
+
+def blocked_url_patterns() -> List[str]:
+    allowed = set(allowed_resource_types())
+    patterns = []
+    for resource_type, type_patterns in RESOURCE_TYPE_PATTERNS.items():
+        if resource_type not in allowed:
+            patterns.extend(type_patterns)
+    return patterns
+
+
+def would_block(url: str, resource_type: Optional[str]) -> bool:
+    """Whether the filter blocks (or, when disabled, would have blocked) this request"""
+    parsed = urlparse(url or "")
+    if parsed.scheme in ("data", "blob", "about", "chrome"):
+        return False
+    if not host_allowed(parsed.hostname or ""):
+        return True
+    if resource_type and resource_type in RESOURCE_TYPE_PATTERNS and resource_type not in allowed_resource_types():
+        return True
+    return any(fnmatch.fnmatch(url, pattern) for pattern in blocked_url_patterns())
+
+
+def configure_chrome_options(chrome_options) -> None:
+    """
+    Launch flags for the filter. Hosts outside the allowlist resolve to nothing,
+    which covers every origin without having to enumerate third parties.
+    """
+    # Performance logs carry the Network.* events used for per-scrape accounting
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if not settings.SCRAPER_BLOCK_REQUESTS:
+        return
+    rules = ["MAP * ~NOTFOUND"] + [f"EXCLUDE {host}" for host in allowed_hosts()] + ["EXCLUDE localhost"]
+    chrome_options.add_argument(f"--host-resolver-rules={' , '.join(rules)}")
+
+
+def install_request_blocking(driver) -> None:
+    """Block disallowed resource types on this driver's page via the DevTools protocol"""
+    if not settings.SCRAPER_BLOCK_REQUESTS:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
+    except Exception as e:
+        # Filtering only saves bandwidth; a scrape must never fail because of it
+        logger.warning(f"⚠️ Could not enable request blocking: {e}")
+
+
+def _performance_events(driver) -> List[Dict[str, Any]]:
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return []
+    events = []
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if message.get("method", "").startswith("Network."):
+            events.append(message)
+    return events
+
+
+def summarize_network_events(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Requests made, blocked and bytes transferred from Network.* DevTools events"""
+    requests: Dict[str, Dict[str, Any]] = {}
+    summary = {
+        "requests": 0,
+        "requests_blocked": 0,
+        "blocked_by_type": {},
+        "blocked_hosts": {},
+        "bytes_transferred": 0,
+        # Bytes of requests the filter would have blocked (non-zero only when it is off)
+        "bytes_blockable": 0,
+    }
+
+    for event in events:
+        method = event.get("method")
+        params = event.get("params", {})
+        request_id = params.get("requestId")
+        if method == "Network.requestWillBeSent":
+            if request_id not in requests:
+                summary["requests"] += 1
+            requests[request_id] = {"url": params.get("request", {}).get("url", ""), "type": params.get("type")}
+        elif method == "Network.loadingFinished":
+            size = int(params.get("encodedDataLength") or 0)
+            summary["bytes_transferred"] += size
+            request = requests.get(request_id)
+            if request and would_block(request["url"], request["type"]):
+                summary["bytes_blockable"] += size
+        elif method == "Network.loadingFailed":
+            request = requests.get(request_id, {})
+            url = request.get("url", "")
+            blocked = params.get("blockedReason") or (
+                params.get("errorText") in _BLOCKED_ERRORS and would_block(url, params.get("type"))
+            )
+            if not blocked:
+                continue
+            summary["requests_blocked"] += 1
+            resource_type = params.get("type") or request.get("type") or "Other"
+            summary["blocked_by_type"][resource_type] = summary["blocked_by_type"].get(resource_type, 0) + 1
+            host = urlparse(url).hostname or "unknown"
+            summary["blocked_hosts"][host] = summary["blocked_hosts"].get(host, 0) + 1
+
+    return summary
+
+
+@contextmanager
+def track_network_usage(driver, label: str = "scrape"):
+    """
+    Report requests blocked and bytes transferred while the block runs.
+    Yields the summary dict, which is filled in when the block exits.
+    """
+    _performance_events(driver)  # Drop events from before this scrape (e.g. the pool's page reset)
+    summary: Dict[str, Any] = {}
+    try:
+        yield summary
+    finally:
+        summary.update(summarize_network_events(_performance_events(driver)))
+        metrics.inc("scraper.network.requests", summary["requests"])
+        metrics.inc("scraper.network.requests_blocked", summary["requests_blocked"])
+        metrics.observe("scraper.network.bytes_transferred", summary["bytes_transferred"])
+        if summary["bytes_blockable"]:
+            metrics.observe("scraper.network.bytes_blockable", summary["bytes_blockable"])
+        print(f"🌐 {label} network: {summary['requests']} requests, "
+              f"{summary['requests_blocked']} blocked {summary['blocked_by_type']}, "
+              f"{summary['bytes_transferred'] / 1024:.0f} KB transferred")
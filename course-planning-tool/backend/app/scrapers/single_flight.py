@@ -0,0 +1,176 @@
+import asyncio
+import copy
+import json
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_async_redis
+
+# Delete the lock only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Extend the lock only if we still own it
+_EXTEND_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    Within a process, waiters share an asyncio future. Across uvicorn
+    workers and hosts, a Redis lock elects one leader per key; the leader
+    publishes its result (or error) on a channel that followers subscribe
+    to. Without Redis, only in-process coalescing applies.
+    """
+
+    def __init__(self, namespace: str, lock_ttl_seconds: float, wait_timeout_seconds: float):
+        self.namespace = namespace
+        self.lock_ttl_ms = int(lock_ttl_seconds * 1000)
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Run `fn` once per key. `lookup` is consulted when another process
+        finished the work but its result message was missed (e.g. a cache read).
+        """
+        existing = self._inflight.get(key)
+        if existing is not None:
+            metrics.inc(f"{self.namespace}.single_flight.coalesced_local")
+            result = await asyncio.shield(existing)
+            return copy.deepcopy(result)
+
+        # The work runs as its own task, so a cancelled leader (e.g. a disconnected
+        # client) stops waiting without cancelling it for everyone coalesced onto it
+        flight = asyncio.ensure_future(self._run_distributed(key, fn, lookup))
+        self._inflight[key] = flight
+        flight.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(flight)
+
+    def _finish(self, key: str, flight: asyncio.Future) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.cancelled():
+            # Mark retrieved so a flight nobody is waiting on anymore doesn't log a warning
+            flight.exception()
+
+    async def _run_distributed(self, key, fn, lookup):
+        client = await get_async_redis()
+        if client is None:
+            return await fn()
+
+        lock_key = f"singleflight:{self.namespace}:lock:{key}"
+        channel = f"singleflight:{self.namespace}:done:{key}"
+        deadline = time.monotonic() + self.wait_timeout_seconds
+
+        while True:
+            token = uuid.uuid4().hex
+            try:
+                acquired = await client.set(lock_key, token, nx=True, px=self.lock_ttl_ms)
+            except redis.RedisError:
+                return await fn()
+
+            if acquired:
+                metrics.inc(f"{self.namespace}.single_flight.leader")
+                return await self._lead(client, lock_key, channel, token, fn)
+
+            metrics.inc(f"{self.namespace}.single_flight.coalesced_remote")
+            message = await self._follow(client, lock_key, channel, deadline)
+            if message is not None:
+                if message.get("ok"):
+                    return message["result"]
+                raise Exception(message.get("error", "Single-flight leader failed"))
+
+            if lookup is not None:
+                result = await lookup()
+                if result is not None:
+                    return result
+            if time.monotonic() >= deadline:
+                raise Exception(f"Timed out waiting for in-flight work on {key}")
+            # Leader vanished without a result; try to take over
+
+    async def _lead(self, client, lock_key, channel, token, fn):
+        keepalive = asyncio.create_task(self._keep_lock(client, lock_key, token))
+        message = None
+        try:
+            result = await fn()
+            message = {"ok": True, "result": result}
+            return result
+        except Exception as e:
+            message = {"ok": False, "error": str(e)}
+            raise
+        finally:
+            keepalive.cancel()
+            # Publish while still holding the lock: a follower that sees the lock gone
+            # treats the leader as vanished, and would run the work again itself
+            try:
+                if message is not None:
+                    await client.publish(channel, json.dumps(message, default=str))
+            except redis.RedisError:
+                pass  # Followers fall back to lookup once the lock is gone
+            try:
+                await client.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except redis.RedisError:
+                pass  # The lock expires on its own
+
+    async def _keep_lock(self, client, lock_key, token):
+        # Long scrapes outlive the lock TTL; keep extending while we hold it
+        while True:
+            await asyncio.sleep(self.lock_ttl_ms / 3000)
+            try:
+                await client.eval(_EXTEND_SCRIPT, 1, lock_key, token, self.lock_ttl_ms)
+            except redis.RedisError:
+                return
+
+    async def _follow(self, client, lock_key, channel, deadline) -> Optional[Dict[str, Any]]:
+        """Wait for the leader's message; None if the lock went away without one"""
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            while time.monotonic() < deadline:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message.get("type") == "message":
+                    return json.loads(message["data"])
+                # Checked after subscribing, so a release between polls is never missed for long
+                if not await client.exists(lock_key):
+                    # The leader publishes before releasing; take a message that arrived since the poll
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+                    if message and message.get("type") == "message":
+                        return json.loads(message["data"])
+                    return None
+            return None
+        except redis.RedisError:
+            return None
+        finally:
+            try:
+                await pubsub.unsubscribe(channel)
+                await pubsub.close()
+            except redis.RedisError:
+                pass
+
+
+scrape_flight = SingleFlight(
+    namespace="assist_scrape",
+    lock_ttl_seconds=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+    wait_timeout_seconds=settings.SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS,
+)
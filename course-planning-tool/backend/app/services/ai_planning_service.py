@@ -1,19 +1,20 @@
 import json
 import asyncio
-from typing import Dict, Any, List
+import time
+from typing import Dict, Any, AsyncIterator, List, Tuple
 from datetime import datetime
-import os
-from openai import OpenAI
 from app.core.config import settings
+from app.scrapers.articulation_model import Agreement
+from app.services.llm_client import LLMError, llm_client
+from app.services.prompt_builder import RequirementPromptBuilder
+from app.services.schedule_cache import schedule_cache, schedule_cache_key
+from app.utils.json_stream import JSONArrayStreamParser
 
 class AIPlanningService:
     def __init__(self):
-        # Set Perplexity API key (you'll need to add this to your settings)
-        self.api_key = getattr(settings, 'PERPLEXITY_API_KEY', os.getenv('PERPLEXITY_API_KEY'))
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.perplexity.ai"
-        ) if self.api_key else None
+        # Process-wide pooled client: instances are cheap and share connections, deadlines and the concurrency cap
+        self.client = llm_client
+        self.prompt_builder = RequirementPromptBuilder(settings.LLM_PROMPT_REQUIREMENTS_TOKEN_BUDGET)
     
     async def generate_quarter_schedule(self, planning_context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate a quarterly course schedule using REAL ASSIST.org data ONLY"""
@@ -63,8 +64,8 @@ STUDENT PROFILE:
 COMPLETED COURSES:
 {self._format_completed_courses(completed_courses)}
 
-AVAILABLE COURSES AT {profile.get('current_institution')} (choose from these only):
-{self._format_transfer_requirements(transfer_requirements)}
+REMAINING TRANSFER REQUIREMENTS AT {profile.get('current_institution')} (already checked against completed courses; choose from these courses only, preferring the cheapest path):
+{self._format_transfer_requirements(transfer_requirements, completed_courses, context.get("requirement_progress"))}
 
 CRITICAL INSTRUCTIONS:
 1. Plan ONLY for the {profile.get('planning_quarter', 'Fall')} quarter
@@ -139,140 +140,142 @@ Please respond with ONLY the JSON object, no additional explanation or text.
         
         return "\n".join(formatted)
     
-    def _format_transfer_requirements(self, requirements: Dict) -> str:
-        """Format transfer requirements for the prompt, including all available courses"""
+    def _format_transfer_requirements(self, requirements, completed_courses: List[Dict], progress=None) -> str:
+        """Format the unmet transfer requirements for the prompt, within the prompt token budget"""
         if not requirements:
             return "No specific transfer requirements loaded."
         
-        # Get source requirements (courses available at current institution)
-        source_requirements = requirements.get('source_requirements', {})
-        if not source_requirements:
-            return "No source requirements found in transfer data."
-        
-        # Extract all available courses from source requirements
-        all_courses = []
-        for requirement_name, course_data in source_requirements.items():
-            # Handle ASSIST.org data structure
-            if isinstance(course_data, list):
-                for option_group in course_data:
-                    if isinstance(option_group, list):
-                        for course in option_group:
-                            if isinstance(course, dict):
-                                all_courses.append(course)
-                            elif isinstance(course, str):
-                                all_courses.append({"code": course, "title": course})
-                    elif isinstance(option_group, dict):
-                        all_courses.append(option_group)
-                    elif isinstance(option_group, str):
-                        all_courses.append({"code": option_group, "title": option_group})
-            elif isinstance(course_data, dict):
-                if 'courses' in course_data:
-                    courses_list = course_data['courses']
-                    if isinstance(courses_list, list):
-                        all_courses.extend(courses_list)
-                elif 'code' in course_data or 'course_code' in course_data:
-                    all_courses.append(course_data)
-            elif isinstance(course_data, str):
-                all_courses.append({"code": course_data, "title": course_data})
-        
-        if not all_courses:
-            return "No courses found in transfer requirements."
-        
-        # Format courses for AI prompt
-        formatted_courses = []
-        for course_info in all_courses:
-            if isinstance(course_info, dict):
-                course_code = course_info.get('code') or course_info.get('course_code') or course_info.get('course_number')
-                course_name = course_info.get('title') or course_info.get('course_name') or course_info.get('name')
-                units = course_info.get('units') or course_info.get('credits')
-                
-                if not course_code:
-                    continue
-                
-                # Parse units if it's a string
-                if isinstance(units, str):
-                    import re
-                    units_match = re.search(r'(\d+\.?\d*)', units)
-                    units = units_match.group(1) if units_match else "3"
-                elif isinstance(units, (int, float)):
-                    units = str(int(float(units)))
-                else:
-                    units = "3"  # Default
-                
-                formatted_courses.append(f"- {course_code}: {course_name or course_code} ({units} units)")
-                
-            elif isinstance(course_info, str):
-                # Handle string format
-                import re
-                match = re.match(r'([A-Z]+\s*\d+[A-Z]*)\s*-?\s*([^(]+)?\s*\((\d+)\s*units?\)?', course_info)
-                if match:
-                    course_code = match.group(1).strip()
-                    course_name = match.group(2).strip() if match.group(2) else course_code
-                    units = match.group(3)
-                    formatted_courses.append(f"- {course_code}: {course_name} ({units} units)")
-                else:
-                    code_match = re.match(r'([A-Z]+\s*\d+[A-Z]*)', course_info)
-                    if code_match:
-                        course_code = code_match.group(1).strip()
-                        formatted_courses.append(f"- {course_code}: {course_code} (3 units)")
+        # Accept the parsed agreement, or scraper data that hasn't been parsed yet
+        agreement = requirements if isinstance(requirements, Agreement) else Agreement.from_dict(requirements)
         
-        if not formatted_courses:
-            return "No valid courses could be parsed from transfer requirements."
+        # Source requirements are the courses available at the current institution
+        if not agreement.articulations:
+            return "No source requirements found in transfer data."
         
-        return f"Available transfer requirement courses:\n" + "\n".join(formatted_courses[:20]) + \
-               (f"\n... and {len(formatted_courses) - 20} more courses" if len(formatted_courses) > 20 else "")
+        return self.prompt_builder.build(
+            agreement, [course.get('code', '') for course in completed_courses], progress
+        )
     
-    async def _call_perplexity_api(self, prompt: str) -> Dict[str, Any]:
-        """Call Perplexity API to generate schedule using OpenAI client"""
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [
+            {
+                "role": "system", 
+                "content": "You are an expert academic advisor. Always respond with valid JSON only, no additional text or explanations. Use current course catalogs and transfer requirements."
+            },
+            {
+                "role": "user", 
+                "content": prompt
+            }
+        ]
+    
+    def _completion_params(self) -> Dict[str, Any]:
+        return {
+            "model": settings.LLM_MODEL,
+            "temperature": 0.2,  # Low temperature for consistent, structured output
+            "max_tokens": 2000,
+            "top_p": 0.9,
+        }
+    
+    def _parse_schedule_content(self, content: str) -> Dict[str, Any]:
+        """Parse and validate the model's answer, tolerating a ```json fence around it"""
+        content = content.strip()
+        if content.startswith("```json"):
+            content = content[7:]
+        if content.endswith("```"):
+            content = content[:-3]
+        content = content.strip()
+        
         try:
-            messages = [
-                {
-                    "role": "system", 
-                    "content": "You are an expert academic advisor. Always respond with valid JSON only, no additional text or explanations. Use current course catalogs and transfer requirements."
-                },
-                {
-                    "role": "user", 
-                    "content": prompt
-                }
-            ]
-            
-            # Use OpenAI client with Perplexity base URL
-            response = self.client.chat.completions.create(
-                model="sonar-pro",
-                messages=messages,
-                temperature=0.2,  # Low temperature for consistent, structured output
-                max_tokens=2000,
-                top_p=0.9
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Clean up the content to extract just the JSON
-            content = content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-            
-            # Parse and return the JSON
             schedule_data = json.loads(content)
-            return schedule_data
-                
         except json.JSONDecodeError as e:
             raise Exception(f"Failed to parse Perplexity API response as JSON: {e}")
+        self._validate_schedule(schedule_data)
+        return schedule_data
+    
+    @staticmethod
+    def _validate_schedule(schedule_data: Any) -> None:
+        """Raise unless the answer has the quarter/courses shape the prompt asks for"""
+        if not isinstance(schedule_data, dict) or not isinstance(schedule_data.get("quarter"), dict):
+            raise Exception("AI schedule is missing the 'quarter' object")
+        courses = schedule_data["quarter"].get("courses")
+        if not isinstance(courses, list):
+            raise Exception("AI schedule is missing the 'quarter.courses' list")
+        for index, course in enumerate(courses):
+            if not isinstance(course, dict) or not course.get("course_code"):
+                raise Exception(f"AI schedule course {index} has no course_code")
+            units = course.get("units")
+            if isinstance(units, bool) or not isinstance(units, (int, float)):
+                raise Exception(f"AI schedule course {course['course_code']} has non-numeric units: {units!r}")
+    
+    async def _call_perplexity_api(self, prompt: str) -> Dict[str, Any]:
+        """Call Perplexity API to generate schedule using OpenAI client"""
+        try:
+            # Pooled client with a deadline, the per-worker concurrency cap and optional hedging
+            content = await self.client.complete(self._messages(prompt), **self._completion_params())
         except Exception as e:
             raise Exception(f"Perplexity API call failed: {str(e)}")
+        return self._parse_schedule_content(content)
+    
+    async def stream_quarter_schedule(
+        self, planning_context: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Streaming variant of `generate_quarter_schedule`.
+
+        Yields ("course", course) for each entry of quarter.courses as soon as
+        the model has finished writing it, then ("schedule", schedule) once the
+        whole answer has been parsed and validated. A cached schedule replays
+        its courses the same way.
+        """
+        for key in ('profile', 'completed_courses', 'transfer_requirements'):
+            if key not in planning_context:
+                raise Exception(f"Missing required context key: {key}")
+        if not planning_context.get("profile"):
+            raise Exception("Profile data is required")
+        
+        cache_key = schedule_cache_key(planning_context)
+        cached = await schedule_cache.get(cache_key)
+        if cached is not None:
+            for course in cached.get("quarter", {}).get("courses", []):
+                yield "course", course
+            yield "schedule", cached
+            return
+        
+        if not self.client.is_configured:
+            raise Exception("Perplexity API client not configured")
+        
+        prompt = self._create_planning_prompt(planning_context)
+        parser = JSONArrayStreamParser(("quarter", "courses"))
+        started = time.perf_counter()
+        try:
+            async for delta in self.client.stream(self._messages(prompt), **self._completion_params()):
+                for course in parser.feed(delta):
+                    yield "course", course
+        except LLMError as e:
+            raise Exception(f"AI schedule generation failed: {str(e)} - No fallback data available")
+        
+        # The courses already sent are only final once the whole object checks out
+        schedule = self._parse_schedule_content(parser.text)
+        await schedule_cache.set(cache_key, schedule, time.perf_counter() - started)
+        yield "schedule", schedule
     
     async def _generate_with_perplexity(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate schedule using Perplexity API with real ASSIST.org data"""
         
+        # Identical planning inputs get the schedule generated for them before
+        cache_key = schedule_cache_key(context)
+        cached = await schedule_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Prepare the prompt for the AI
         prompt = self._create_planning_prompt(context)
         
         # Call Perplexity API
-        if not self.client:
+        if not self.client.is_configured:
             raise Exception("Perplexity API client not configured")
         
+        started = time.perf_counter()
         response = await self._call_perplexity_api(prompt)
+        await schedule_cache.set(cache_key, response, time.perf_counter() - started)
         return response
\ No newline at end of file
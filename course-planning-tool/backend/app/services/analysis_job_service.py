@@ -0,0 +1,271 @@
+import asyncio
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import redis
+import redis.asyncio as redis_async
+
+from app.core.celery_app import RUN_ANALYSIS_JOB_TASK, celery_app
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_async_redis
+from app.services.transfer_analysis_service import TransferAnalysisError, TransferAnalysisService
+
+JOB_KEY_PREFIX = "transfer:analysis_job:v1"
+ANALYZE_PUBLIC = "analyze_public"
+
+# Fields returned to API clients (params stay server-side)
+_PUBLIC_FIELDS = ("job_id", "kind", "status", "stage", "partial_result", "result", "error",
+                  "error_status", "attempts", "created_at", "updated_at")
+
+
+class JobQueueUnavailable(Exception):
+    """Raised when jobs can't be stored or dispatched (Redis or the broker is down)"""
+
+
+class AnalysisJobStore:
+    """
+    Transfer analysis jobs persisted in Redis as JSON documents.
+
+    Job IDs are derived from the normalized request, so resubmitting the same
+    analysis (a client retry or a reconnect) finds the existing job and its
+    result instead of starting another scrape. While a job runs, its worker
+    keeps a heartbeat key alive; a running job without one has lost its worker.
+    """
+
+    def __init__(self, ttl_seconds: int, heartbeat_ttl_seconds: int = 60):
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_ttl_seconds = heartbeat_ttl_seconds
+
+    @staticmethod
+    def job_id_for(kind: str, params: Dict[str, Any]) -> str:
+        canonical = json.dumps({"kind": kind, "params": params}, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+    async def _client(self) -> redis_async.Redis:
+        client = await get_async_redis()
+        if client is None:
+            raise JobQueueUnavailable("Job store is unavailable (Redis is unreachable)")
+        return client
+
+    def _key(self, job_id: str) -> str:
+        return f"{JOB_KEY_PREFIX}:{job_id}"
+
+    def _heartbeat_key(self, job_id: str) -> str:
+        return f"{JOB_KEY_PREFIX}:{job_id}:heartbeat"
+
+    async def create(self, job_id: str, kind: str, params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """Store a new queued job; returns (job, created) and the existing job if one is there"""
+        now = time.time()
+        job = {
+            "job_id": job_id,
+            "kind": kind,
+            "status": "queued",
+            "stage": "queued",
+            "params": params,
+            "partial_result": None,
+            "result": None,
+            "error": None,
+            "error_status": None,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        client = await self._client()
+        try:
+            created = await client.set(self._key(job_id), json.dumps(job), nx=True, ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+        if created:
+            return job, True
+        existing = await self.get(job_id)
+        return (existing, False) if existing is not None else await self.create(job_id, kind, params)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        client = await self._client()
+        try:
+            payload = await client.get(self._key(job_id))
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+        return json.loads(payload) if payload is not None else None
+
+    async def update(self, job_id: str, **fields) -> Optional[Dict[str, Any]]:
+        # Read-modify-write: the worker running a job serializes its own updates, and the
+        # API only writes to jobs that aren't running (retries) or whose worker is gone
+        job = await self.get(job_id)
+        if job is None:
+            return None
+        job.update(fields)
+        job["updated_at"] = time.time()
+        client = await self._client()
+        try:
+            await client.set(self._key(job_id), json.dumps(job, default=str), ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+        return job
+
+    async def beat(self, job_id: str) -> None:
+        """Mark the job's worker alive for another heartbeat TTL"""
+        client = await self._client()
+        try:
+            await client.set(self._heartbeat_key(job_id), time.time(), ex=self.heartbeat_ttl_seconds)
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+
+    async def end_heartbeat(self, job_id: str) -> None:
+        client = await self._client()
+        try:
+            await client.delete(self._heartbeat_key(job_id))
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+
+    async def has_heartbeat(self, job_id: str) -> bool:
+        client = await self._client()
+        try:
+            return bool(await client.exists(self._heartbeat_key(job_id)))
+        except redis.RedisError as e:
+            raise JobQueueUnavailable(f"Job store is unavailable: {e}")
+
+
+analysis_job_store = AnalysisJobStore(
+    ttl_seconds=settings.ANALYSIS_JOB_TTL_SECONDS,
+    heartbeat_ttl_seconds=settings.ANALYSIS_JOB_HEARTBEAT_TTL_SECONDS,
+)
+
+# Inline jobs (ANALYSIS_JOBS_INLINE) are referenced here so they aren't garbage collected mid-run
+_inline_jobs = set()
+
+
+def public_job_view(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: job.get(field) for field in _PUBLIC_FIELDS}
+
+
+class AnalysisJobService:
+    """Submit transfer analyses as background jobs and run them on workers"""
+
+    def __init__(self, store: Optional[AnalysisJobStore] = None):
+        self.store = store or analysis_job_store
+
+    async def submit_public_analysis(self, request: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Queue an analyze-public request
+
+        Returns:
+            tuple: (job, queued) - queued is False when an identical job already
+            exists and is pending or finished
+        Raises:
+            TransferAnalysisError: (400) for invalid requests
+            JobQueueUnavailable: when the job can't be stored or dispatched
+        """
+        params = TransferAnalysisService.prepare_public_request(request)
+        job_id = self.store.job_id_for(ANALYZE_PUBLIC, params)
+        job, created = await self.store.create(job_id, ANALYZE_PUBLIC, params)
+        if not created:
+            job = await self._fail_if_abandoned(job)
+            if job["status"] != "failed":
+                metrics.inc("analysis_jobs.deduplicated")
+                return job, False
+            # Retrying a failed analysis runs it again under the same ID
+            job = await self.store.update(job_id, status="queued", stage="queued", error=None, error_status=None,
+                                          partial_result=None)
+
+        await self._dispatch(job_id)
+        metrics.inc("analysis_jobs.submitted")
+        return job, True
+
+    async def _dispatch(self, job_id: str) -> None:
+        if settings.ANALYSIS_JOBS_INLINE:
+            task = asyncio.get_running_loop().create_task(execute_analysis_job(job_id, self.store))
+            _inline_jobs.add(task)
+            task.add_done_callback(_inline_jobs.discard)
+            return
+        try:
+            celery_app.send_task(RUN_ANALYSIS_JOB_TASK, args=[job_id])
+        except Exception as e:
+            await self.store.update(job_id, status="failed", stage="failed", error=f"Could not queue job: {e}",
+                                    error_status=503)
+            raise JobQueueUnavailable(f"Job queue is unavailable: {e}")
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.store.get(job_id)
+        return await self._fail_if_abandoned(job) if job is not None else None
+
+    async def _fail_if_abandoned(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """A running job whose worker stopped sending heartbeats (it crashed or was killed) has failed"""
+        if job["status"] != "running" or await self.store.has_heartbeat(job["job_id"]):
+            return job
+        metrics.inc("analysis_jobs.abandoned")
+        return await self.store.update(
+            job["job_id"], status="failed", stage="failed", error="The analysis worker stopped before finishing",
+            error_status=500
+        ) or job
+
+
+async def execute_analysis_job(job_id: str, store: Optional[AnalysisJobStore] = None) -> None:
+    """Worker side: run a stored job, recording each stage and the final result"""
+    store = store or analysis_job_store
+    job = await store.get(job_id)
+    if job is None:
+        print(f"⚠️ Analysis job {job_id} expired before it ran")
+        return
+    if job["status"] == "succeeded":
+        return  # Redelivered after it already finished
+
+    # Stage callbacks from the scraping thread are scheduled as tasks, so updates can overlap
+    lock = asyncio.Lock()
+
+    async def update(**fields) -> None:
+        async with lock:
+            await store.update(job_id, **fields)
+
+    async def on_stage(stage: str, payload: Dict[str, Any]) -> None:
+        async with lock:
+            fields = {"stage": stage}
+            if stage == "requirements_parsed":
+                # Clients polling the job can show requirements before the AI schedule is ready
+                fields["partial_result"] = payload
+            elif stage == "schedule_preview":
+                fields["partial_result"] = {**((await store.get(job_id) or {}).get("partial_result") or {}), **payload}
+            elif stage == "schedule_course":
+                partial = (await store.get(job_id) or {}).get("partial_result") or {}
+                fields["partial_result"] = {**partial, "ai_courses": [*partial.get("ai_courses", []), payload["course"]]}
+            await store.update(job_id, **fields)
+
+    async def heartbeat() -> None:
+        while True:
+            await asyncio.sleep(store.heartbeat_ttl_seconds / 3)
+            try:
+                await store.beat(job_id)
+            except JobQueueUnavailable as e:
+                print(f"⚠️ Analysis job {job_id} heartbeat failed: {e}")
+
+    # The heartbeat exists before the job reads as running, so it's never mistaken for abandoned
+    await store.beat(job_id)
+    await update(status="running", stage="started", attempts=job.get("attempts", 0) + 1)
+    beating = asyncio.ensure_future(heartbeat())
+    started = time.perf_counter()
+    try:
+        try:
+            result = await TransferAnalysisService().analyze_public(job["params"], on_stage=on_stage)
+        except TransferAnalysisError as e:
+            await update(status="failed", stage="failed", error=str(e), error_status=e.status_code)
+            metrics.inc("analysis_jobs.failed")
+            return
+        except Exception as e:
+            await update(status="failed", stage="failed",
+                         error=f"Error analyzing transfer requirements: {str(e)}", error_status=500)
+            metrics.inc("analysis_jobs.failed")
+            return
+        finally:
+            metrics.observe("analysis_jobs.run_seconds", time.perf_counter() - started)
+
+        await update(status="succeeded", stage="completed", result=result, partial_result=None)
+        metrics.inc("analysis_jobs.succeeded")
+    finally:
+        beating.cancel()
+        try:
+            await store.end_heartbeat(job_id)
+        except JobQueueUnavailable:
+            pass  # The heartbeat key expires on its own
@@ -1,9 +1,10 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from jose import JWTError, jwt
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
 from app.models.user import User
 
@@ -13,7 +14,7 @@ class AuthService:
     @staticmethod
     async def get_current_user(
         token: str = Depends(oauth2_scheme),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
     ) -> User:
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -29,7 +30,7 @@ class AuthService:
         except JWTError:
             raise credentials_exception
         
-        user = db.query(User).filter(User.id == int(user_id)).first()
+        user = (await db.scalars(select(User).filter(User.id == int(user_id)))).first()
         if user is None:
             raise credentials_exception
         
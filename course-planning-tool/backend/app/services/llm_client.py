@@ -0,0 +1,224 @@
+"""
+Shared async client for the LLM (Perplexity's OpenAI-compatible API).
+
+One `AsyncOpenAI` per event loop sits on a keep-alive httpx pool, so calls
+reuse connections instead of opening a client per service instance. Each
+call has a deadline and holds an `llm_limiter` slot while it runs. With
+hedging on, a call still running past the observed p95 latency gets a
+duplicate request, and whichever answers first wins - a stalled request
+no longer sets the tail latency. The hedge clock starts once the first
+request holds its slot, and no hedge is sent while every slot is taken.
+"""
+import asyncio
+import time
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.core.executors import llm_limiter
+from app.core.metrics import metrics
+
+LATENCY_METRIC = "llm.latency_seconds"  # Completion calls; drives the hedge delay
+STREAM_LATENCY_METRIC = "llm.stream_seconds"  # Whole streams, which run far longer than one completion
+
+
+class LLMError(Exception):
+    """Raised when the LLM can't answer within the deadline or returns an error"""
+
+
+class LLMClient:
+    def __init__(
+        self,
+        api_key: Optional[str],
+        base_url: str,
+        timeout_seconds: float,
+        hedge_enabled: bool = False,
+        hedge_min_samples: int = 20,
+        hedge_min_delay_seconds: float = 1.0,
+        max_connections: int = 16,
+        max_retries: int = 1,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.hedge_enabled = hedge_enabled
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay_seconds = hedge_min_delay_seconds
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        # httpx connections belong to the loop that opened them; Celery workers run their own loops
+        self._clients = weakref.WeakKeyDictionary()
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def _client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(self.timeout_seconds, connect=min(5.0, self.timeout_seconds)),
+            )
+            client = self._clients[loop] = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                max_retries=self.max_retries,
+            )
+        return client
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while hedging is off or latency is still unknown"""
+        if not self.hedge_enabled:
+            return None
+        latency = metrics.histogram(LATENCY_METRIC)
+        if latency["count"] < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay_seconds, latency["p95"])
+
+    async def complete(self, messages: List[Dict[str, str]], timeout: Optional[float] = None, **params: Any) -> str:
+        """
+        Chat completion content for `messages`.
+
+        Raises:
+            LLMError: when no attempt answers within `timeout` (default
+            LLM_TIMEOUT_SECONDS) or every attempt fails
+        """
+        if not self.is_configured:
+            raise LLMError("LLM API key not configured")
+        deadline = timeout or self.timeout_seconds
+        metrics.inc("llm.calls")
+        try:
+            return await asyncio.wait_for(self._hedged(messages, params), timeout=deadline)
+        except asyncio.TimeoutError:
+            metrics.inc("llm.timeouts")
+            raise LLMError(f"LLM call timed out after {deadline:g}s")
+
+    async def stream(
+        self, messages: List[Dict[str, str]], timeout: Optional[float] = None, **params: Any
+    ) -> AsyncIterator[str]:
+        """
+        Content deltas of a streamed chat completion, as they arrive.
+
+        The deadline covers the whole stream; streams aren't hedged, since
+        their first tokens already arrive early.
+
+        Raises:
+            LLMError: when the stream doesn't finish within `timeout` or fails
+        """
+        if not self.is_configured:
+            raise LLMError("LLM API key not configured")
+        deadline = timeout or self.timeout_seconds
+        expires_at = time.monotonic() + deadline
+        metrics.inc("llm.streams")
+        async with llm_limiter.slot():
+            started = time.perf_counter()
+            try:
+                stream = await asyncio.wait_for(
+                    self._client().chat.completions.create(messages=messages, stream=True, **params),
+                    timeout=deadline
+                )
+                chunks = stream.__aiter__()
+                first = True
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=expires_at - time.monotonic())
+                    except StopAsyncIteration:
+                        break
+                    if first:
+                        metrics.observe("llm.first_token_seconds", time.perf_counter() - started)
+                        first = False
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            except asyncio.TimeoutError:
+                metrics.inc("llm.timeouts")
+                raise LLMError(f"LLM stream timed out after {deadline:g}s")
+            except LLMError:
+                raise
+            except Exception as e:
+                metrics.inc("llm.errors")
+                raise LLMError(f"LLM stream failed: {e}")
+            metrics.observe(STREAM_LATENCY_METRIC, time.perf_counter() - started)
+
+    async def _attempt(
+        self, messages: List[Dict[str, str]], params: Dict[str, Any], slotted: Optional[asyncio.Event] = None
+    ) -> str:
+        async with llm_limiter.slot():
+            if slotted is not None:
+                slotted.set()
+            started = time.perf_counter()
+            response = await self._client().chat.completions.create(messages=messages, **params)
+            metrics.observe(LATENCY_METRIC, time.perf_counter() - started)
+        return response.choices[0].message.content or ""
+
+    async def _hedged(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        slotted = asyncio.Event()
+        first = asyncio.ensure_future(self._attempt(messages, params, slotted))
+        pending = {first}
+        hedge_delay = self.hedge_delay()
+        hedge = None
+        try:
+            if hedge_delay is not None:
+                # Time spent queueing for a slot isn't latency the hedge could cut
+                slot_acquired = asyncio.ensure_future(slotted.wait())
+                try:
+                    await asyncio.wait({first, slot_acquired}, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    slot_acquired.cancel()
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    if llm_limiter.has_free_slot():
+                        metrics.inc("llm.hedges")
+                        hedge = asyncio.ensure_future(self._attempt(messages, params))
+                        pending.add(hedge)
+                    else:
+                        # A queued hedge would only delay other callers' first requests
+                        metrics.inc("llm.hedges_skipped")
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            metrics.inc("llm.hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            metrics.inc("llm.errors")
+            raise LLMError(f"LLM call failed: {error}")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def close(self) -> None:
+        """
+        Close the connection pool for the running loop. Call it before a
+        short-lived loop (e.g. a Celery task's asyncio.run) ends, or the pool
+        is left open.
+        """
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.close()
+
+
+llm_client = LLMClient(
+    api_key=settings.PERPLEXITY_API_KEY,
+    base_url=settings.LLM_BASE_URL,
+    timeout_seconds=settings.LLM_TIMEOUT_SECONDS,
+    hedge_enabled=settings.LLM_HEDGE_ENABLED,
+    hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+    hedge_min_delay_seconds=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+    max_connections=max(2, settings.LLM_MAX_CONCURRENCY * 2),
+    max_retries=settings.LLM_MAX_RETRIES,
+)
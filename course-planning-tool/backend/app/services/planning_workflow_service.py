@@ -2,7 +2,8 @@
 
 import asyncio
 from typing import Dict, Any, List
-from app.scrapers.assist_scraper import scrape_assist_data
+from app.scrapers.articulation_model import Agreement, CourseRef
+from app.scrapers.assist_scraper import scrape_assist_data_async
 from app.services.ai_planning_service import AIPlanningService
 
 class PlanningWorkflowService:
@@ -88,7 +89,7 @@ class PlanningWorkflowService:
             raise Exception(f"Missing required user profile data: {', '.join(missing)}")
         
         # Call the ASSIST scraper - will raise exception if fails
-        assist_data = scrape_assist_data(
+        assist_data = await scrape_assist_data_async(
             academic_year=academic_year,
             institution=current_institution,
             target_institution=target_institution, 
@@ -109,34 +110,21 @@ class PlanningWorkflowService:
             'articulation_agreements': []
         }
         
-        # Process sections from ASSIST data
-        if 'sections' in raw_assist_data:
-            for section in raw_assist_data['sections']:
-                if section.get('structure') == 'sequence':
-                    # These are required courses in sequence
-                    for course in section.get('courses', []):
-                        course_info = {
-                            'course_code': course.get('code', ''),
-                            'course_name': course.get('title', ''),
-                            'units': self._parse_units(course.get('units', '')),
-                            'category': 'Major Prerequisites',
-                            'required': True
-                        }
-                        structured['all_requirements'].append(course_info)
-                        structured['major_requirements'].append(course_info)
-                        
-                elif section.get('structure') == 'choice':
-                    # These are elective options (A or B)
-                    for option in section.get('options', []):
-                        for course in option.get('courses', []):
-                            course_info = {
-                                'course_code': course.get('code', ''),
-                                'course_name': course.get('title', ''),
-                                'units': self._parse_units(course.get('units', '')),
-                                'category': 'Major Electives',
-                                'required': False
-                            }
-                            structured['all_requirements'].append(course_info)
+        # The scraper returns an envelope; its data parses into the typed agreement model
+        agreement = Agreement.from_dict(raw_assist_data.get('data') or raw_assist_data)
+        for group in agreement.groups:
+            if group.structure == 'sequence':
+                # These are required courses in sequence
+                for course in group.courses or []:
+                    course_info = self._course_info(course, 'Major Prerequisites', True)
+                    structured['all_requirements'].append(course_info)
+                    structured['major_requirements'].append(course_info)
+                    
+            elif group.structure == 'choice':
+                # These are elective options (A or B)
+                for option in group.options or []:
+                    for course in option.courses:
+                        structured['all_requirements'].append(self._course_info(course, 'Major Electives', False))
         
         return structured
     
@@ -201,16 +189,16 @@ class PlanningWorkflowService:
     
 
     
-    def _parse_units(self, units_str: str) -> int:
-        """Parse units from string like '4.00 units' to integer"""
-        if not units_str:
-            raise Exception("Units string is required")
-        
-        import re
-        match = re.search(r'(\d+(?:\.\d+)?)', str(units_str))
-        if match:
-            return int(float(match.group(1)))
-        raise Exception(f"Could not parse units from: {units_str}")
+    def _course_info(self, course: CourseRef, category: str, required: bool) -> Dict[str, Any]:
+        if course.units is None:
+            raise Exception(f"Units are required for {course.code}")
+        return {
+            'course_code': course.code,
+            'course_name': course.title,
+            'units': int(course.units),
+            'category': category,
+            'required': required
+        }
 
 # Example usage function
 async def test_workflow_integration():
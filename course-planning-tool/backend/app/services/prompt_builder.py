@@ -0,0 +1,170 @@
+"""
+Token-budgeted requirement section for the planning prompt.
+
+Only requirement groups the student hasn't satisfied are described. Each
+one gets its cheapest path first, then the other sending-course
+combinations that would also satisfy its unmet courses, with an honors
+variant folded into its regular course. Lines are ranked (remaining
+required work, then alternatives, then recommended groups) and added until
+the token budget is spent, so what's cut is always the least useful.
+"""
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.scrapers.articulation_model import Agreement, CourseRef
+from app.services.requirement_engine import normalize_course_code, regular_course_code, requirement_progress
+
+try:
+    import tiktoken
+except ImportError:  # The local estimate below is used instead
+    tiktoken = None
+
+# Line ranks: lower ranks are kept first when the budget runs out
+_RANK_REQUIRED, _RANK_ALTERNATIVE, _RANK_RECOMMENDED, _RANK_RECOMMENDED_ALTERNATIVE = range(4)
+
+# Roughly how BPE tokenizers pre-split text: words with their leading space, up to 3 digits, punctuation runs
+_PIECES = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+_encoding = None
+
+
+def _tiktoken_encoding():
+    global _encoding, tiktoken
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:  # The encoding is downloaded on first use; offline hosts fall back to the estimate
+            tiktoken = None
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Token count of `text`: exact for cl100k when tiktoken is available,
+    otherwise a pre-tokenizer estimate that errs slightly high, so budgets hold.
+    """
+    if not text:
+        return 0
+    encoding = _tiktoken_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    tokens = 0
+    for piece in _PIECES.findall(text):
+        word = piece.strip()
+        if not word:
+            tokens += 1
+        elif word.isalpha():
+            # Common words are one token; longer ones split into ~5-character pieces
+            tokens += 1 if len(word) <= 7 else math.ceil(len(word) / 5)
+        else:
+            tokens += 1 if word.isdigit() else len(word)
+    return tokens
+
+
+def _units(units: Optional[float]) -> str:
+    if units is None:
+        return "units unknown"
+    return f"{units:g} units"
+
+
+def _combination(courses: Tuple[CourseRef, ...]) -> str:
+    units = sum(course.units or 0 for course in courses)
+    codes = " + ".join(course.code for course in courses)
+    return f"{codes} ({units:g} units)"
+
+
+class RequirementPromptBuilder:
+    """Renders the unmet part of an agreement for the LLM within `token_budget` tokens"""
+
+    def __init__(self, token_budget: int):
+        self.token_budget = token_budget
+
+    def build(
+        self,
+        agreement: Agreement,
+        completed_codes: Iterable[str],
+        progress: Optional[Dict[str, Any]] = None
+    ) -> str:
+        completed_codes = list(completed_codes)
+        if progress is None:
+            progress = requirement_progress(agreement, completed_codes)
+        if not progress:
+            return "No transfer requirements found for this agreement."
+        if not progress['remaining'] and not progress['recommended_remaining']:
+            return "All transfer requirement groups are already satisfied."
+
+        lines = self._lines(agreement, progress, completed_codes)
+        ranked = sorted(range(len(lines)), key=lambda order: (lines[order][0], order))
+        selected, used = [], 0
+        for order in ranked:
+            cost = estimate_tokens(lines[order][1]) + 1  # +1 for the newline
+            if used + cost > self.token_budget:
+                break
+            selected.append(order)
+            used += cost
+
+        rendered = [lines[order][1] for order in sorted(selected)]
+        if len(selected) < len(lines):
+            rendered.append(f"... {len(lines) - len(selected)} lower-priority lines omitted")
+        return "\n".join(rendered)
+
+    def _lines(
+        self,
+        agreement: Agreement,
+        progress: Dict[str, Any],
+        completed_codes: List[str]
+    ) -> List[Tuple[int, str]]:
+        completed = {regular_course_code(normalize_course_code(code)) for code in completed_codes}
+        lines: List[Tuple[int, str]] = [(_RANK_REQUIRED, (
+            f"{progress['satisfied_required_groups']} of {progress['required_groups']} required groups satisfied"
+        ))]
+        sections = ((progress['remaining'], _RANK_REQUIRED, _RANK_ALTERNATIVE),
+                    (progress['recommended_remaining'], _RANK_RECOMMENDED, _RANK_RECOMMENDED_ALTERNATIVE))
+        for entries, rank, alternative_rank in sections:
+            if entries and rank == _RANK_RECOMMENDED:
+                lines.append((rank, "Highly recommended (not required):"))
+            for entry in entries:
+                cheapest = self._collapse(
+                    [(course['code'], course['title'], course['units']) for course in entry['courses']]
+                )
+                lines.append((rank, f"Group {entry['number']} ({entry['title']}): still needs {', '.join(entry['unmet'])}"))
+                if cheapest:
+                    lines.append((rank, f"  Cheapest path: {'; '.join(cheapest)}"))
+                for code in entry['unmet']:
+                    if code in entry['after_transfer']:
+                        lines.append((rank, f"  {code}: No course articulated - take at the university after transfer"))
+                        continue
+                    alternatives = self._alternatives(agreement, code, completed)
+                    if len(alternatives) > 1:
+                        lines.append((alternative_rank, f"  {code} is satisfied by any of: {' | '.join(alternatives)}"))
+        return lines
+
+    @staticmethod
+    def _collapse(courses: List[Tuple[str, str, Optional[float]]]) -> List[str]:
+        """One entry per course, with its honors version noted instead of listed"""
+        rendered: Dict[str, str] = {}
+        for code, title, units in courses:
+            key = regular_course_code(normalize_course_code(code))
+            if key in rendered:
+                rendered[key] += f" (or honors {code})"
+            else:
+                name = f"{code} {title}" if title and title != code else code
+                rendered[key] = f"{name} ({_units(units)})"
+        return list(rendered.values())
+
+    @staticmethod
+    def _alternatives(agreement: Agreement, receiving_code: str, completed: set) -> List[str]:
+        """Distinct sending-course combinations for one receiving course, honors variants folded in"""
+        options: Dict[Tuple[str, ...], str] = {}
+        for group in agreement.articulations.get(receiving_code, []):
+            if not group or any(course.is_no_course or not course.code for course in group):
+                continue
+            key = tuple(regular_course_code(normalize_course_code(course.code)) for course in group)
+            if key in options:
+                options[key] += " or honors"
+                continue
+            still_needed = [course for course in group
+                            if regular_course_code(normalize_course_code(course.code)) not in completed]
+            options[key] = _combination(tuple(still_needed) or group)
+        return list(options.values())
@@ -0,0 +1,437 @@
+"""
+Constraint-based quarter planning with OR-Tools CP-SAT.
+
+`QuarterPlanner` schedules the remaining courses the requirement engine
+puts on the cheapest path of an agreement: it picks the most valuable set
+whose prerequisites are complete, that fits the unit cap, takes a regular
+or honors course but not both and keeps subjects mixed. The result has the
+same `quarter` / `recommendations` shape `AIPlanningService` returns, in
+milliseconds and without a network call. `plan_horizon` solves every
+quarter until transfer at once, with prerequisites in earlier quarters.
+A single search worker with a fixed seed makes the same input always give
+the same plan.
+"""
+import asyncio
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ortools.sat.python import cp_model
+
+from app.core.config import settings
+from app.scrapers.articulation_model import Agreement
+from app.services.ai_planning_service import AIPlanningService
+from app.services.requirement_engine import RequirementTree, normalize_course_code, regular_course_code
+
+SCHEDULE_ENGINES = ("ai", "solver")
+
+# Calendar order within a year
+QUARTER_ORDER = ("winter", "spring", "summer", "fall")
+
+DEFAULT_COURSE_UNITS = 3.0
+GE_COURSE_UNITS = 3
+
+# Objective weights: requirement value first, then unlocking later courses, then mixing subjects
+_REQUIRED_VALUE = 1000
+_RECOMMENDED_VALUE = 200
+_UNLOCK_VALUE = 100
+_SAME_SUBJECT_PENALTY = 600
+
+_SUBJECT = re.compile(r'^[A-Z&]+')
+# 'MATH1B' -> ('MATH1', 'B'); a lettered course follows the previous letter of the same series
+_SERIES = re.compile(r'^([A-Z&]+\d+)([B-Z])H?$')
+
+
+def subject_of(code: str) -> str:
+    match = _SUBJECT.match(normalize_course_code(code))
+    return match.group(0) if match else ''
+
+
+def _display_units(units: float) -> Any:
+    return int(units) if math.isclose(units, round(units)) else round(units, 2)
+
+
+class _Candidate:
+    __slots__ = ('key', 'code', 'title', 'units', 'value', 'groups', 'required', 'prerequisites')
+
+    def __init__(self, key: str, code: str, title: str, units: float):
+        self.key = key
+        self.code = code
+        self.title = title
+        self.units = units
+        self.value = 0
+        self.groups: List[str] = []
+        self.required = False
+        self.prerequisites: Set[str] = set()
+
+
+class QuarterPlanner:
+    """Plans one quarter, or every quarter until transfer, from the context the AI planner takes"""
+
+    def __init__(self, deterministic_time_limit: Optional[float] = None):
+        self.deterministic_time_limit = deterministic_time_limit or settings.SCHEDULE_SOLVER_DETERMINISTIC_TIME_LIMIT
+
+    async def generate_quarter_schedule(self, planning_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop-in for `AIPlanningService.generate_quarter_schedule`; the solve runs off the event loop"""
+        return await asyncio.to_thread(self.plan, planning_context)
+
+    async def generate_horizon_schedule(self, planning_context: Dict[str, Any]) -> Dict[str, Any]:
+        """`plan_horizon` off the event loop"""
+        return await asyncio.to_thread(self.plan_horizon, planning_context)
+
+    def plan(self, planning_context: Dict[str, Any]) -> Dict[str, Any]:
+        """One quarter: the profile's planning (or current) quarter"""
+        inputs = self._inputs(planning_context)
+        profile = inputs.profile
+        quarter = str(profile.get('planning_quarter') or profile.get('current_quarter') or 'Fall').title()
+        year = profile.get('current_year')
+        quarters = self._plan_quarters(inputs, [(quarter, year)])
+
+        entry = quarters[0]
+        for key in ('quarter', 'year'):
+            entry.pop(key)
+        entry['warnings'] = inputs.after_transfer_warnings() + self._blocked_warnings(inputs, quarters)
+        return {"quarter": entry, "recommendations": inputs.recommendations()}
+
+    def plan_horizon(self, planning_context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Every quarter from the profile's current quarter up to its transfer
+        quarter, solved together so prerequisite chains spread across them.
+        Summer is skipped unless preferences set include_summer.
+        """
+        inputs = self._inputs(planning_context)
+        profile = inputs.profile
+        for key in ('current_quarter', 'current_year', 'transfer_quarter', 'transfer_year'):
+            if not profile.get(key):
+                raise ValueError(f"Missing profile field for a horizon plan: {key}")
+        terms = quarter_sequence(
+            profile['current_quarter'], int(profile['current_year']),
+            profile['transfer_quarter'], int(profile['transfer_year']),
+            include_summer=bool(inputs.preferences.get('include_summer'))
+        )
+        if not terms:
+            raise ValueError("The transfer quarter must come after the current quarter")
+        quarters = self._plan_quarters(inputs, terms)
+
+        planned = {course["course_code"] for quarter in quarters for course in quarter["courses"]}
+        unscheduled = [c.code for c in inputs.candidates if c.required and c.code not in planned]
+        warnings = inputs.after_transfer_warnings() + self._blocked_warnings(inputs, quarters)
+        warnings += [
+            f"{code}: Not scheduled before transfer - no room under the {_display_units(inputs.cap)}-unit cap"
+            for code in unscheduled
+            if not any(w.startswith(f"{code}:") for w in warnings)
+        ]
+        return {
+            "quarters": quarters,
+            "total_units": _display_units(sum(quarter["total_units"] for quarter in quarters)),
+            "unscheduled": unscheduled,
+            "warnings": warnings,
+            "recommendations": inputs.recommendations(),
+        }
+
+    def _inputs(self, planning_context: Dict[str, Any]) -> "_PlanInputs":
+        for key in ('profile', 'completed_courses', 'transfer_requirements'):
+            if key not in planning_context:
+                raise ValueError(f"Missing required context key: {key}")
+        agreement = planning_context['transfer_requirements']
+        if not isinstance(agreement, Agreement):
+            agreement = Agreement.from_dict(agreement or {})
+
+        inputs = _PlanInputs(planning_context['profile'] or {}, planning_context.get('preferences') or {})
+        inputs.tree = RequirementTree(agreement)
+        inputs.completed = self._completed_keys(planning_context['completed_courses'])
+        inputs.progress = inputs.tree.evaluate(inputs.completed)
+        inputs.candidates = self._candidates(inputs.progress, agreement, planning_context.get('prerequisites') or {})
+        inputs.cap = self._unit_cap(inputs.preferences)
+        inputs.names = {normalize_course_code(course.code): course.code for course in agreement.sending_courses()}
+        return inputs
+
+    def _plan_quarters(self, inputs: "_PlanInputs", terms: List[Tuple[str, Optional[int]]]) -> List[Dict[str, Any]]:
+        chosen = self._solve(inputs.candidates, inputs.completed, [inputs.cap] * len(terms))
+        quarters = []
+        done = set(inputs.completed)
+        for (quarter, year), courses in zip(terms, chosen):
+            done.update(candidate.key for candidate in courses)
+            quarters.append(self._quarter_entry(inputs, quarter, year, courses, inputs.tree.evaluate(done)))
+        return quarters
+
+    # -- model inputs ----------------------------------------------------------
+
+    @staticmethod
+    def _completed_keys(completed_courses: Iterable[Any]) -> Set[str]:
+        keys = set()
+        for course in completed_courses:
+            code = (course.get('code') or course.get('course_code')) if isinstance(course, dict) else course
+            key = normalize_course_code(code)
+            if key:
+                keys.add(key)
+                keys.add(regular_course_code(key))  # an honors course completes the regular one's prerequisites
+        return keys
+
+    @staticmethod
+    def _unit_cap(preferences: Dict[str, Any]) -> float:
+        # units_per_quarter carries the student's max_credits_per_quarter
+        for key in ('units_per_quarter', 'max_units_per_quarter'):
+            if preferences.get(key):
+                return float(preferences[key])
+        return 15.0
+
+    def _candidates(
+        self,
+        progress: Dict[str, Any],
+        agreement: Agreement,
+        prerequisites: Dict[str, Iterable[str]]
+    ) -> List[_Candidate]:
+        by_key: Dict[str, _Candidate] = {}
+        for entries, required in ((progress['remaining'], True), (progress['recommended_remaining'], False)):
+            for entry in entries:
+                for course in entry['courses']:
+                    key = normalize_course_code(course['code'])
+                    candidate = by_key.get(key)
+                    if candidate is None:
+                        units = course['units'] if course['units'] is not None else DEFAULT_COURSE_UNITS
+                        candidate = by_key[key] = _Candidate(key, course['code'], course['title'], units)
+                    candidate.value += _REQUIRED_VALUE if required else _RECOMMENDED_VALUE
+                    candidate.required = candidate.required or required
+                    candidate.groups.append(entry['number'])
+
+        # Explicit prerequisites (e.g. Course.prerequisites), plus lettered series within the agreement
+        explicit = {
+            normalize_course_code(code): {normalize_course_code(p) for p in required if p}
+            for code, required in prerequisites.items()
+        }
+        series = {normalize_course_code(course.code) for course in agreement.sending_courses()}
+        for key, candidate in by_key.items():
+            candidate.prerequisites = set(explicit.get(key) or explicit.get(regular_course_code(key)) or ())
+            match = _SERIES.match(key)
+            if match:
+                previous = match.group(1) + chr(ord(match.group(2)) - 1)
+                if previous in series:
+                    candidate.prerequisites.add(previous)
+
+        # Courses that open up others go first
+        for candidate in by_key.values():
+            candidate.value += _UNLOCK_VALUE * sum(
+                1 for other in by_key.values() if candidate.key in self._all_prerequisites(other, by_key)
+            )
+        return list(by_key.values())
+
+    @staticmethod
+    def _all_prerequisites(candidate: _Candidate, by_key: Dict[str, _Candidate]) -> Set[str]:
+        seen: Set[str] = set()
+        stack = list(candidate.prerequisites)
+        while stack:
+            key = stack.pop()
+            if key in seen:
+                continue
+            seen.add(key)
+            if key in by_key:
+                stack.extend(by_key[key].prerequisites)
+        return seen
+
+    # -- solve -----------------------------------------------------------------
+
+    def _solver(self) -> cp_model.CpSolver:
+        solver = cp_model.CpSolver()
+        # One worker, a fixed seed and a work-based (not wall-clock) limit: a search
+        # cut short stops at the same point on any machine, so the plan is reproducible
+        solver.parameters.num_workers = 1
+        solver.parameters.random_seed = 0
+        solver.parameters.max_deterministic_time = self.deterministic_time_limit
+        return solver
+
+    @staticmethod
+    def _schedulable(candidates: List[_Candidate], completed: Set[str]) -> List[_Candidate]:
+        """Candidates whose prerequisites are completed or are themselves schedulable"""
+        keys = {candidate.key for candidate in candidates}
+        changed = True
+        while changed:
+            changed = False
+            for candidate in candidates:
+                if candidate.key in keys and not candidate.prerequisites <= completed | keys:
+                    keys.discard(candidate.key)
+                    changed = True
+        return [candidate for candidate in candidates if candidate.key in keys]
+
+    def _solve(self, candidates: List[_Candidate], completed: Set[str], caps: List[float]) -> List[List[_Candidate]]:
+        """The courses to take in each quarter, one list per entry of `caps`"""
+        eligible = self._schedulable(candidates, completed)
+        if not eligible:
+            return [[] for _ in caps]
+        horizon = len(caps)
+        model = cp_model.CpModel()
+        take = [[model.NewBoolVar(f"take_{i}_{q}") for q in range(horizon)] for i in range(len(eligible))]
+        position = {candidate.key: i for i, candidate in enumerate(eligible)}
+
+        for i, candidate in enumerate(eligible):
+            model.Add(sum(take[i]) <= 1)
+            # A prerequisite still to take must come in an earlier quarter
+            for key in candidate.prerequisites - completed:
+                j = position[key]
+                for q in range(horizon):
+                    model.Add(take[i][q] <= sum(take[j][:q]))
+        for q, cap in enumerate(caps):
+            model.Add(sum(round(c.units * 100) * take[i][q] for i, c in enumerate(eligible)) <= round(cap * 100))
+
+        by_regular: Dict[str, List[int]] = {}
+        by_subject: Dict[str, List[int]] = {}
+        for i, candidate in enumerate(eligible):
+            by_regular.setdefault(regular_course_code(candidate.key), []).append(i)
+            by_subject.setdefault(subject_of(candidate.key), []).append(i)
+        for versions in by_regular.values():
+            if len(versions) > 1:
+                model.Add(sum(take[i][q] for i in versions for q in range(horizon)) <= 1)
+
+        penalties = []
+        for subject, courses in by_subject.items():
+            if len(courses) > 1:
+                for q in range(horizon):
+                    extra = model.NewIntVar(0, len(courses) - 1, f"extra_{subject}_{q}")
+                    model.Add(extra >= sum(take[i][q] for i in courses) - 1)
+                    penalties.append(extra)
+
+        # Ties go to the course listed first in the agreement, then to the earlier quarter
+        order = len(eligible)
+        scale = (order + 1) * (horizon + 1)
+        model.Maximize(
+            sum(
+                ((c.value * (order + 1) + order - i) * (horizon + 1) + horizon - q) * take[i][q]
+                for i, c in enumerate(eligible) for q in range(horizon)
+            )
+            - _SAME_SUBJECT_PENALTY * scale * sum(penalties)
+        )
+
+        solver = self._solver()
+        status = solver.Solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            raise RuntimeError(f"Schedule solver found no plan ({solver.StatusName(status)})")
+        return [
+            [c for i, c in enumerate(eligible) if solver.Value(take[i][q])]
+            for q in range(horizon)
+        ]
+
+    # -- output ----------------------------------------------------------------
+
+    @staticmethod
+    def _course_entry(candidate: _Candidate, target: str) -> Dict[str, Any]:
+        groups = ", ".join(candidate.groups)
+        label = "group" if len(candidate.groups) == 1 else "groups"
+        if candidate.required:
+            category, reason = "Major Prerequisites", f"Required for transfer to {target} (requirement {label} {groups})"
+        else:
+            category, reason = "Highly Recommended", f"Highly recommended by {target} (requirement {label} {groups})"
+        return {
+            "course_code": candidate.code,
+            "course_name": candidate.title,
+            "units": _display_units(candidate.units),
+            "category": category,
+            "reason": reason,
+        }
+
+    def _quarter_entry(
+        self,
+        inputs: "_PlanInputs",
+        quarter: str,
+        year: Optional[int],
+        chosen: List[_Candidate],
+        progress: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        courses = [self._course_entry(candidate, inputs.target) for candidate in chosen]
+        total = sum(candidate.units for candidate in chosen)
+        if inputs.cap - total >= GE_COURSE_UNITS:
+            ge_units = int(inputs.cap - total)
+            courses.append({
+                "course_code": "GE",
+                "course_name": f"General Education Course ({ge_units} units)",
+                "units": ge_units,
+                "category": "General Education",
+                "reason": f"Fills the remaining units. Choose any transferable GE course from {inputs.current} catalog.",
+            })
+            total += ge_units
+        return {
+            "quarter": quarter,
+            "year": year,
+            "quarter_name": f"{quarter} {year}" if year else quarter,
+            "courses": courses,
+            "total_units": _display_units(total),
+            "notes": (
+                f"{progress['satisfied_required_groups']} of {progress['required_groups']} required groups "
+                f"satisfied after this quarter; {len(progress['remaining'])} remaining at {inputs.current}"
+            ),
+            "warnings": [],
+        }
+
+    @staticmethod
+    def _blocked_warnings(inputs: "_PlanInputs", quarters: List[Dict[str, Any]]) -> List[str]:
+        """Required courses left out because their prerequisites aren't done before the plan's last quarter"""
+        done = set(inputs.completed)
+        for quarter in quarters[:-1]:
+            done.update(normalize_course_code(course["course_code"]) for course in quarter["courses"])
+        planned = done | {normalize_course_code(course["course_code"]) for course in quarters[-1]["courses"]}
+        warnings = []
+        for candidate in inputs.candidates:
+            if candidate.required and candidate.key not in planned and not candidate.prerequisites <= done:
+                needs = ", ".join(inputs.names.get(key, key) for key in sorted(candidate.prerequisites))
+                warnings.append(f"{candidate.code}: Take after its prerequisites ({needs})")
+        return warnings
+
+
+class _PlanInputs:
+    """Everything a solve needs, derived once from the planning context"""
+
+    def __init__(self, profile: Dict[str, Any], preferences: Dict[str, Any]):
+        self.profile = profile
+        self.preferences = preferences
+        self.current = profile.get('current_institution') or 'your college'
+        self.target = profile.get('target_institution') or 'the university'
+        self.tree: Optional[RequirementTree] = None
+        self.completed: Set[str] = set()
+        self.progress: Dict[str, Any] = {}
+        self.candidates: List[_Candidate] = []
+        self.cap = 0.0
+        self.names: Dict[str, str] = {}
+
+    def after_transfer_warnings(self) -> List[str]:
+        return [
+            f"{code}: No course articulated at {self.current} - must be taken at {self.target} after transfer"
+            for code in self.progress['after_transfer']
+        ]
+
+    def recommendations(self) -> List[str]:
+        return [
+            f"Register early for popular courses at {self.current}",
+            "Plan to take non-articulated courses after transfer",
+            "For GE courses, choose from areas like humanities, social sciences, or natural sciences to fulfill breadth requirements",
+        ]
+
+
+def quarter_sequence(
+    current_quarter: str,
+    current_year: int,
+    transfer_quarter: str,
+    transfer_year: int,
+    include_summer: bool = False
+) -> List[Tuple[str, int]]:
+    """
+    ('Fall', 2024)-style terms from the current quarter up to, not including,
+    the transfer quarter. Quarters follow the calendar year (Fall 2024 is
+    followed by Winter 2025); summer is skipped unless `include_summer`,
+    except when it is the current quarter.
+    """
+    start = current_year * 4 + QUARTER_ORDER.index(current_quarter.lower())
+    end = transfer_year * 4 + QUARTER_ORDER.index(transfer_quarter.lower())
+    return [
+        (QUARTER_ORDER[term % 4].title(), term // 4)
+        for term in range(start, end)
+        if term == start or include_summer or QUARTER_ORDER[term % 4] != 'summer'
+    ]
+
+
+def schedule_service(engine: Optional[str] = None):
+    """The schedule generator for `engine` ("ai" or "solver"), defaulting to SCHEDULE_ENGINE"""
+    engine = (engine or settings.SCHEDULE_ENGINE).lower()
+    if engine not in SCHEDULE_ENGINES:
+        raise ValueError(f"Unknown schedule engine '{engine}' (expected one of: {', '.join(SCHEDULE_ENGINES)})")
+    if engine == "solver":
+        return QuarterPlanner()
+    return AIPlanningService()
@@ -0,0 +1,220 @@
+"""
+Requirement satisfaction for ASSIST articulation agreements.
+
+`RequirementTree` compiles an `Agreement` once into a boolean tree: every
+sending-side course gets a bit, each receiving course becomes a leaf holding
+the AND-groups (as bitmasks) that articulate to it, sequence groups and
+options are ANDs and "Complete A or B" groups are ORs. Evaluating a
+student's completed courses is then integer masking over that tree.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.scrapers.articulation_model import Agreement, CourseRef, RequirementGroup
+
+_WHITESPACE = re.compile(r'\s+')
+# An honors suffix follows the course number and at most one section letter: MATH1AH, MATH10H
+_HONORS_CODE = re.compile(r'^(.*\d[A-Z]?)H$')
+
+# Node kinds
+_LEAF, _AND, _OR = 0, 1, 2
+
+
+def normalize_course_code(code: str) -> str:
+    """'math 1a', 'MATH  1A' and 'MATH1A' all become 'MATH1A'"""
+    return _WHITESPACE.sub('', str(code or '')).upper()
+
+
+def regular_course_code(key: str) -> str:
+    """Normalized honors code 'MATH1AH' -> 'MATH1A', 'MATH10H' -> 'MATH10'; anything else unchanged"""
+    match = _HONORS_CODE.match(key)
+    return match.group(1) if match else key
+
+
+class _Outcome:
+    """Evaluation of one node: whether it's met and the cheapest way to meet it"""
+    __slots__ = ('satisfied', 'missing', 'unmet', 'after_transfer')
+
+    def __init__(self, satisfied: bool, missing: int, unmet: Tuple[str, ...], after_transfer: Tuple[str, ...]):
+        self.satisfied = satisfied
+        self.missing = missing  # sending-course bits still to take on the cheapest path
+        self.unmet = unmet  # receiving courses not yet covered on that path
+        self.after_transfer = after_transfer  # receiving courses with no articulation at the sending school
+
+
+class RequirementTree:
+    """An agreement compiled for repeated evaluation against completed courses"""
+
+    def __init__(self, agreement: Agreement):
+        self.agreement = agreement
+        self._bits: Dict[str, int] = {}
+        self._courses: List[CourseRef] = []
+        self._leaves: Dict[str, tuple] = {}
+        self._groups: List[Tuple[RequirementGroup, tuple, bool]] = []
+
+        for group in agreement.groups:
+            if group.structure == 'recommended':
+                for subsection in group.subsections or []:
+                    self._groups.append((subsection, self._compile_group(subsection), False))
+            else:
+                self._groups.append((group, self._compile_group(group), True))
+        self._units = [course.units or 0.0 for course in self._courses]
+
+    # -- compilation ---------------------------------------------------------
+
+    def _bit(self, course: CourseRef) -> int:
+        key = normalize_course_code(course.code)
+        position = self._bits.get(key)
+        if position is None:
+            position = self._bits[key] = len(self._courses)
+            self._courses.append(course)
+        return position
+
+    def _leaf(self, receiving_code: str) -> tuple:
+        leaf = self._leaves.get(receiving_code)
+        if leaf is None:
+            masks = []
+            for group in self.agreement.articulations.get(receiving_code, []):
+                if any(course.is_no_course or not course.code for course in group):
+                    continue
+                mask = 0
+                for course in group:
+                    mask |= 1 << self._bit(course)
+                masks.append(mask)
+            leaf = self._leaves[receiving_code] = (_LEAF, receiving_code, tuple(masks))
+        return leaf
+
+    def _compile_courses(self, courses: List[CourseRef]) -> tuple:
+        # A receiving series is articulated under its first course's code only
+        codes = [course.code for course in courses if course.code]
+        articulated = [code for code in codes if code in self.agreement.articulations]
+        leaves = [self._leaf(code) for code in (articulated or codes[:1])]
+        return leaves[0] if len(leaves) == 1 else (_AND, tuple(leaves))  # an empty AND is met
+
+    def _compile_group(self, group: RequirementGroup) -> tuple:
+        if group.options:
+            options = tuple(self._compile_courses(option.courses) for option in group.options)
+            return options[0] if len(options) == 1 else (_OR, options)
+        return self._compile_courses(group.courses or [])
+
+    # -- evaluation ----------------------------------------------------------
+
+    def completed_mask(self, completed_codes: Iterable[str]) -> int:
+        """
+        Bitmask of the articulated courses among `completed_codes`.
+        An honors course ("MATH 1AH") also counts as its regular version.
+        """
+        mask = 0
+        for code in completed_codes:
+            key = normalize_course_code(code)
+            position = self._bits.get(key)
+            if position is None:
+                position = self._bits.get(regular_course_code(key))
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def _units_of(self, mask: int) -> float:
+        total = 0.0
+        while mask:
+            low = mask & -mask
+            total += self._units[low.bit_length() - 1]
+            mask ^= low
+        return total
+
+    def _evaluate(self, node: tuple, done: int) -> _Outcome:
+        kind = node[0]
+        if kind == _LEAF:
+            masks = node[2]
+            if not masks:
+                return _Outcome(False, 0, (node[1],), (node[1],))
+            best = None
+            for mask in masks:
+                missing = mask & ~done
+                if not missing:
+                    return _Outcome(True, 0, (), ())
+                rank = (self._units_of(missing), bin(missing).count('1'))
+                if best is None or rank < best[0]:
+                    best = (rank, missing)
+            return _Outcome(False, best[1], (node[1],), ())
+
+        outcomes = [self._evaluate(child, done) for child in node[1]]
+        if kind == _AND:
+            missing, unmet, after_transfer = 0, (), ()
+            for outcome in outcomes:
+                missing |= outcome.missing
+                unmet += outcome.unmet
+                after_transfer += outcome.after_transfer
+            return _Outcome(all(o.satisfied for o in outcomes), missing, unmet, after_transfer)
+
+        # OR: a met option wins; otherwise the one that leaves the least to do at the sending school
+        best, best_rank = None, None
+        for outcome in outcomes:
+            if outcome.satisfied:
+                return outcome
+            rank = (len(outcome.after_transfer), self._units_of(outcome.missing), bin(outcome.missing).count('1'))
+            if best_rank is None or rank < best_rank:
+                best, best_rank = outcome, rank
+        return best
+
+    def _course_list(self, mask: int) -> List[Dict[str, Any]]:
+        courses = []
+        for position, course in enumerate(self._courses):
+            if mask >> position & 1:
+                courses.append({'code': course.code, 'title': course.title, 'units': course.units})
+        return courses
+
+    def evaluate(self, completed_codes: Iterable[str]) -> Dict[str, Any]:
+        """
+        Progress against the agreement.
+
+        Returns satisfied and remaining requirement groups, the cheapest set of
+        sending-school courses (by units) that completes every remaining
+        required group, and receiving courses that can only be taken after transfer.
+        """
+        done = self.completed_mask(completed_codes)
+        satisfied, remaining, recommended = [], [], []
+        required_missing = 0
+        after_transfer: List[str] = []
+
+        for group, node, required in self._groups:
+            outcome = self._evaluate(node, done)
+            if outcome.satisfied:
+                satisfied.append(group.number)
+                continue
+            entry = {
+                'number': group.number,
+                'title': group.title,
+                'structure': group.structure,
+                'unmet': list(dict.fromkeys(outcome.unmet)),
+                'courses': self._course_list(outcome.missing),
+                'after_transfer': list(dict.fromkeys(outcome.after_transfer)),
+            }
+            if required:
+                remaining.append(entry)
+                required_missing |= outcome.missing
+                after_transfer.extend(code for code in outcome.after_transfer if code not in after_transfer)
+            else:
+                recommended.append(entry)
+
+        required_groups = sum(1 for _, _, required in self._groups if required)
+        return {
+            'satisfied': satisfied,
+            'remaining': remaining,
+            'recommended_remaining': recommended,
+            'cheapest_remaining': {
+                'courses': self._course_list(required_missing),
+                'units': self._units_of(required_missing),
+            },
+            'after_transfer': after_transfer,
+            'completed_applied': [course['code'] for course in self._course_list(done)],
+            'required_groups': required_groups,
+            'satisfied_required_groups': required_groups - len(remaining),
+        }
+
+
+def requirement_progress(agreement: Optional[Agreement], completed_codes: Iterable[str]) -> Optional[Dict[str, Any]]:
+    """Compile and evaluate in one step; None when there's no agreement to evaluate"""
+    if agreement is None or not agreement.groups:
+        return None
+    return RequirementTree(agreement).evaluate(completed_codes)
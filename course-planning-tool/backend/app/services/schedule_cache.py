@@ -0,0 +1,134 @@
+"""
+Content-addressed cache for AI-generated schedules.
+
+The planning prompt is fully determined by a few profile fields, the
+completed courses, the agreement and the unit preference, so the cache key
+is a hash of those inputs in canonical form rather than of the prompt text.
+The agreement and the completed-course set are hashed separately into the
+key: a re-scraped agreement or a changed transcript addresses a new entry,
+and the old one simply ages out of Redis.
+"""
+import hashlib
+import json
+import time
+from typing import Any, Dict, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis import get_async_redis
+from app.scrapers.articulation_model import Agreement, to_compact
+from app.services.requirement_engine import normalize_course_code
+
+# Bump when the prompt or model changes, so schedules from the old prompt aren't served
+SCHEDULE_CACHE_PREFIX = "ai:schedule:v2"
+
+# The profile and preference fields the planning prompt reads
+_PROFILE_FIELDS = ("current_institution", "target_institution", "current_major", "target_major", "planning_quarter")
+_PREFERENCE_FIELDS = ("units_per_quarter",)
+
+
+def _digest(value: Any) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def agreement_digest(requirements: Any) -> str:
+    """Hash of the agreement snapshot, whether parsed or still scraper data"""
+    if not requirements:
+        return _digest(None)
+    agreement = requirements if isinstance(requirements, Agreement) else Agreement.from_dict(requirements)
+    return _digest(to_compact(agreement))
+
+
+def completed_courses_digest(completed_courses: Any) -> str:
+    """Hash of the completed-course set; order and code spelling don't matter"""
+    courses = sorted(
+        (
+            normalize_course_code(course.get("code") or course.get("course_code")),
+            float(course.get("units") or 0),
+            str(course.get("grade") or "").strip().upper(),
+        )
+        for course in completed_courses or []
+    )
+    return _digest(courses)
+
+
+def schedule_cache_key(planning_context: Dict[str, Any]) -> str:
+    profile = planning_context.get("profile") or {}
+    preferences = planning_context.get("preferences") or {}
+    inputs = {
+        "profile": {field: str(profile.get(field) or "").strip().lower() for field in _PROFILE_FIELDS},
+        "preferences": {field: preferences.get(field) for field in _PREFERENCE_FIELDS},
+    }
+    return "|".join([
+        SCHEDULE_CACHE_PREFIX,
+        agreement_digest(planning_context.get("transfer_requirements"))[:16],
+        completed_courses_digest(planning_context.get("completed_courses"))[:16],
+        _digest(inputs)[:32],
+    ])
+
+
+class ScheduleCache:
+    """
+    Redis cache of AI schedules by `schedule_cache_key`.
+
+    Each entry remembers how long the AI took to produce it, so hits report
+    the latency they saved. Without Redis every lookup is a miss.
+    """
+
+    def __init__(self, ttl_seconds: int, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        client = await get_async_redis()
+        payload = None
+        if client is not None:
+            try:
+                payload = await client.get(key)
+            except redis.RedisError:
+                metrics.inc("schedule_cache.errors")
+        if payload is None:
+            metrics.inc("schedule_cache.misses")
+            return None
+
+        entry = json.loads(payload)
+        metrics.inc("schedule_cache.hits")
+        metrics.inc("schedule_cache.saved_seconds", entry.get("generation_seconds", 0.0))
+        metrics.observe("schedule_cache.saved_seconds", entry.get("generation_seconds", 0.0))
+        return entry["schedule"]
+
+    async def set(self, key: str, schedule: Dict[str, Any], generation_seconds: float) -> None:
+        if not self.enabled:
+            return
+        client = await get_async_redis()
+        if client is None:
+            return
+        entry = {"schedule": schedule, "generation_seconds": round(generation_seconds, 3), "stored_at": time.time()}
+        try:
+            await client.set(key, json.dumps(entry, separators=(",", ":")), ex=self.ttl_seconds)
+            metrics.inc("schedule_cache.stores")
+        except redis.RedisError:
+            metrics.inc("schedule_cache.errors")
+
+    def stats(self) -> Dict[str, Any]:
+        hits = metrics.counter("schedule_cache.hits")
+        misses = metrics.counter("schedule_cache.misses")
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "saved_seconds": round(metrics.counter("schedule_cache.saved_seconds"), 3),
+        }
+
+
+schedule_cache = ScheduleCache(
+    ttl_seconds=settings.SCHEDULE_CACHE_TTL_SECONDS,
+    enabled=settings.SCHEDULE_CACHE_ENABLED,
+)
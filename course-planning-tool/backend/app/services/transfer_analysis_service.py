@@ -0,0 +1,492 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.scrapers.articulation_model import Agreement
+from app.scrapers.assist_catalog import CatalogMismatch, assist_catalog
+from app.scrapers.assist_scraper import scrape_assist_data_async
+from app.services.ai_planning_service import AIPlanningService
+from app.services.quarter_planner import SCHEDULE_ENGINES, QuarterPlanner
+from app.services.requirement_engine import requirement_progress
+from app.utils.alias_matcher import AliasMatch, AliasMatcher
+
+# Receives (stage, payload) as the analysis moves along; may be sync or async
+StageCallback = Callable[[str, Dict[str, Any]], Optional[Awaitable[None]]]
+
+
+class TransferAnalysisError(Exception):
+    """An analysis failure with the HTTP status the API should answer with"""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Maps common abbreviations and variations to ASSIST.org major names
+MAJOR_ALIASES = {
+    # Computer Science variations
+    "cs": "Computer Science",
+    "computer science": "Computer Science",
+    "comp sci": "Computer Science",
+    "computer sci": "Computer Science",
+    "csc": "Computer Science",
+    
+    # Mathematics variations
+    "math": "Mathematics",
+    "mathematics": "Mathematics",
+    "applied math": "Applied Mathematics",
+    "applied mathematics": "Applied Mathematics",
+    "pure math": "Pure Mathematics",
+    "pure mathematics": "Pure Mathematics",
+    
+    # Engineering variations
+    "ee": "Electrical Engineering",
+    "electrical engineering": "Electrical Engineering",
+    "computer engineering": "Computer Engineering",
+    "comp eng": "Computer Engineering",
+    "cpe": "Computer Engineering",
+    "me": "Mechanical Engineering",
+    "mechanical engineering": "Mechanical Engineering",
+    "ce": "Civil Engineering",
+    "civil engineering": "Civil Engineering",
+    "chemical engineering": "Chemical Engineering",
+    "chem eng": "Chemical Engineering",
+    "bioengineering": "Bioengineering",
+    "bio eng": "Bioengineering",
+    
+    # Business variations
+    "business": "Business Administration",
+    "business admin": "Business Administration",
+    "business administration": "Business Administration",
+    "econ": "Economics",
+    "economics": "Economics",
+    
+    # Biology variations
+    "bio": "Biology",
+    "biology": "Biology",
+    "biochemistry": "Biochemistry",
+    "biochem": "Biochemistry",
+    "molecular biology": "Molecular Biology",
+    
+    # Chemistry variations
+    "chem": "Chemistry",
+    "chemistry": "Chemistry",
+    
+    # Physics variations
+    "physics": "Physics",
+    "astrophysics": "Astrophysics",
+    
+    # Psychology variations
+    "psych": "Psychology",
+    "psychology": "Psychology",
+    
+    # English variations
+    "english": "English",
+    "english lit": "English Literature",
+    "english literature": "English Literature",
+    
+    # History variations
+    "history": "History",
+    "hist": "History",
+    
+    # Political Science variations
+    "poli sci": "Political Science",
+    "political science": "Political Science",
+    "polisci": "Political Science",
+    
+    # Art variations
+    "art": "Art",
+    "fine art": "Fine Arts",
+    "fine arts": "Fine Arts",
+    "art history": "Art History",
+    
+    # Communication variations
+    "comm": "Communication Studies",
+    "communication": "Communication Studies",
+    "communications": "Communication Studies",
+    "communication studies": "Communication Studies",
+    
+    # Sociology variations
+    "soc": "Sociology",
+    "sociology": "Sociology",
+    
+    # Anthropology variations
+    "anthro": "Anthropology",
+    "anthropology": "Anthropology",
+    
+    # Philosophy variations
+    "phil": "Philosophy",
+    "philosophy": "Philosophy",
+}
+
+# Maps common abbreviations and variations to ASSIST.org institution names
+INSTITUTION_ALIASES = {
+    # Community Colleges
+    "de anza": "De Anza College",
+    "de anza college": "De Anza College",
+    "foothill": "Foothill College",
+    "foothill college": "Foothill College",
+    "diablo valley": "Diablo Valley College",
+    "diablo valley college": "Diablo Valley College",
+    "city college of san francisco": "City College of San Francisco",
+    "ccsf": "City College of San Francisco",
+    
+    # UC System
+    "uc berkeley": "University of California, Berkeley",
+    "ucb": "University of California, Berkeley",
+    "berkeley": "University of California, Berkeley",
+    "university of california berkeley": "University of California, Berkeley",
+    "university of california, berkeley": "University of California, Berkeley",
+    
+    "uc davis": "University of California, Davis",
+    "ucd": "University of California, Davis",
+    "davis": "University of California, Davis",
+    
+    "uc irvine": "University of California, Irvine",
+    "uci": "University of California, Irvine",
+    "irvine": "University of California, Irvine",
+    
+    "uc los angeles": "University of California, Los Angeles",
+    "ucla": "University of California, Los Angeles",
+    "los angeles": "University of California, Los Angeles",
+    
+    "uc san diego": "University of California, San Diego",
+    "ucsd": "University of California, San Diego",
+    "san diego": "University of California, San Diego",
+    
+    "uc santa barbara": "University of California, Santa Barbara",
+    "ucsb": "University of California, Santa Barbara",
+    "santa barbara": "University of California, Santa Barbara",
+    
+    # CSU System
+    "san jose state": "San Jose State University",
+    "sjsu": "San Jose State University",
+    "san francisco state": "San Francisco State University",
+    "sfsu": "San Francisco State University",
+}
+
+# Compiled once; short major abbreviations only match exactly to avoid false positives inside longer names
+_major_matcher = AliasMatcher(MAJOR_ALIASES, min_substring_length=4)
+_institution_matcher = AliasMatcher(INSTITUTION_ALIASES)
+
+
+def normalize_major_name(raw_major: str) -> str:
+    """
+    Normalize major names to match ASSIST.org format
+    Maps common abbreviations and variations to full major names
+    """
+    if not raw_major:
+        return raw_major
+    match = _major_matcher.match(raw_major)
+    # If no mapping found, return the original with proper capitalization
+    return match.value if match else raw_major.title()
+
+
+def normalize_institution_name(raw_institution: str) -> str:
+    """
+    Normalize institution names to match ASSIST.org format
+    """
+    if not raw_institution:
+        return raw_institution
+    match = _institution_matcher.match(raw_institution)
+    return match.value if match else raw_institution.title()
+
+
+def match_major_name(raw_major: str) -> Optional[AliasMatch]:
+    """The alias match behind normalize_major_name, with its method and confidence"""
+    return _major_matcher.match(raw_major)
+
+
+def match_institution_name(raw_institution: str) -> Optional[AliasMatch]:
+    """The alias match behind normalize_institution_name, with its method and confidence"""
+    return _institution_matcher.match(raw_institution)
+
+
+def resolve_assist_names(academic_year: str, institution: str, target_institution: str, major: str,
+                         strict: bool = False) -> Tuple[str, str, str]:
+    """
+    ASSIST.org names for a transfer path: alias-normalized, then the exact
+    catalog labels when the catalog knows them. Every scrape and cache lookup
+    goes through this, so a path is cached under one key whoever asks for it.
+
+    Raises:
+        CatalogMismatch: with `strict`, when the catalog knows the path doesn't exist
+    """
+    institution = normalize_institution_name(institution)
+    target_institution = normalize_institution_name(target_institution)
+    major = normalize_major_name(major)
+    if settings.ASSIST_CATALOG_ENABLED and all([institution, target_institution, major]):
+        try:
+            return assist_catalog.resolve_transfer_path(academic_year, institution, target_institution, major)
+        except CatalogMismatch:
+            if strict:
+                raise
+    return institution, target_institution, major
+
+
+def normalize_major_names(raw_majors: List[str]) -> List[str]:
+    """Batch form of normalize_major_name for bulk imports"""
+    return [
+        match.value if match else (raw.title() if raw else raw)
+        for raw, match in zip(raw_majors, _major_matcher.match_many(raw_majors))
+    ]
+
+
+def normalize_institution_names(raw_institutions: List[str]) -> List[str]:
+    """Batch form of normalize_institution_name for bulk imports"""
+    return [
+        match.value if match else (raw.title() if raw else raw)
+        for raw, match in zip(raw_institutions, _institution_matcher.match_many(raw_institutions))
+    ]
+
+
+class TransferAnalysisService:
+    """
+    The public transfer analysis pipeline: ASSIST.org scrape, then an AI schedule.
+
+    Shared by the synchronous /transfer/analyze-public endpoint and the
+    background job workers so both produce the same payload.
+    """
+
+    def __init__(self):
+        self.ai_service = AIPlanningService()
+        self.quarter_planner = QuarterPlanner()
+
+    @staticmethod
+    def prepare_public_request(request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a frontend analyze-public request and normalize it to ASSIST.org names
+
+        Raises:
+            TransferAnalysisError: (400) when required fields are missing or malformed, or
+            the catalog knows the institutions, agreement or major don't exist on ASSIST.org
+        """
+        # Map frontend parameters to backend expected format
+        raw_current_institution = request.get("current_institution")
+        raw_target_institution = request.get("intended_transfer_institution")
+        raw_major = request.get("current_major")
+        raw_year = request.get("target_transfer_quarter")  # This contains the year like "2025"
+
+        # Convert year to academic year format (e.g., "2025" -> "2024-2025")
+        if raw_year and str(raw_year).isdigit():
+            year = int(raw_year)
+            academic_year = f"{year-1}-{year}"
+        else:
+            raise TransferAnalysisError("target_transfer_quarter must be a valid year (e.g., '2025')", 400)
+
+        if not all([raw_current_institution, raw_target_institution, raw_major]):
+            raise TransferAnalysisError(
+                "Missing required parameters: current_institution, intended_transfer_institution, current_major",
+                400
+            )
+        if not request.get("current_planning_quarter"):
+            raise TransferAnalysisError("current_planning_quarter is required", 400)
+        schedule_engine = (request.get("schedule_engine") or settings.SCHEDULE_ENGINE).lower()
+        if schedule_engine not in SCHEDULE_ENGINES:
+            raise TransferAnalysisError(
+                f"schedule_engine must be one of: {', '.join(SCHEDULE_ENGINES)}", 400
+            )
+
+        # Exact ASSIST.org names; impossible combinations are rejected before scraping
+        try:
+            current_institution, target_institution, major = resolve_assist_names(
+                academic_year, raw_current_institution, raw_target_institution, raw_major, strict=True
+            )
+        except CatalogMismatch as e:
+            raise TransferAnalysisError(str(e), 400)
+
+        return {
+            "academic_year": academic_year,
+            "current_institution": current_institution,
+            "target_institution": target_institution,
+            "major": major,
+            "completed_courses": request.get("completed_courses", []) or [],
+            "current_planning_quarter": request.get("current_planning_quarter"),
+            "target_transfer_quarter": str(raw_year),
+            "units_per_quarter": request.get("units_per_quarter", 15),  # Get from request or reasonable default
+            "schedule_engine": schedule_engine,
+        }
+
+    async def analyze_public(self, params: Dict[str, Any], on_stage: Optional[StageCallback] = None) -> Dict[str, Any]:
+        """
+        Run the analysis for parameters from `prepare_public_request`
+
+        `on_stage` receives "scraping", the scraper's own stages ("browser_leased",
+        "agreement_loaded", "major_selected"), "requirements_parsed" with the
+        parsed requirements as payload, "planning", "schedule_preview" with the
+        solver's schedule when the AI engine runs with previews on, "schedule_course"
+        with each AI-planned course as soon as the model has written it, and
+        "schedule_ready". Without `on_stage` the AI answer isn't streamed.
+
+        Returns:
+            dict: The analyze-public response payload
+        Raises:
+            TransferAnalysisError: (503) when ASSIST.org or the AI service fails
+        """
+        async def stage(name: str, payload: Optional[Dict[str, Any]] = None):
+            if on_stage is not None:
+                result = on_stage(name, payload or {})
+                if result is not None:
+                    await result
+
+        def scraper_stage(name: str):
+            # Called on the loop from the scraping thread, so async callbacks are scheduled rather than awaited
+            if on_stage is None:
+                return
+            try:
+                result = on_stage(name, {})
+                if result is not None:
+                    asyncio.ensure_future(result)
+            except Exception as e:
+                print(f"⚠️ Progress callback failed at {name}: {e}")
+
+        academic_year = params["academic_year"]
+        current_institution = params["current_institution"]
+        target_institution = params["target_institution"]
+        major = params["major"]
+
+        print(f"Processed parameters for ASSIST.org:")
+        print(f"  current_institution: {current_institution}")
+        print(f"  target_institution: {target_institution}")
+        print(f"  major: {major}")
+        print(f"  academic_year: {academic_year}")
+
+        await stage("scraping")
+        try:
+            scraper_result = await scrape_assist_data_async(
+                academic_year=academic_year,
+                institution=current_institution,
+                target_institution=target_institution,
+                major_filter=major,
+                on_progress=scraper_stage
+            )
+        except Exception as e:
+            scraper_result = {"success": False, "error": str(e), "data": {}}
+
+        # Handle case where scraper returns None or fails
+        if not isinstance(scraper_result, dict):
+            print(f"❌ Scraper returned unexpected type: {type(scraper_result)}")
+            scraper_result = {"success": False, "error": f"Scraper returned {type(scraper_result)}", "data": {}}
+
+        if not scraper_result.get("success", False):
+            error_msg = scraper_result.get("error", "Unknown scraping error")
+            print(f"❌ Scraper failed: {error_msg}")
+            # NO FALLBACK DATA
+            raise TransferAnalysisError(
+                f"Transfer analysis unavailable: ASSIST.org scraping failed - {error_msg}. Please try again later or check if the institution/major combination exists on ASSIST.org.",
+                503
+            )
+
+        requirements_data = scraper_result.get("data", {})
+        await stage("requirements_parsed", {
+            "target_requirements": requirements_data.get("target_requirements", []),
+            "source_requirements": requirements_data.get("source_requirements", {}),
+        })
+
+        # Now use AI to generate a course schedule based on the scraped data
+        print("🤖 Generating AI-powered course schedule...")
+        await stage("planning")
+        # Parsed once here so the planner reads typed courses and units instead of re-parsing strings
+        planning_context = self._planning_context(params, Agreement.from_dict(requirements_data))
+        schedule_engine = params.get("schedule_engine") or settings.SCHEDULE_ENGINE
+        schedule_preview = None
+        if schedule_engine == "solver" or settings.SCHEDULE_PREVIEW_ENABLED:
+            try:
+                schedule_preview = await self.quarter_planner.generate_quarter_schedule(planning_context)
+            except Exception as solver_error:
+                print(f"❌ Schedule solver failed: {solver_error}")
+                if schedule_engine == "solver":
+                    raise TransferAnalysisError(f"Schedule generation failed: {str(solver_error)}", 503)
+
+        if schedule_engine == "solver":
+            ai_schedule, schedule_preview = schedule_preview, None
+        else:
+            if schedule_preview is not None:
+                # Instant answer while the AI call runs
+                await stage("schedule_preview", {"schedule": schedule_preview})
+            ai_schedule = await self._ai_schedule(planning_context, stage if on_stage is not None else None)
+        await stage("schedule_ready")
+
+        # Format response to match what frontend expects
+        return {
+            "academic_year": academic_year,
+            "source_institution": current_institution,
+            "target_institution": target_institution,
+            "major": major,
+            "target_requirements": requirements_data.get("target_requirements", []),
+            "source_requirements": requirements_data.get("source_requirements", {}),
+            "ai_schedule": ai_schedule,  # Add the AI-generated schedule
+            "schedule_engine": schedule_engine,
+            "schedule_preview": schedule_preview,
+            "user_timeline": {
+                "target_transfer_quarter": params["target_transfer_quarter"],
+                "current_planning_quarter": params["current_planning_quarter"]
+            },
+            "analysis_metadata": {
+                "quarters_until_transfer": 2,
+                "analysis_date": None,  # Use real date if needed
+                "requirements_source": "ASSIST.org + AI Planning"
+            }
+        }
+
+    async def _ai_schedule(
+        self,
+        planning_context: Dict[str, Any],
+        stage: Optional[Callable[..., Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        try:
+            if stage is None:
+                return await self.ai_service.generate_quarter_schedule(planning_context)
+            schedule = None
+            async for kind, payload in self.ai_service.stream_quarter_schedule(planning_context):
+                if kind == "course":
+                    await stage("schedule_course", {"course": payload})
+                else:
+                    schedule = payload
+            return schedule
+        except Exception as ai_error:
+            print(f"❌ AI scheduling failed: {ai_error}")
+            # Fail with proper error - NO FALLBACK DATA
+            raise TransferAnalysisError(
+                f"AI schedule generation failed: {str(ai_error)}. ASSIST.org data was retrieved but schedule generation is unavailable.",
+                503
+            )
+
+    def _planning_context(self, params: Dict[str, Any], agreement: Agreement) -> Dict[str, Any]:
+        """Context for AI planning - USE ONLY REAL DATA"""
+        target_transfer_quarter = params["target_transfer_quarter"]
+        transfer_year = int(target_transfer_quarter) if target_transfer_quarter.isdigit() else None
+
+        return {
+            "profile": {
+                "current_institution": params["current_institution"],
+                "target_institution": params["target_institution"],
+                "current_major": params["major"],
+                "target_major": params["major"],
+                "current_quarter": params["current_planning_quarter"],
+                "current_year": transfer_year - 1 if transfer_year else None,  # Extract from transfer year
+                "transfer_quarter": target_transfer_quarter,
+                "transfer_year": transfer_year
+            },
+            "completed_courses": [
+                {
+                    "code": course.get("courseNumber", ""),
+                    "title": f"Course {course.get('courseNumber', '')}",
+                    "units": float(course.get("credits", 0)),  # No fallback to 3
+                    "grade": course.get("grade", ""),
+                    "quarter": "Previous",
+                    "year": transfer_year - 1 if transfer_year else None
+                }
+                for course in params["completed_courses"] if course.get("courseNumber")  # Only include courses with valid data
+            ],
+            "transfer_requirements": agreement,
+            # Exact remaining work, so the planner doesn't have to work it out from raw course lists
+            "requirement_progress": requirement_progress(
+                agreement, [course.get("courseNumber", "") for course in params["completed_courses"]]
+            ),
+            "preferences": {
+                "units_per_quarter": params["units_per_quarter"],
+                "max_units_per_quarter": 18,
+                "min_units_per_quarter": 12
+            }
+        }
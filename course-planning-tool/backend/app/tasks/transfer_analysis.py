@@ -0,0 +1,39 @@
+import asyncio
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from app.core.celery_app import RUN_ANALYSIS_JOB_TASK, celery_app
+from app.core.config import settings
+from app.core.executors import shutdown_executors
+from app.scrapers.assist_catalog import assist_catalog
+from app.scrapers.driver_pool import shutdown_driver_pool
+from app.services.analysis_job_service import execute_analysis_job
+from app.services.llm_client import llm_client
+
+
+@celery_app.task(name=RUN_ANALYSIS_JOB_TASK)
+def run_analysis_job(job_id: str) -> None:
+    """Run one queued transfer analysis; progress and results go to the job store"""
+    asyncio.run(_run_analysis_job(job_id))
+
+
+async def _run_analysis_job(job_id: str) -> None:
+    try:
+        await execute_analysis_job(job_id)
+    finally:
+        # The LLM connection pool belongs to this task's loop, which asyncio.run closes next
+        await llm_client.close()
+
+
+@worker_process_init.connect
+def _load_assist_catalog(**kwargs):
+    # Jobs resolve names inside asyncio.run; read the catalog file before any loop starts
+    if settings.ASSIST_CATALOG_ENABLED:
+        assist_catalog.load()
+
+
+@worker_process_shutdown.connect
+def _release_scraper_resources(**kwargs):
+    # Worker processes own their own Chrome pool and executor
+    shutdown_executors()
+    shutdown_driver_pool()
@@ -0,0 +1,161 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class AliasMatch(NamedTuple):
+    value: str
+    confidence: float
+    method: str  # "exact", "substring" or "fuzzy"
+
+
+def _fuzzy_key(text: str) -> str:
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _on_word_boundaries(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] neither begins nor ends in the middle of a word"""
+    return (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+
+
+def _trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class AhoCorasick:
+    """Finds every occurrence of a fixed set of patterns in one pass over the text"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, including those reached through fail links
+        self._output: List[List[int]] = [[]]
+        self.patterns: List[str] = []
+
+        for pattern in patterns:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+            self._output[state].append(len(self.patterns))
+            self.patterns.append(pattern)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """(start offset, pattern index) for every match"""
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for pattern_index in self._output[state]:
+                matches.append((end + 1 - len(self.patterns[pattern_index]), pattern_index))
+        return matches
+
+
+class AliasMatcher:
+    """
+    Maps free-text names onto canonical names through an alias table.
+
+    Built once: an exact-alias dict, an Aho-Corasick automaton over the
+    aliases for substring hits (the longest alias found in the text wins,
+    then the earliest), and a trigram index for a fuzzy fallback scored by
+    Dice similarity. Substring hits must span whole words, so "ucb" doesn't
+    match inside "Pucbridge".
+    """
+
+    def __init__(self, aliases: Dict[str, str], min_substring_length: int = 0, min_fuzzy_score: float = 0.7):
+        self._exact = {alias.lower().strip(): value for alias, value in aliases.items()}
+        self._substring_values = [value for alias, value in self._exact.items() if len(alias) >= min_substring_length]
+        self._automaton = AhoCorasick(
+            alias for alias in self._exact if len(alias) >= min_substring_length
+        )
+        self.min_fuzzy_score = min_fuzzy_score
+
+        # Canonical names are fuzzy targets too, so near-misses of an unaliased spelling still land
+        self._fuzzy_values: List[str] = []
+        self._fuzzy_grams: List[set] = []
+        self._gram_index: Dict[str, List[int]] = {}
+        for alias, value in list(self._exact.items()) + [(value.lower(), value) for value in set(self._exact.values())]:
+            key = _fuzzy_key(alias)
+            if not key:
+                continue
+            grams = _trigrams(key)
+            position = len(self._fuzzy_values)
+            self._fuzzy_values.append(value)
+            self._fuzzy_grams.append(grams)
+            for gram in grams:
+                self._gram_index.setdefault(gram, []).append(position)
+
+    def match(self, text: str) -> Optional[AliasMatch]:
+        if not text:
+            return None
+        lowered = text.lower().strip()
+
+        value = self._exact.get(lowered)
+        if value is not None:
+            return AliasMatch(value, 1.0, "exact")
+
+        best = None
+        for start, pattern_index in self._automaton.find_all(lowered):
+            end = start + len(self._automaton.patterns[pattern_index])
+            if not _on_word_boundaries(lowered, start, end):
+                continue
+            rank = (len(self._automaton.patterns[pattern_index]), -start)
+            if best is None or rank > best[0]:
+                best = (rank, pattern_index)
+        if best is not None:
+            length = best[0][0]
+            return AliasMatch(self._substring_values[best[1]], round(length / len(lowered), 3), "substring")
+
+        return self._fuzzy(lowered)
+
+    def match_many(self, texts: Iterable[str]) -> List[Optional[AliasMatch]]:
+        """Match a batch, resolving each distinct spelling once"""
+        seen: Dict[str, Optional[AliasMatch]] = {}
+        results = []
+        for text in texts:
+            key = (text or "").lower().strip()
+            if key not in seen:
+                seen[key] = self.match(text)
+            results.append(seen[key])
+        return results
+
+    def _fuzzy(self, lowered: str) -> Optional[AliasMatch]:
+        key = _fuzzy_key(lowered)
+        if not key:
+            return None
+        grams = _trigrams(key)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for position in self._gram_index.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+
+        best_position, best_score = None, 0.0
+        for position, count in shared.items():
+            score = 2 * count / (len(grams) + len(self._fuzzy_grams[position]))
+            if score > best_score:
+                best_position, best_score = position, score
+        if best_position is None or best_score < self.min_fuzzy_score:
+            return None
+        return AliasMatch(self._fuzzy_values[best_position], round(best_score, 3), "fuzzy")
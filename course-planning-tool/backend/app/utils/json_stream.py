@@ -0,0 +1,79 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+class JSONArrayStreamParser:
+    """
+    Pulls the elements of one array out of a JSON document while it streams in.
+
+    `feed` takes the next chunk of text and returns the elements of the array
+    at `path` (e.g. ("quarter", "courses")) that were completed by it, each
+    parsed as soon as its closing bracket arrives. Text before the document's
+    first '{' (such as a ```json fence) is skipped. The scanner only tracks
+    strings, nesting and object keys, so each character is looked at once.
+    """
+
+    def __init__(self, path: Sequence[str]):
+        self.path = tuple(path)
+        self.text = ""
+        self._position = 0
+        self._started = False
+        self._in_string = False
+        self._escaped = False
+        # One entry per open container: (kind, key it sits under, key being read inside it)
+        self._stack: List[List[Any]] = []
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._element_start: Optional[int] = None
+
+    def _current_path(self) -> Tuple[str, ...]:
+        return tuple(entry[1] for entry in self._stack[1:])
+
+    def _in_target_array(self) -> bool:
+        return bool(self._stack) and self._stack[-1][0] == '[' and self._current_path() == self.path
+
+    def feed(self, chunk: str) -> List[Any]:
+        self.text += chunk
+        completed = []
+        text = self.text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if not self._started:
+                if char != '{':
+                    continue
+                self._started = True
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:index + 1]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char == ':' and self._stack and self._stack[-1][0] == '{' and self._last_string is not None:
+                self._stack[-1][2] = json.loads(self._last_string)
+            elif char in '{[':
+                if self._in_target_array() and self._element_start is None:
+                    self._element_start = index
+                parent_key = self._stack[-1][2] if self._stack and self._stack[-1][0] == '{' else None
+                self._stack.append([char, parent_key, None])
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if self._element_start is not None and self._in_target_array():
+                    completed.append(json.loads(text[self._element_start:index + 1]))
+                    self._element_start = None
+            elif char == ',' and self._stack and self._stack[-1][0] == '{':
+                self._stack[-1][2] = None
+            if char != '"':
+                # A string only becomes a key when the next significant character is ':'
+                if not char.isspace() and char != ':':
+                    self._last_string = None
+        self._position = len(text)
+        return completed
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark and regression check for ASSIST report parsing.
+
+Runs every saved `.reportContainer` fixture in fixtures/assist_reports through
+the lxml parser and the BeautifulSoup reference, timing each stage, measuring
+peak memory, and diffing the output against the golden JSON next to the
+fixtures. Exits non-zero if any output drifts from its golden file.
+
+    python benchmark_report_parser.py
+    python benchmark_report_parser.py --iterations 50 --scale 20
+    python benchmark_report_parser.py --update-golden
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append('.')
+from bs4 import BeautifulSoup
+
+from app.scrapers.assist_report_parser import (
+    ReportIndex,
+    extract_course_info,
+    get_sending_requirements,
+    parse_articulation_structure,
+    parse_report,
+    parse_report_reference,
+)
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_reports')
+PARSERS = ('lxml', 'reference')
+
+
+def golden_path(fixture_path):
+    stem = os.path.splitext(os.path.basename(fixture_path))[0]
+    return os.path.join(os.path.dirname(fixture_path), 'golden', f"{stem}.json")
+
+
+def to_document(result):
+    sections, sending = result
+    return {'target_requirements': sections, 'source_requirements': sending}
+
+
+def scale_report(html, scale):
+    """Repeat a report's groups so small fixtures stand in for large agreements"""
+    if scale <= 1:
+        return html
+    start = html.find('>') + 1
+    end = html.rindex('</div>')
+    return html[:start] + html[start:end] * scale + html[end:]
+
+
+def median_ms(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def reference_stages(html, iterations):
+    soup = BeautifulSoup(html, 'html.parser')
+    course_lines = soup.find_all('div', class_='courseLine')
+    return {
+        'build': median_ms(lambda: BeautifulSoup(html, 'html.parser'), iterations),
+        'extract_course_info': median_ms(lambda: [extract_course_info(line) for line in course_lines], iterations),
+        'parse_articulation_structure': median_ms(lambda: parse_articulation_structure(soup), iterations),
+        'get_sending_requirements': median_ms(lambda: get_sending_requirements(soup), iterations),
+    }
+
+
+def lxml_stages(html, iterations):
+    # Every stage gets a fresh index so memoised course lines don't flatter later stages
+    def stage(fn):
+        samples = []
+        for _ in range(iterations):
+            index = ReportIndex.from_html(html)
+            started = time.perf_counter()
+            fn(index)
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+    def course_info(index):
+        root = index.nodes[0] if index.nodes else None
+        return [index.course_info(line) for line in index.find_all(root, 'courseLine')] if root is not None else []
+
+    return {
+        'build': median_ms(lambda: ReportIndex.from_html(html), iterations),
+        'extract_course_info': stage(course_info),
+        'parse_articulation_structure': stage(lambda index: index.articulation_structure()),
+        'get_sending_requirements': stage(lambda index: index.sending_requirements()),
+    }
+
+
+def peak_memory_kb(parse, html):
+    tracemalloc.start()
+    try:
+        parse(html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def diff_against(expected, actual, label):
+    expected_lines = json.dumps(expected, indent=2, sort_keys=True).splitlines()
+    actual_lines = json.dumps(actual, indent=2, sort_keys=True).splitlines()
+    return list(difflib.unified_diff(expected_lines, actual_lines, 'golden', label, lineterm=''))
+
+
+def benchmark_fixture(path, parsers, iterations, scale):
+    with open(path, encoding='utf-8') as f:
+        html = scale_report(f.read(), scale)
+
+    entry = {
+        'fixture': os.path.basename(path),
+        'scale': scale,
+        'size_kb': len(html.encode('utf-8')) / 1024,
+        'parsers': {},
+        'diffs': {},
+    }
+    golden = None
+    if scale == 1 and os.path.exists(golden_path(path)):
+        with open(golden_path(path), encoding='utf-8') as f:
+            golden = json.load(f)
+
+    outputs = {}
+    for name in parsers:
+        parse = parse_report if name == 'lxml' else parse_report_reference
+        stages = lxml_stages(html, iterations) if name == 'lxml' else reference_stages(html, iterations)
+        total_ms = median_ms(lambda: parse(html), iterations)
+        entry['parsers'][name] = {
+            'stages_ms': stages,
+            'total_ms': total_ms,
+            'reports_per_second': 1000 / total_ms if total_ms else float('inf'),
+            'mb_per_second': (entry['size_kb'] / 1024) / (total_ms / 1000) if total_ms else float('inf'),
+            'peak_memory_kb': peak_memory_kb(parse, html),
+        }
+        outputs[name] = to_document(parse(html))
+
+    if golden is not None:
+        for name, output in outputs.items():
+            diff = diff_against(golden, output, name)
+            if diff:
+                entry['diffs'][name] = diff
+    elif scale == 1:
+        entry['diffs']['golden'] = [f"missing golden file {golden_path(path)} (run with --update-golden)"]
+    elif len(outputs) == 2 and outputs['lxml'] != outputs['reference']:
+        # Scaled reports have no golden file; the parsers must at least agree
+        entry['diffs']['lxml'] = diff_against(outputs['reference'], outputs['lxml'], 'lxml')
+
+    return entry
+
+
+def update_golden(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            html = f.read()
+        document = to_document(parse_report_reference(html))
+        target = golden_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"📝 Wrote {os.path.relpath(target)}")
+
+
+def print_report(results):
+    stage_names = ['build', 'extract_course_info', 'parse_articulation_structure', 'get_sending_requirements']
+    for entry in results:
+        print(f"\n📄 {entry['fixture']} ({entry['size_kb']:.1f} KB)")
+        print(f"   {'parser':<10} {'build':>8} {'courses':>9} {'structure':>10} {'sending':>9} "
+              f"{'total ms':>9} {'reports/s':>10} {'MB/s':>7} {'peak KB':>9}")
+        for name, stats in entry['parsers'].items():
+            stages = [stats['stages_ms'][stage] for stage in stage_names]
+            print(f"   {name:<10} {stages[0]:>8.2f} {stages[1]:>9.2f} {stages[2]:>10.2f} {stages[3]:>9.2f} "
+                  f"{stats['total_ms']:>9.2f} {stats['reports_per_second']:>10.1f} "
+                  f"{stats['mb_per_second']:>7.2f} {stats['peak_memory_kb']:>9.0f}")
+        if 'lxml' in entry['parsers'] and 'reference' in entry['parsers']:
+            speedup = entry['parsers']['reference']['total_ms'] / entry['parsers']['lxml']['total_ms']
+            print(f"   ⚡ lxml speedup: {speedup:.1f}x")
+        for name, diff in entry['diffs'].items():
+            print(f"   ❌ {name} output differs:")
+            for line in diff[:40]:
+                print(f"      {line}")
+            if len(diff) > 40:
+                print(f"      ... {len(diff) - 40} more lines")
+        if not entry['diffs']:
+            print("   ✅ matches golden output" if entry['scale'] == 1 else "   ✅ parsers agree")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ASSIST report parsing against golden fixtures')
+    parser.add_argument('--fixtures', default=FIXTURE_DIR, help='Directory of saved .reportContainer HTML')
+    parser.add_argument('--parser', choices=PARSERS + ('both',), default='both', help='Parser(s) to benchmark')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed runs per stage (median is reported)')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repeat each report N times to simulate large agreements (skips golden diffs)')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='Rewrite golden JSON from the reference parser and exit')
+    parser.add_argument('--json', dest='json_path', help='Also write the full results to this file')
+    args = parser.parse_args()
+
+    paths = sorted(
+        os.path.join(args.fixtures, name)
+        for name in os.listdir(args.fixtures)
+        if name.endswith('.html')
+    )
+    if not paths:
+        print(f"❌ No .html fixtures in {args.fixtures}")
+        return 1
+
+    if args.update_golden:
+        update_golden(paths)
+        return 0
+
+    parsers = PARSERS if args.parser == 'both' else (args.parser,)
+    results = [benchmark_fixture(path, parsers, max(1, args.iterations), max(1, args.scale)) for path in paths]
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failed = [entry['fixture'] for entry in results if entry['diffs']]
+    print(f"\n{'❌' if failed else '✅'} {len(results) - len(failed)}/{len(results)} fixtures match expected output")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Articulation agreements shared by the tests, in the scraper's dict format.
+
+AND_OR_AGREEMENT exercises the requirement tree: a sequence, an A-or-B
+choice with a no-course option, a recommended group, honors and
+multi-course articulations. SEQUENCE_AGREEMENT is a plain chain of required
+courses for the planners.
+"""
+
+
+def course(code, units, title=None):
+    return {'code': code, 'title': title or code, 'units': f"{units:.2f} units"}
+
+
+def _titled(code, units):
+    return course(code, units, f"{code} title")
+
+
+AND_OR_AGREEMENT = {
+    'target_requirements': [
+        {'number': '1', 'title': 'Complete the following', 'structure': 'sequence',
+         'courses': [dict(course('MATH 1A', 4), type='receiving'), dict(course('MATH 1B', 4), type='receiving')]},
+        {'number': '2', 'title': 'Complete A or B', 'structure': 'choice',
+         'options': [{'letter': 'A', 'courses': [course('COMPSCI 61A', 4)]},
+                     {'letter': 'B', 'courses': [course('ENGIN 7', 4)]}]},
+        {'number': 'HIGHLY_RECOMMENDED', 'title': 'Highly Recommended', 'structure': 'recommended',
+         'subsections': [{'number': '3', 'title': 'A', 'structure': 'choice',
+                          'options': [{'letter': 'A', 'courses': [dict(course('STAT 20', 4), type='receiving')]}]}]},
+    ],
+    'source_requirements': {
+        # MATH 1A: regular or honors
+        'MATH 1A': [[course('MATH 1A', 5)], [course('MATH 1AH', 5)]],
+        # MATH 1B: a two-course sequence, or one intensive course
+        'MATH 1B': [[course('MATH 1B', 5), course('MATH 1C', 5)], [course('MATH 1BX', 6)]],
+        'COMPSCI 61A': [[{'code': 'NO_COURSE', 'title': 'No Course Articulated', 'units': ''}]],
+        'ENGIN 7': [[course('CIS 22A', 4.5), course('CIS 22B', 4.5)]],
+        'STAT 20': [[course('MATH 10', 5)]],
+    },
+}
+
+
+SEQUENCE_AGREEMENT = {
+    'target_requirements': [
+        {'number': '1', 'title': 'Complete the following', 'structure': 'sequence',
+         'courses': [_titled('MATH 1A', 4), _titled('MATH 1B', 4), _titled('MATH 53', 4)]},
+        {'number': '2', 'title': 'Complete the following', 'structure': 'sequence',
+         'courses': [_titled('COMPSCI 61A', 4), _titled('COMPSCI 61B', 4)]},
+        {'number': '3', 'title': 'Complete the following', 'structure': 'sequence',
+         'courses': [_titled('PHYSICS 7A', 4)]},
+        {'number': '4', 'title': 'Complete the following', 'structure': 'sequence',
+         'courses': [_titled('COMPSCI 70', 4)]},
+    ],
+    'source_requirements': {
+        'MATH 1A': [[_titled('MATH 1A', 5)], [_titled('MATH 1AH', 5)]],
+        'MATH 1B': [[_titled('MATH 1B', 5)]],
+        'MATH 53': [[_titled('MATH 1C', 5)]],
+        'COMPSCI 61A': [[_titled('CIS 22A', 4.5)]],
+        'COMPSCI 61B': [[_titled('CIS 22B', 4.5)]],
+        'PHYSICS 7A': [[_titled('PHYS 4A', 6)]],
+        'COMPSCI 70': [[{'code': 'NO_COURSE', 'title': 'No Course Articulated', 'units': ''}]],
+    },
+}
@@ -0,0 +1,26 @@
+"""
+Scoped overrides of app settings for tests.
+
+`without_assist_catalog()` keeps name resolution to the alias tables: the
+shared catalog would otherwise read ./data/assist_catalog.json and start a
+background refresh against assist.org.
+"""
+from contextlib import contextmanager
+
+from app.core.config import settings
+
+
+@contextmanager
+def overridden_settings(**values):
+    previous = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(settings, name, value)
+
+
+def without_assist_catalog():
+    return overridden_settings(ASSIST_CATALOG_ENABLED=False)
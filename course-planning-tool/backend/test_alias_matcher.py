@@ -0,0 +1,75 @@
+import sys
+
+sys.path.append('.')
+from app.services.transfer_analysis_service import (
+    match_major_name,
+    normalize_institution_name,
+    normalize_institution_names,
+    normalize_major_name,
+    normalize_major_names,
+)
+from app.utils.alias_matcher import AhoCorasick, AliasMatcher
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    found = sorted((start, automaton.patterns[index]) for start, index in automaton.find_all("ushers"))
+    assert found == [(1, "she"), (2, "he"), (2, "hers")]
+
+
+def test_longest_alias_wins():
+    matcher = AliasMatcher({
+        "los angeles": "University of California, Los Angeles",
+        "cal state los angeles": "California State University, Los Angeles",
+    })
+    match = matcher.match("transfer to cal state los angeles")
+    assert match.value == "California State University, Los Angeles"
+    assert match.method == "substring"
+
+
+def test_short_alias_does_not_match_inside_a_word():
+    matcher = AliasMatcher({"ucb": "University of California, Berkeley", "uci": "University of California, Irvine"})
+    assert matcher.match("Lucinda Community College") is None
+    assert matcher.match("Ducbury College") is None
+    assert matcher.match("transfer to ucb, fall").value == "University of California, Berkeley"
+    assert normalize_institution_name("Tucid College") == "Tucid College"
+    assert normalize_institution_name("transfer to UCI") == "University of California, Irvine"
+
+
+def test_normalization_matches_previous_rules():
+    assert normalize_major_name("CS") == "Computer Science"
+    assert normalize_major_name("Applied Math B.S.") == "Applied Mathematics"
+    assert normalize_major_name("me") == "Mechanical Engineering"
+    # Short abbreviations don't match inside longer words
+    assert normalize_major_name("Game Design") == "Game Design"
+    assert normalize_institution_name("UCLA") == "University of California, Los Angeles"
+    assert normalize_institution_name("De Anza Community College") == "De Anza College"
+    assert normalize_institution_name("") == ""
+
+
+def test_fuzzy_fallback():
+    match = match_major_name("Compter Science")
+    assert match.value == "Computer Science"
+    assert match.method == "fuzzy"
+    assert 0.7 <= match.confidence < 1.0
+    assert normalize_major_name("Psycology") == "Psychology"
+    assert match_major_name("Underwater Basket Weaving") is None
+
+
+def test_batch_normalization():
+    assert normalize_major_names(["cs", "Psych", "cs", "Marine Biology Studies"]) == [
+        "Computer Science", "Psychology", "Computer Science", "Biology"
+    ]
+    assert normalize_institution_names(["sjsu", "ucsd", "unknown college"]) == [
+        "San Jose State University", "University of California, San Diego", "Unknown College"
+    ]
+
+
+if __name__ == "__main__":
+    test_aho_corasick_finds_overlapping_patterns()
+    test_longest_alias_wins()
+    test_short_alias_does_not_match_inside_a_word()
+    test_normalization_matches_previous_rules()
+    test_fuzzy_fallback()
+    test_batch_normalization()
+    print("✅ Alias matcher normalizes majors and institutions")
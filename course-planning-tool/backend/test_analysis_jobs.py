@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import time
+
+sys.path.append('.')
+from app.core.metrics import metrics
+from app.services.analysis_job_service import ANALYZE_PUBLIC, AnalysisJobService, AnalysisJobStore
+from fixtures.settings import without_assist_catalog
+
+REQUEST = {
+    'current_institution': 'De Anza College',
+    'intended_transfer_institution': 'University of California, Berkeley',
+    'current_major': 'Computer Science',
+    'target_transfer_quarter': '2026',
+    'current_planning_quarter': 'Fall 2025',
+    'schedule_engine': 'solver',
+}
+
+
+class MemoryRedis:
+    """The few asyncio Redis commands the job store uses, with expiry"""
+
+    def __init__(self):
+        self.values = {}
+
+    def _live(self, key):
+        value, expires_at = self.values.get(key, (None, None))
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.values[key]
+            return None
+        return value
+
+    async def get(self, key):
+        return self._live(key)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and self._live(key) is not None:
+            return None
+        self.values[key] = (str(value), time.monotonic() + ex if ex else None)
+        return True
+
+    async def exists(self, key):
+        return int(self._live(key) is not None)
+
+    async def delete(self, key):
+        return int(self.values.pop(key, None) is not None)
+
+
+class MemoryJobStore(AnalysisJobStore):
+    def __init__(self, heartbeat_ttl_seconds=60):
+        super().__init__(ttl_seconds=60, heartbeat_ttl_seconds=heartbeat_ttl_seconds)
+        self.redis = MemoryRedis()
+
+    async def _client(self):
+        return self.redis
+
+
+class RecordingJobService(AnalysisJobService):
+    """Records dispatches instead of sending them to Celery"""
+
+    def __init__(self, store):
+        super().__init__(store)
+        self.dispatched = []
+
+    async def _dispatch(self, job_id):
+        self.dispatched.append(job_id)
+
+
+def test_store_round_trip():
+    store = MemoryJobStore()
+
+    async def run():
+        job, created = await store.create('job-1', ANALYZE_PUBLIC, {'major': 'Computer Science'})
+        assert created and job['status'] == 'queued'
+        # Creating the same job again finds the stored one
+        again, created = await store.create('job-1', ANALYZE_PUBLIC, {'major': 'Computer Science'})
+        assert not created and again == job
+
+        updated = await store.update('job-1', status='running', stage='scraping')
+        assert (await store.get('job-1')) == updated
+        assert updated['stage'] == 'scraping' and updated['updated_at'] >= job['updated_at']
+        assert await store.update('missing', status='running') is None
+
+        assert not await store.has_heartbeat('job-1')
+        await store.beat('job-1')
+        assert await store.has_heartbeat('job-1')
+        await store.end_heartbeat('job-1')
+        assert not await store.has_heartbeat('job-1')
+
+    asyncio.run(run())
+    assert AnalysisJobStore.job_id_for(ANALYZE_PUBLIC, {'a': 1, 'b': 2}) == \
+        AnalysisJobStore.job_id_for(ANALYZE_PUBLIC, {'b': 2, 'a': 1})
+
+
+def test_identical_requests_share_one_job():
+    service = RecordingJobService(MemoryJobStore())
+
+    async def run():
+        first, queued = await service.submit_public_analysis(REQUEST)
+        assert queued
+        deduplicated = metrics.counter('analysis_jobs.deduplicated')
+        second, queued = await service.submit_public_analysis(dict(REQUEST))
+        assert not queued and second['job_id'] == first['job_id']
+        assert metrics.counter('analysis_jobs.deduplicated') == deduplicated + 1
+
+        # A failed job is retried under the same ID
+        await service.store.update(first['job_id'], status='failed', stage='failed', error='boom')
+        retried, queued = await service.submit_public_analysis(REQUEST)
+        assert queued and retried['status'] == 'queued' and retried['error'] is None
+        return first['job_id']
+
+    with without_assist_catalog():
+        job_id = asyncio.run(run())
+    assert service.dispatched == [job_id, job_id]
+
+
+def test_running_job_without_a_heartbeat_is_not_deduplicated():
+    service = RecordingJobService(MemoryJobStore(heartbeat_ttl_seconds=0.05))
+
+    async def run():
+        job, _ = await service.submit_public_analysis(REQUEST)
+        job_id = job['job_id']
+        await service.store.beat(job_id)
+        await service.store.update(job_id, status='running', stage='scraping')
+
+        # A live worker's job is shared
+        _, queued = await service.submit_public_analysis(REQUEST)
+        assert not queued
+
+        # The worker died: its heartbeat expires, the job reads as failed and a resubmit runs it again
+        await asyncio.sleep(0.1)
+        abandoned = await service.get_job(job_id)
+        assert abandoned['status'] == 'failed' and abandoned['error_status'] == 500
+        await service.store.update(job_id, status='running', stage='scraping')
+        job, queued = await service.submit_public_analysis(REQUEST)
+        assert queued and job['status'] == 'queued'
+
+    with without_assist_catalog():
+        asyncio.run(run())
+    assert len(service.dispatched) == 2
+
+
+if __name__ == "__main__":
+    test_store_round_trip()
+    test_identical_requests_share_one_job()
+    test_running_job_without_a_heartbeat_is_not_deduplicated()
+    print("✅ Analysis jobs are stored, deduplicated and failed once their worker stops")
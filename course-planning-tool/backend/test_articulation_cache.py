@@ -0,0 +1,158 @@
+import asyncio
+import sys
+import time
+
+import redis
+
+sys.path.append('.')
+import app.scrapers.articulation_cache as articulation_cache_module
+from app.core.metrics import metrics
+from app.scrapers.articulation_cache import ArticulationCache, articulation_cache_key
+from fixtures.agreements import AND_OR_AGREEMENT, SEQUENCE_AGREEMENT
+
+
+class DictRedis:
+    """The get/set/delete a cache needs from Redis, optionally failing every call"""
+
+    def __init__(self, failing=False):
+        self.values = {}
+        self.ttls = {}
+        self.failing = failing
+
+    def _check(self):
+        if self.failing:
+            raise redis.ConnectionError("connection reset")
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def delete(self, key):
+        self._check()
+        self.values.pop(key, None)
+
+
+class AsyncDictRedis:
+    def __init__(self, shared):
+        self.shared = shared
+
+    async def get(self, key):
+        return self.shared.get(key)
+
+
+def with_redis(client, check):
+    """Run `check()` with the cache module talking to `client` (None: Redis is unreachable)"""
+    patched = ('get_redis', 'get_async_redis', 'mark_redis_unavailable')
+    originals = {name: getattr(articulation_cache_module, name) for name in patched}
+
+    async def async_client():
+        return AsyncDictRedis(client) if client is not None else None
+
+    articulation_cache_module.get_redis = lambda: client
+    articulation_cache_module.get_async_redis = async_client
+    articulation_cache_module.mark_redis_unavailable = lambda: None  # Keep the shared client for other tests
+    try:
+        return check()
+    finally:
+        for name, original in originals.items():
+            setattr(articulation_cache_module, name, original)
+
+
+def counters():
+    return {name: metrics.counter(f"articulation_cache.{name}")
+            for name in ("hits.memory", "hits.redis", "misses", "stores", "errors")}
+
+
+def delta(before):
+    return {name: count - before[name] for name, count in counters().items() if count != before[name]}
+
+
+def test_keys_normalize_spelling_variants():
+    assert articulation_cache_key('2024-25', 'De Anza College', 'UC Berkeley', 'Computer Science, B.A.') == \
+        articulation_cache_key('2024 - 2025', 'de anza  college', 'uc berkeley', 'computer science b a')
+
+
+def test_memory_tier_evicts_least_recently_used():
+    def check():
+        cache = ArticulationCache(max_entries=2, ttl_seconds=60)
+        cache.set('a', AND_OR_AGREEMENT)
+        cache.set('b', SEQUENCE_AGREEMENT)
+        assert cache.get('a') is not None  # 'a' is now the most recently used
+        cache.set('c', AND_OR_AGREEMENT)
+        assert cache.get('b') is None
+        assert cache.get('a') is not None and cache.get('c') is not None
+        assert cache.stats()['memory_entries'] == 2
+
+    with_redis(None, check)
+
+
+def test_entries_expire_after_the_ttl():
+    def check():
+        cache = ArticulationCache(max_entries=4, ttl_seconds=0.05)
+        cache.set('a', AND_OR_AGREEMENT)
+        assert client.ttls['a'] == 0.05  # Redis expires its copy too
+        assert cache.get('a') is not None
+        time.sleep(0.06)
+        del client.values['a']  # Redis would have dropped it by now
+        assert cache.get('a') is None
+        assert cache.stats()['memory_entries'] == 0
+
+    client = DictRedis()
+    with_redis(client, check)
+
+
+def test_hits_and_misses_by_tier():
+    client = DictRedis()
+
+    def check():
+        writer = ArticulationCache(max_entries=4, ttl_seconds=60)
+        writer.set('a', AND_OR_AGREEMENT)
+
+        before = counters()
+        assert writer.get('a') == ArticulationCache(max_entries=4, ttl_seconds=60).get('a')
+        assert delta(before) == {'hits.memory': 1, 'hits.redis': 1}
+
+        # Another worker's cache finds the entry in Redis, then keeps it in memory
+        reader = ArticulationCache(max_entries=4, ttl_seconds=60)
+        before = counters()
+        agreement = asyncio.run(reader.get_agreement_async('a'))
+        assert agreement is not None and agreement.to_dict() == writer.get('a')
+        assert reader.get('a') is not None and reader.get('missing') is None
+        assert delta(before) == {'hits.redis': 1, 'hits.memory': 2, 'misses': 1}
+        assert 0 < reader.stats()['hit_rate'] < 1
+
+    with_redis(client, check)
+
+
+def test_works_from_memory_when_redis_fails():
+    def check():
+        cache = ArticulationCache(max_entries=4, ttl_seconds=60)
+        before = counters()
+        cache.set('a', AND_OR_AGREEMENT)
+        assert cache.get('a') is not None
+        assert cache.get('missing') is None
+        assert delta(before) == {'stores': 1, 'errors': 2, 'hits.memory': 1, 'misses': 1}
+
+    with_redis(DictRedis(failing=True), check)
+
+    def unreachable():
+        cache = ArticulationCache(max_entries=4, ttl_seconds=60)
+        cache.set('a', AND_OR_AGREEMENT)
+        assert cache.get('a') is not None
+        assert asyncio.run(cache.get_async('missing')) is None
+
+    with_redis(None, unreachable)
+
+
+if __name__ == "__main__":
+    test_keys_normalize_spelling_variants()
+    test_memory_tier_evicts_least_recently_used()
+    test_entries_expire_after_the_ttl()
+    test_hits_and_misses_by_tier()
+    test_works_from_memory_when_redis_fails()
+    print("✅ Articulation cache evicts, expires, falls back to memory and counts hits")
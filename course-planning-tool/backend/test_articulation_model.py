@@ -0,0 +1,72 @@
+import glob
+import json
+import os
+import sys
+
+sys.path.append('.')
+from app.scrapers import articulation_model
+from app.scrapers.articulation_model import Agreement, decode_agreement, encode_agreement
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_reports', 'golden')
+
+
+def load_goldens():
+    for path in sorted(glob.glob(os.path.join(GOLDEN_DIR, '*.json'))):
+        with open(path) as f:
+            yield os.path.basename(path), json.load(f)
+
+
+def test_round_trips_golden_reports():
+    for name, golden in load_goldens():
+        agreement = Agreement.from_dict(golden)
+        assert agreement.to_dict() == golden, name
+        assert decode_agreement(encode_agreement(agreement)).to_dict() == golden, name
+
+
+def test_units_and_codes_are_parsed_once():
+    data = {
+        'academic_year': '2024-2025',
+        'major': 'Applied Math',
+        'target_requirements': [{
+            'number': '1', 'title': 'Complete the following', 'structure': 'sequence',
+            'courses': [{'code': 'MATH 1A', 'title': 'Calculus', 'units': '4.00 units', 'type': 'receiving'}]
+        }],
+        'source_requirements': {
+            'MATH 1A': [
+                [{'code': 'MATH 1A', 'title': 'Calculus', 'units': '5.00 units'}],
+                [{'code': 'MATH 1AH', 'title': 'Honors Calculus', 'units': '5 units'}]
+            ]
+        }
+    }
+    agreement = Agreement.from_dict(data)
+    course = agreement.groups[0].courses[0]
+    assert course.units == 4.0 and course.units_text is None
+    honors = agreement.articulations['MATH 1A'][1][0]
+    assert honors.units == 5.0 and honors.units_label == '5 units'
+    assert [c.code for c in agreement.sending_courses()] == ['MATH 1A', 'MATH 1AH']
+    assert agreement.to_dict() == data
+
+
+def test_compact_encoding_is_smaller():
+    for name, golden in load_goldens():
+        plain = json.dumps(golden, separators=(',', ':')).encode()
+        assert len(encode_agreement(Agreement.from_dict(golden))) < len(plain), name
+
+
+def test_json_encoding_without_msgpack():
+    previous, articulation_model.msgpack = articulation_model.msgpack, None
+    try:
+        for name, golden in load_goldens():
+            payload = encode_agreement(Agreement.from_dict(golden))
+            assert payload[:1] == b'['
+            assert decode_agreement(payload).to_dict() == golden, name
+    finally:
+        articulation_model.msgpack = previous
+
+
+if __name__ == "__main__":
+    test_round_trips_golden_reports()
+    test_units_and_codes_are_parsed_once()
+    test_compact_encoding_is_smaller()
+    test_json_encoding_without_msgpack()
+    print("✅ Articulation model round-trips every golden report")
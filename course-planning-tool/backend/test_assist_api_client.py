@@ -0,0 +1,206 @@
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.append('.')
+from app.scrapers import assist_api_client
+from app.scrapers.assist_api_client import (
+    AssistApiClient, AssistApiError, major_label_index, scrape_assist_batch_via_api
+)
+from app.scrapers.assist_ids import AssistIdResolver, agreement_url
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_api')
+
+APPLIED_MATH_KEY = "75/113/to/79/Major/6c3b2f1e-8f58-4a7c-9a34-3b1c0f2d9e11"
+
+
+class AssistStubHandler(BaseHTTPRequestHandler):
+    """Serves recorded ASSIST API responses from fixtures/assist_api"""
+
+    def _fixture_for(self, path, query):
+        if path == '/api/AcademicYears':
+            return 'academic_years.json'
+        if path == '/api/institutions':
+            return 'institutions.json'
+        if path.startswith('/api/institutions/') and path.endswith('/agreements'):
+            return f"institution_{path.split('/')[3]}_agreements.json"
+        if path == '/api/agreements':
+            return (f"agreements_{query['academicYearId'][0]}_{query['sendingInstitutionId'][0]}_"
+                    f"{query['receivingInstitutionId'][0]}_{query['categoryCode'][0]}.json")
+        if path == '/api/articulation/Agreements' and query.get('Key') == [APPLIED_MATH_KEY]:
+            return 'articulation_applied_math.json'
+        return None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = self._fixture_for(url.path, parse_qs(url.query))
+        fixture = os.path.join(FIXTURE_DIR, name) if name else None
+        if not fixture or not os.path.exists(fixture):
+            self.send_response(404)
+            self.end_headers()
+            return
+        with open(fixture, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), AssistStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_assist_api_client():
+    server = start_stub_server()
+    client = AssistApiClient(base_url=f"http://127.0.0.1:{server.server_address[1]}/api")
+    try:
+        data = client.fetch_requirements(
+            academic_year="2024-2025",
+            institution="De Anza College",
+            target_institution="University of California, Berkeley",
+            major_filter="Applied Math"
+        )
+
+        assert data['major'] == "Applied Math"
+        sections = data['target_requirements']
+        assert [s['number'] for s in sections] == ['1', '2', 'HIGHLY_RECOMMENDED']
+
+        sequence = sections[0]
+        assert sequence['structure'] == 'sequence'
+        assert sequence['title'] == 'Complete the following'
+        assert sequence['courses'][0] == {
+            'code': 'MATH 1A', 'title': 'Calculus', 'units': '4.00 units', 'type': 'receiving'
+        }
+
+        choice = sections[1]
+        assert choice['title'] == 'Complete A or B'
+        assert [o['letter'] for o in choice['options']] == ['A', 'B']
+        assert choice['options'][1]['courses'][0]['code'] == 'ENGIN 7'
+        assert 'type' not in choice['options'][1]['courses'][0]
+
+        recommended = sections[2]
+        assert recommended['subsections'][0]['number'] == '3'
+        series = recommended['subsections'][0]['options'][1]['courses']
+        assert [c['code'] for c in series] == ['STAT 20', 'DATA C8']
+
+        sending = data['source_requirements']
+        assert [[c['code'] for c in group] for group in sending['MATH 1A']] == [['MATH 1A'], ['MATH 1AH']]
+        assert [c['code'] for c in sending['MATH 1B'][0]] == ['MATH 1B', 'MATH 1C']
+        assert sending['COMPSCI 61A'] == [[{'code': 'NO_COURSE', 'title': 'No Course Articulated', 'units': ''}]]
+        assert sending['STAT 20'][0][0]['units'] == '5.00 units'
+
+        try:
+            client.fetch_requirements("2024-2025", "De Anza College", "University of California, Berkeley", "Astrophysics")
+            assert False, "expected unknown major to fail"
+        except AssistApiError:
+            pass
+
+        # An exact major label beats an earlier one that contains it
+        assert client.resolve_major_report(75, 113, 79, 'Mathematics, B.A.')['label'] == 'Mathematics, B.A.'
+        assert client.resolve_major_report(75, 113, 79, 'mathematics, b.a.')['label'] == 'Mathematics, B.A.'
+        assert client.resolve_major_report(75, 113, 79, 'Mathematics')['label'] == 'Applied Mathematics, B.A.'
+
+        # Partial names resolve only when they point at one institution
+        assert client.resolve_institution_id("anza") == client.resolve_institution_id("De Anza College")
+        assert client.resolve_target_institution_id(113, "berkeley") == 79
+        for ambiguous in ("University of California", "college"):
+            try:
+                client.resolve_institution_id(ambiguous)
+                assert False, f"expected '{ambiguous}' to be rejected as ambiguous"
+            except AssistApiError as e:
+                assert 'ambiguous' in str(e)
+    finally:
+        client.close()
+        server.shutdown()
+
+
+def test_major_label_index():
+    # The Selenium major list's filtered rows resolve the same way
+    labels = ['Applied Mathematics, B.A.', 'Mathematics, B.A.']
+    assert major_label_index(labels, 'Mathematics, B.A.') == 1
+    assert major_label_index(labels, 'Mathematics') == 0
+    assert major_label_index(labels, 'Physics') is None
+
+
+def test_assist_api_batch():
+    server = start_stub_server()
+    client = AssistApiClient(base_url=f"http://127.0.0.1:{server.server_address[1]}/api")
+    previous, assist_api_client._client = assist_api_client._client, client
+    try:
+        pair = ("2024-2025", "De Anza College", "University of California, Berkeley")
+
+        results = list(scrape_assist_batch_via_api(*pair, majors=["Applied Math", "Astrophysics"]))
+        assert [major for major, _ in results] == ["Applied Math", "Astrophysics"]
+        assert results[0][1]['success'] and results[0][1]['data']['major'] == "Applied Math"
+        assert not results[1][1]['success']
+
+        # Every report in the agreement; only Applied Math has a recorded articulation
+        results = list(scrape_assist_batch_via_api(*pair))
+        assert [major for major, _ in results] == [
+            "Applied Mathematics, B.A.", "Computer Science, B.A.", "Mathematics, B.A."
+        ]
+        assert [result['success'] for _, result in results] == [True, False, False]
+
+        try:
+            list(scrape_assist_batch_via_api("2024-2025", "Nowhere College", "University of California, Berkeley"))
+            assert False, "expected unknown institution to fail"
+        except AssistApiError:
+            pass
+    finally:
+        assist_api_client._client = previous
+        client.close()
+        server.shutdown()
+
+
+def test_assist_id_resolver():
+    server = start_stub_server()
+    client = AssistApiClient(base_url=f"http://127.0.0.1:{server.server_address[1]}/api")
+    previous, assist_api_client._client = assist_api_client._client, client
+    try:
+        resolver = AssistIdResolver(ttl_seconds=60, refresh_seconds=60)
+        pair = ("2024-25", "de anza college", "University of California, Berkeley")
+
+        ids = resolver.resolve_agreement(*pair)
+        assert ids == (75, 113, 79)
+        report_key = resolver.resolve_report_key(*pair, "Applied Math")
+        assert report_key == APPLIED_MATH_KEY
+        # The catalog's exact label isn't lost to an earlier label containing it
+        assert resolver.resolve_report_key(*pair, "Mathematics, B.A.") != APPLIED_MATH_KEY
+        assert agreement_url(*ids, report_key=report_key) == (
+            "https://assist.org/transfer/results?year=75&institution=113&agreement=79&agreementType=to"
+            "&view=agreement&viewBy=major&viewSendingAgreements=false&viewByKey=" + APPLIED_MATH_KEY
+        )
+
+        # Resolved IDs are served without the API, even once they are due for a refresh
+        server.shutdown()
+        server.server_close()
+        assert resolver.resolve_agreement("2024-2025", "De Anza College", "University of California, Berkeley") == ids
+        resolver.refresh_seconds = 0
+        assert resolver.resolve_report_key(*pair, "Applied Math") == APPLIED_MATH_KEY
+
+        try:
+            resolver.resolve_agreement("2024-2025", "Nowhere College", "University of California, Berkeley")
+            assert False, "expected unknown institution to fail"
+        except AssistApiError:
+            pass
+    finally:
+        assist_api_client._client = previous
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_assist_api_client()
+    test_major_label_index()
+    test_assist_api_batch()
+    test_assist_id_resolver()
+    print("✅ ASSIST API client matches recorded fixtures")
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+
+sys.path.append('.')
+from app.scrapers import assist_api_client
+from app.scrapers.assist_api_client import AssistApiClient
+from app.scrapers.assist_catalog import AssistCatalog, CatalogMismatch, NameIndex
+from test_assist_api_client import start_stub_server
+
+BERKELEY = "University of California, Berkeley"
+
+
+def test_name_index():
+    index = NameIndex(["Applied Mathematics, B.A.", "Computer Science, B.A.", "Mathematics, B.A."])
+    assert index.exact("computer science b a") == 1
+    assert index.search("math") == [0, 2]
+    assert index.search("appl math") == [0]
+    assert index.search("physics") == []
+    assert index.best("Mathematics") == 0  # first label containing the text, like the ASSIST filter
+
+
+def test_assist_catalog():
+    server = start_stub_server()
+    client = AssistApiClient(base_url=f"http://127.0.0.1:{server.server_address[1]}/api")
+    previous, assist_api_client._client = assist_api_client._client, client
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        try:
+            catalog = AssistCatalog(path=path, refresh_seconds=3600)
+            catalog.refresh(sending_ids=[113], pairs=[(75, 113, 79)])
+
+            assert catalog.resolve_transfer_path("2024-2025", "de anza", "berkeley", "Mathematics") == (
+                "De Anza College", BERKELEY, "Mathematics, B.A."
+            )
+            assert catalog.resolve_transfer_path("2024-25", "DEANZA", BERKELEY, "applied math")[2] == \
+                "Applied Mathematics, B.A."
+            assert [i["name"] for i in catalog.search_institutions("univ calif")] == [
+                BERKELEY, "University of California, Los Angeles"
+            ]
+
+            for args in [
+                ("2031-2032", "De Anza College", BERKELEY, "Mathematics"),
+                ("2024-2025", "Nowhere College", BERKELEY, "Mathematics"),
+                ("2024-2025", "De Anza College", "Stanford University", "Mathematics"),
+                ("2025-2026", "De Anza College", BERKELEY, "Mathematics"),
+                ("2024-2025", "De Anza College", BERKELEY, "Astrophysics"),
+            ]:
+                try:
+                    catalog.resolve_transfer_path(*args)
+                    assert False, f"expected {args} to be rejected"
+                except CatalogMismatch:
+                    pass
+
+            # A fresh process serves the stored catalog without the API
+            server.shutdown()
+            reloaded = AssistCatalog(path=path, refresh_seconds=3600)
+            assert reloaded.is_ready()
+            assert reloaded.resolve_transfer_path("2024-2025", "Foothill College", BERKELEY, "Physics") == (
+                "Foothill College", BERKELEY, "Physics"
+            )
+        finally:
+            assist_api_client._client = previous
+            client.close()
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_name_index()
+    test_assist_catalog()
+    print("✅ ASSIST catalog resolves and rejects transfer paths")
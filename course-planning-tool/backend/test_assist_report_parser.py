@@ -0,0 +1,74 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append('.')
+from app.scrapers.assist_report_parser import parse_report, parse_report_reference
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_reports')
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def engineering_sized_report(repeat=25):
+    """Repeat the recorded groups until the report is as large as an engineering agreement"""
+    html = load_fixture('deanza_ucb_applied_math.html')
+    body = html[html.index('<div class="resultsBoxContent">'):html.rindex('</div>')]
+    return '<div class="reportContainer">' + body * repeat + '</div>'
+
+
+def test_parse_report_matches_reference():
+    html = load_fixture('deanza_ucb_applied_math.html')
+    sections, sending = parse_report(html)
+    assert (sections, sending) == parse_report_reference(html)
+
+    assert [s['number'] for s in sections] == ['1', '2', 'HIGHLY_RECOMMENDED']
+    assert [c['code'] for c in sections[0]['courses']] == ['MATH 1A', 'MATH 1B', 'MATH 53', 'MATH 54']
+    # courseCode fallback, entity decoding and trailing dash removal
+    assert sections[0]['courses'][3]['title'] == 'Linear Algebra & Differential Equations'
+    assert sending['MATH 1A'] == [
+        [{'code': 'MATH 1A', 'title': 'Calculus', 'units': '5.00 units'}],
+        [{'code': 'MATH 1AH', 'title': 'Calculus - Honors', 'units': '5.00 units'}],
+    ]
+    assert sending['COMPSCI 61A'] == [[{'code': 'NO_COURSE', 'title': 'No Course Articulated', 'units': ''}]]
+    assert sending['MATH 54'][0][0]['units'] == '5.00 units'
+
+
+def test_golden_fixtures():
+    """Both parsers reproduce the golden JSON for every saved report"""
+    fixtures = sorted(name for name in os.listdir(FIXTURE_DIR) if name.endswith('.html'))
+    assert fixtures
+    for name in fixtures:
+        html = load_fixture(name)
+        with open(os.path.join(FIXTURE_DIR, 'golden', name.replace('.html', '.json')), encoding='utf-8') as f:
+            golden = json.load(f)
+        for parse in (parse_report, parse_report_reference):
+            sections, sending = parse(html)
+            assert {'target_requirements': sections, 'source_requirements': sending} == golden, \
+                f"{parse.__name__} drifted from golden output for {name}"
+
+
+def test_parse_report_large_agreement():
+    html = engineering_sized_report()
+    started = time.perf_counter()
+    result = parse_report(html)
+    elapsed = time.perf_counter() - started
+    assert result == parse_report_reference(html)
+    assert elapsed < 0.5, f"lxml parser took {elapsed:.3f}s on a large report"
+
+
+def test_parse_report_empty():
+    assert parse_report('') == ([], {})
+    assert parse_report('<div class="reportContainer"></div>') == ([], {})
+
+
+if __name__ == "__main__":
+    test_parse_report_matches_reference()
+    test_golden_fixtures()
+    test_parse_report_large_agreement()
+    test_parse_report_empty()
+    print("✅ lxml report parser matches the BeautifulSoup reference")
@@ -0,0 +1,181 @@
+import asyncio
+import os
+import sys
+import tempfile
+import uuid
+
+sys.path.append('.')
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.api.v1.planning import _add_completed_courses, _known_prerequisites, _save_planned_courses
+from app.core.database import Base, async_database_url, create_async_database_engine, ensure_course_key_index
+from app.models.course import Course
+from app.models.enrolled_course import CourseStatus, EnrolledCourse
+from app.services.course_store import resolve_courses
+
+
+def test_async_database_url():
+    assert async_database_url('postgresql://user:pw@host:6543/postgres') == 'postgresql+asyncpg://user:pw@host:6543/postgres'
+    assert async_database_url('sqlite:///./course_planning.db') == 'sqlite+aiosqlite:///./course_planning.db'
+    assert async_database_url('postgresql+asyncpg://host/db') == 'postgresql+asyncpg://host/db'
+
+
+SCHEDULE = {
+    "quarter": {
+        "quarter_name": "Fall 2025",
+        "courses": [
+            {"course_code": "MATH 1A", "course_name": "Calculus I", "units": 5},
+            {"course_code": "CIS 22A", "course_name": "Beginning Programming", "units": 4.5},
+            {"course_code": "GE", "units": 3},
+        ],
+    }
+}
+
+
+def create_engine_with_tables():
+    path = os.path.join(tempfile.mkdtemp(), 'planning.db')
+    engine = create_async_database_engine(async_database_url(f'sqlite:///{path}'))
+
+    async def create():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[Course.__table__, EnrolledCourse.__table__])
+    return engine, create
+
+
+def test_planned_courses_round_trip_through_the_async_session():
+    engine, create_tables = create_engine_with_tables()
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    user_id = uuid.uuid4()
+
+    async def run():
+        await create_tables()
+        async with sessions() as db:
+            db.add(Course(code="MATH 1B", title="Calculus II", units=5, institution="De Anza",
+                          prerequisites=["MATH 1A"]))
+            # Another school's prerequisites don't apply to this student's plan
+            db.add(Course(code="MATH 2", title="Linear Algebra", units=5, institution="Foothill",
+                          prerequisites=["MATH 1C"]))
+            await db.commit()
+            # Saving twice replaces the plan rather than adding to it
+            await _save_planned_courses(SCHEDULE, user_id, db, "De Anza")
+            await _save_planned_courses(SCHEDULE, user_id, db, "De Anza")
+        async with sessions() as db:
+            planned = (await db.scalars(
+                select(EnrolledCourse).options(selectinload(EnrolledCourse.course)).filter(
+                    EnrolledCourse.user_id == user_id
+                ).order_by(EnrolledCourse.id)
+            )).all()
+            prerequisites = await _known_prerequisites(db, "De Anza")
+        await engine.dispose()
+        return planned, prerequisites
+
+    planned, prerequisites = asyncio.run(run())
+    assert [(row.course.code, row.course.units, row.quarter, row.year) for row in planned] == [
+        ("MATH 1A", 5, "Fall", 2025), ("CIS 22A", 4.5, "Fall", 2025)
+    ]
+    assert all(row.status == CourseStatus.PLANNED for row in planned)
+    assert prerequisites == {"MATH 1B": ["MATH 1A"]}
+
+
+def test_transcript_is_written_in_a_constant_number_of_statements():
+    engine, create_tables = create_engine_with_tables()
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    statements = []
+    event.listen(engine.sync_engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0]))
+
+    def transcript(count):
+        return [{"course_code": f"MATH {number}", "credits": 4, "grade": "A", "quarter": "Fall", "year": 2024}
+                for number in range(count)]
+
+    async def run():
+        await create_tables()
+        async with sessions() as db:
+            db.add(Course(code="MATH 0", title="Precalculus", units=5, institution="De Anza"))
+            db.add(Course(code="MATH 1", title="Elsewhere", units=3, institution="Foothill"))
+            await db.commit()
+
+        counts = []
+        for size in (5, 40):
+            statements.clear()
+            async with sessions() as db:
+                await _add_completed_courses(transcript(size), user_id, db, "De Anza")
+                await db.commit()
+            counts.append([statement for statement in statements if statement in ("SELECT", "INSERT")])
+
+        async with sessions() as db:
+            completed = (await db.scalars(
+                select(EnrolledCourse).options(selectinload(EnrolledCourse.course)).filter(
+                    EnrolledCourse.user_id == user_id
+                )
+            )).all()
+            courses = (await db.scalars(select(Course).filter(Course.institution == "De Anza"))).all()
+        await engine.dispose()
+        return counts, completed, courses
+
+    counts, completed, courses = asyncio.run(run())
+    # One lookup, one course upsert, one enrollment insert - for 5 courses or 40
+    assert counts == [["SELECT", "INSERT", "INSERT"]] * 2
+    assert len(completed) == 45
+    # The existing De Anza course is reused; the Foothill one with the same code isn't
+    assert len(courses) == 40
+    assert {row.course.units for row in completed if row.course.code == "MATH 0"} == {5}
+    assert {row.course.institution for row in completed} == {"De Anza"}
+
+
+def test_existing_duplicate_courses_are_merged_before_the_unique_index():
+    path = os.path.join(tempfile.mkdtemp(), 'legacy.db')
+    engine = create_async_database_engine(async_database_url(f'sqlite:///{path}'))
+    sessions = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def run():
+        # The tables as they were before (code, institution) was unique
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TABLE courses (id INTEGER PRIMARY KEY, code VARCHAR NOT NULL, title VARCHAR NOT NULL, "
+                "description TEXT, units FLOAT NOT NULL, institution VARCHAR NOT NULL, transferable BOOLEAN, "
+                "category VARCHAR, prerequisites JSON)"
+            ))
+            await conn.execute(text(
+                "CREATE TABLE enrolled_courses (id INTEGER PRIMARY KEY, user_id CHAR(32) NOT NULL, "
+                "course_id INTEGER NOT NULL REFERENCES courses (id), status VARCHAR NOT NULL, grade VARCHAR, "
+                "quarter VARCHAR, year INTEGER, units FLOAT, created_at DATETIME, updated_at DATETIME)"
+            ))
+            await conn.execute(text(
+                "INSERT INTO courses (id, code, title, units, institution) VALUES "
+                "(1, 'MATH 1A', 'Calculus I', 5, 'De Anza'), (2, 'MATH 1A', 'Calculus I', 5, 'De Anza'), "
+                "(3, 'MATH 1A', 'Calculus', 5, 'Foothill')"
+            ))
+            await conn.execute(text(
+                "INSERT INTO enrolled_courses (id, user_id, course_id, status) VALUES "
+                "(1, 'a', 1, 'completed'), (2, 'b', 2, 'completed'), (3, 'c', 3, 'planned')"
+            ))
+
+        await ensure_course_key_index(engine)
+        await ensure_course_key_index(engine)  # A second startup finds the index and does nothing
+
+        async with engine.connect() as conn:
+            courses = (await conn.execute(text("SELECT id, institution FROM courses ORDER BY id"))).all()
+            enrollments = (await conn.execute(text("SELECT id, course_id FROM enrolled_courses ORDER BY id"))).all()
+        # The bulk upsert's ON CONFLICT (code, institution) now has its index
+        async with sessions() as db:
+            resolved = await resolve_courses(db, {("De Anza", "MATH 1A"): {}, ("De Anza", "MATH 1B"): {"units": 5}})
+            await db.commit()
+        await engine.dispose()
+        return courses, enrollments, {key: course.id for key, course in resolved.items()}
+
+    courses, enrollments, resolved = asyncio.run(run())
+    assert [tuple(row) for row in courses] == [(1, "De Anza"), (3, "Foothill")]
+    assert [tuple(row) for row in enrollments] == [(1, 1), (2, 1), (3, 3)]
+    assert resolved[("De Anza", "MATH 1A")] == 1 and resolved[("De Anza", "MATH 1B")] not in (1, 3)
+
+
+if __name__ == "__main__":
+    test_async_database_url()
+    test_planned_courses_round_trip_through_the_async_session()
+    test_transcript_is_written_in_a_constant_number_of_statements()
+    test_existing_duplicate_courses_are_merged_before_the_unique_index()
+    print("✅ Async sessions read and write planned courses")
@@ -0,0 +1,112 @@
+import sys
+import threading
+import time
+
+sys.path.append('.')
+from app.scrapers.driver_pool import ChromeDriverPool, DriverPoolTimeout
+
+
+class FakeDriver:
+    """Stands in for a Chrome WebDriver: loads pages instantly until it's broken"""
+    launched = 0
+
+    def __init__(self):
+        FakeDriver.launched += 1
+        self.number = FakeDriver.launched
+        self.broken = False
+        self.quit_called = False
+
+    def get(self, url):
+        self._check()
+
+    def find_element(self, by, value):
+        self._check()
+        return object()
+
+    def execute_script(self, script, *args):
+        self._check()
+        return 'complete'
+
+    def quit(self):
+        self.quit_called = True
+
+    def _check(self):
+        if self.broken:
+            raise Exception("chrome not reachable")
+
+
+def fake_pool(size, **kwargs):
+    FakeDriver.launched = 0
+    return ChromeDriverPool(size=size, max_rss_mb=0, driver_factory=FakeDriver, **kwargs)
+
+
+def wait_for(condition, timeout=2.0):
+    # Returned drivers are reset on a background thread
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the pool"
+        time.sleep(0.01)
+
+
+def test_lease_waits_then_times_out_when_exhausted():
+    pool = fake_pool(size=1)
+    with pool.lease() as driver:
+        started = time.monotonic()
+        try:
+            with pool.lease(timeout=0.1):
+                assert False, "expected a second lease to time out"
+        except DriverPoolTimeout:
+            pass
+        assert time.monotonic() - started >= 0.1
+
+        # A waiting caller gets the driver as soon as it's returned
+        leased = []
+        waiter = threading.Thread(target=lambda: leased.append(pool._acquire(2.0)))
+        waiter.start()
+    waiter.join(2.0)
+    assert leased and leased[0].driver is driver
+    stats = pool.stats()
+    assert stats['launched'] == 1 and stats['lease_timeouts'] == 1 and stats['total'] == 1
+
+
+def test_driver_is_recycled_after_max_uses():
+    pool = fake_pool(size=1, max_uses=2)
+    drivers = []
+    for _ in range(3):
+        with pool.lease() as driver:
+            drivers.append(driver)
+        wait_for(lambda: pool.stats()['idle'] == 1 or pool.stats()['total'] == 0)
+
+    # The first driver served two leases, then a fresh one took over
+    assert drivers[0] is drivers[1] and drivers[2] is not drivers[0]
+    assert drivers[0].quit_called
+    assert pool.stats()['recycled'] == 1 and pool.stats()['launched'] == 2
+
+
+def test_broken_driver_is_dropped():
+    pool = fake_pool(size=1)
+    try:
+        with pool.lease() as driver:
+            driver.broken = True
+            raise Exception("page crashed")
+    except Exception as e:
+        assert str(e) == "page crashed"
+    assert driver.quit_called
+    assert pool.stats()['discarded_unhealthy'] == 1 and pool.stats()['total'] == 0
+
+    # An idle driver that died in the pool is replaced at the next lease
+    with pool.lease() as replacement:
+        assert replacement is not driver
+    wait_for(lambda: pool.stats()['idle'] == 1)
+    replacement.broken = True
+    with pool.lease() as fresh:
+        assert fresh is not replacement
+    assert pool.stats()['discarded_unhealthy'] == 2 and pool.stats()['launched'] == 3
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_lease_waits_then_times_out_when_exhausted()
+    test_driver_is_recycled_after_max_uses()
+    test_broken_driver_is_dropped()
+    print("✅ Driver pool bounds leases, recycles worn drivers and drops broken ones")
@@ -0,0 +1,58 @@
+import sys
+
+sys.path.append('.')
+from app.services.ai_planning_service import AIPlanningService
+from app.utils.json_stream import JSONArrayStreamParser
+
+ANSWER = '''```json
+{
+    "quarter": {
+        "quarter_name": "Fall 2024",
+        "courses": [
+            {"course_code": "MATH 1A", "units": 5, "reason": "Needs {braces} and \\"quotes\\" ]"},
+            {"course_code": "CIS 22A", "units": 4.5, "tags": ["major", {"courses": []}]}
+        ],
+        "total_units": 9.5,
+        "warnings": ["courses: none"]
+    },
+    "recommendations": [{"courses": ["not", "these"]}]
+}
+```'''
+
+
+def stream_codes(chunk_size):
+    parser = JSONArrayStreamParser(('quarter', 'courses'))
+    codes = []
+    for start in range(0, len(ANSWER), chunk_size):
+        codes.extend(course['course_code'] for course in parser.feed(ANSWER[start:start + chunk_size]))
+    return codes
+
+
+def test_elements_complete_at_any_chunk_boundary():
+    for chunk_size in (1, 2, 3, 7, 64, len(ANSWER)):
+        assert stream_codes(chunk_size) == ['MATH 1A', 'CIS 22A'], chunk_size
+
+
+def test_element_is_emitted_when_its_object_closes():
+    parser = JSONArrayStreamParser(('quarter', 'courses'))
+    assert parser.feed('{"quarter": {"courses": [{"course_code": "MATH 1A", "units": 5') == []
+    assert parser.feed('}, {"course_code"') == [{"course_code": "MATH 1A", "units": 5}]
+
+
+def test_final_object_is_validated():
+    service = AIPlanningService()
+    assert service._parse_schedule_content(ANSWER)['quarter']['total_units'] == 9.5
+    for broken in ('{"quarter": {}}', '{"quarter": {"courses": [{"units": 3}]}}',
+                   '{"quarter": {"courses": [{"course_code": "GE", "units": "three"}]}}', '{"quarter": '):
+        try:
+            service._parse_schedule_content(broken)
+            assert False, f"expected {broken!r} to be rejected"
+        except Exception as e:
+            assert 'AI schedule' in str(e) or 'JSON' in str(e)
+
+
+if __name__ == "__main__":
+    test_elements_complete_at_any_chunk_boundary()
+    test_element_is_emitted_when_its_object_closes()
+    test_final_object_is_validated()
+    print("✅ Streamed schedule courses are parsed as soon as they complete")
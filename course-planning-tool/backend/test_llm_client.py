@@ -0,0 +1,191 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append('.')
+from app.core.metrics import metrics
+from app.services.ai_planning_service import AIPlanningService
+from app.core.executors import llm_limiter
+from app.services.llm_client import LATENCY_METRIC, STREAM_LATENCY_METRIC, LLMClient, LLMError
+from app.utils.json_stream import JSONArrayStreamParser
+
+
+class ChatStubHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat endpoint; the first request of each test stalls"""
+    requests = 0
+    stall_seconds = 0.0
+    stream_deltas = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with ChatStubHandler.lock:
+            ChatStubHandler.requests += 1
+            number = ChatStubHandler.requests
+        if number == 1:
+            time.sleep(ChatStubHandler.stall_seconds)
+        if request.get('stream'):
+            self.send_stream(number)
+            return
+        body = json.dumps({
+            'id': f'chat-{number}', 'object': 'chat.completion', 'created': 0, 'model': 'stub',
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': f'answer {number}'}}],
+        }).encode()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client gave up on this attempt
+
+    def send_stream(self, number):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for delta in ChatStubHandler.stream_deltas:
+            chunk = {
+                'id': f'chat-{number}', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'stub',
+                'choices': [{'index': 0, 'finish_reason': None, 'delta': {'content': delta}}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(0.05)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+def start_chat_server(stall_seconds):
+    ChatStubHandler.requests = 0
+    ChatStubHandler.stall_seconds = stall_seconds
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ChatStubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def client_for(server, **kwargs):
+    return LLMClient(api_key='test', base_url=f"http://127.0.0.1:{server.server_address[1]}",
+                     timeout_seconds=5.0, max_retries=0, **kwargs)
+
+
+MESSAGES = [{'role': 'user', 'content': 'plan'}]
+
+
+def test_hedged_request_beats_a_stalled_call():
+    server = start_chat_server(stall_seconds=1.5)
+    client = client_for(server, hedge_enabled=True, hedge_min_samples=0, hedge_min_delay_seconds=0.2)
+
+    async def run():
+        for _ in range(3):
+            metrics.observe(LATENCY_METRIC, 0.05)  # p95 well under the stall
+        started = time.perf_counter()
+        content = await client.complete(MESSAGES, model='stub')
+        elapsed = time.perf_counter() - started
+        await client.close()
+        return content, elapsed
+
+    hedges = metrics.counter('llm.hedges')
+    try:
+        content, elapsed = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert content == 'answer 2'
+    assert elapsed < 1.0
+    assert metrics.counter('llm.hedges') == hedges + 1
+
+
+def test_no_hedge_while_every_slot_is_taken():
+    server = start_chat_server(stall_seconds=0.6)
+    client = client_for(server, hedge_enabled=True, hedge_min_samples=0, hedge_min_delay_seconds=0.2)
+
+    async def run():
+        for _ in range(3):
+            metrics.observe(LATENCY_METRIC, 0.05)
+        # Other callers hold every slot but the one the call itself takes
+        held = [llm_limiter.slot() for _ in range(llm_limiter.limit - 1)]
+        for slot in held:
+            await slot.__aenter__()
+        try:
+            content = await client.complete(MESSAGES, model='stub')
+        finally:
+            for slot in held:
+                await slot.__aexit__(None, None, None)
+        await client.close()
+        return content
+
+    hedges, skipped = metrics.counter('llm.hedges'), metrics.counter('llm.hedges_skipped')
+    try:
+        content = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert content == 'answer 1'
+    assert metrics.counter('llm.hedges') == hedges
+    assert metrics.counter('llm.hedges_skipped') == skipped + 1
+
+
+def test_deadline():
+    server = start_chat_server(stall_seconds=1.0)
+    client = client_for(server)
+
+    async def run():
+        try:
+            await client.complete(MESSAGES, model='stub', timeout=0.3)
+            assert False, "expected the deadline to cut the call off"
+        except LLMError as e:
+            assert 'timed out' in str(e)
+        # The pooled connection still serves the next call
+        content = await client.complete(MESSAGES, model='stub')
+        await client.close()
+        return content
+
+    try:
+        assert asyncio.run(run()) == 'answer 2'
+    finally:
+        server.shutdown()
+
+
+def test_stream_yields_courses_before_the_answer_ends():
+    ChatStubHandler.stream_deltas = [
+        '```json\n{"quarter": {"courses": [{"course_code": "MATH 1A", "units": 5}',
+        ', {"course_code": "CIS 22A", "uni', 'ts": 4.5}]}}', '\n```',
+    ]
+    server = start_chat_server(stall_seconds=0.0)
+    client = client_for(server)
+    completions, streams = metrics.histogram(LATENCY_METRIC)['count'], metrics.histogram(STREAM_LATENCY_METRIC)['count']
+
+    async def run():
+        parser = JSONArrayStreamParser(('quarter', 'courses'))
+        seen = []
+        async for delta in client.stream(MESSAGES, model='stub'):
+            seen.extend((course['course_code'], len(parser.text)) for course in parser.feed(delta))
+        await client.close()
+        return seen, parser.text
+
+    try:
+        seen, text = asyncio.run(run())
+    finally:
+        server.shutdown()
+    assert [code for code, _ in seen] == ['MATH 1A', 'CIS 22A']
+    # The first course arrived with the first chunk, long before the whole answer
+    assert seen[0][1] < len(text)
+    assert AIPlanningService()._parse_schedule_content(text)['quarter']['courses'][1]['units'] == 4.5
+    # Whole streams don't skew the completion latency that sets the hedge delay
+    assert metrics.histogram(STREAM_LATENCY_METRIC)['count'] == streams + 1
+    assert metrics.histogram(LATENCY_METRIC)['count'] == completions
+
+
+if __name__ == "__main__":
+    test_hedged_request_beats_a_stalled_call()
+    test_no_hedge_while_every_slot_is_taken()
+    test_deadline()
+    test_stream_yields_courses_before_the_answer_ends()
+    print("✅ LLM client hedges stalled calls when a slot is free, enforces deadlines and streams")
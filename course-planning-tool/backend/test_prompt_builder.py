@@ -0,0 +1,53 @@
+import sys
+
+sys.path.append('.')
+from app.scrapers.articulation_model import Agreement
+from app.services.prompt_builder import RequirementPromptBuilder, estimate_tokens
+from fixtures.agreements import AND_OR_AGREEMENT as AGREEMENT
+
+
+def test_estimate_tokens():
+    assert estimate_tokens('') == 0
+    assert 2 <= estimate_tokens('MATH 1A') <= 4
+    text = "Select courses totaling approximately 15 units"
+    assert 7 <= estimate_tokens(text) <= 10
+
+
+def test_only_unmet_requirements_are_described():
+    agreement = Agreement.from_dict(AGREEMENT)
+    section = RequirementPromptBuilder(1000).build(agreement, [])
+    # The honors version folds into the regular course, leaving no alternative worth listing
+    assert "MATH 1A is satisfied by" not in section
+    assert "Cheapest path: MATH 1A (5 units); MATH 1BX (6 units)" in section
+    assert "MATH 1AH" not in section
+
+    section = RequirementPromptBuilder(1000).build(agreement, ['MATH 1AH', 'MATH 1BX'])
+    assert section.splitlines()[0] == "1 of 2 required groups satisfied"
+    assert "Group 1" not in section and "MATH 1BX" not in section
+    assert "Group 2 (Complete A or B): still needs ENGIN 7" in section
+
+    satisfied = RequirementPromptBuilder(1000).build(agreement, ['MATH 1A', 'MATH 1BX', 'CIS 22A', 'CIS 22B', 'MATH 10'])
+    assert satisfied == "All transfer requirement groups are already satisfied."
+
+
+def test_budget_drops_lowest_ranked_lines_first():
+    agreement = Agreement.from_dict(AGREEMENT)
+    full = RequirementPromptBuilder(1000).build(agreement, ['MATH 1A'])
+    assert "MATH 1B is satisfied by any of: MATH 1B + MATH 1C (10 units) | MATH 1BX (6 units)" in full
+    assert "Highly recommended (not required):" in full
+
+    budget = estimate_tokens("\n".join(full.splitlines()[:6])) + 6
+    trimmed = RequirementPromptBuilder(budget).build(agreement, ['MATH 1A'])
+    lines = trimmed.splitlines()
+    # Required groups survive; the recommended block goes first, then alternatives
+    assert "Group 2 (Complete A or B): still needs ENGIN 7" in lines
+    assert "Highly recommended (not required):" not in trimmed
+    assert lines[-1].endswith("lower-priority lines omitted")
+    assert estimate_tokens("\n".join(lines[:-1])) <= budget
+
+
+if __name__ == "__main__":
+    test_estimate_tokens()
+    test_only_unmet_requirements_are_described()
+    test_budget_drops_lowest_ranked_lines_first()
+    print("✅ Prompt builder describes only unmet requirements within budget")
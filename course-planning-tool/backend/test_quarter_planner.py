@@ -0,0 +1,104 @@
+import asyncio
+import sys
+import time
+
+sys.path.append('.')
+from app.scrapers.articulation_model import Agreement
+from app.services.quarter_planner import QuarterPlanner, quarter_sequence, schedule_service
+from fixtures.agreements import SEQUENCE_AGREEMENT as AGREEMENT
+
+
+def context(completed, units=15, prerequisites=None):
+    return {
+        'profile': {
+            'current_institution': 'De Anza College',
+            'target_institution': 'University of California, Berkeley',
+            'current_quarter': 'fall',
+            'current_year': 2024,
+        },
+        'completed_courses': [{'code': code} for code in completed],
+        'transfer_requirements': Agreement.from_dict(AGREEMENT),
+        'preferences': {'units_per_quarter': units},
+        'prerequisites': prerequisites or {},
+    }
+
+
+def codes(schedule):
+    return [c['course_code'] for c in schedule['quarter']['courses']]
+
+
+def test_plans_within_caps_and_prerequisites():
+    planner = QuarterPlanner()
+    schedule = planner.plan(context([]))
+    quarter = schedule['quarter']
+    assert quarter['quarter_name'] == 'Fall 2024'
+    # Later courses of a series wait for earlier ones; the courses that unlock others win the unit cap
+    assert codes(schedule) == ['MATH 1A', 'CIS 22A', 'GE']
+    assert quarter['total_units'] == 14.5
+    assert 'COMPSCI 70: No course articulated at De Anza College' in quarter['warnings'][0]
+    assert any(w.startswith('MATH 1B: Take after its prerequisites (MATH 1A)') for w in quarter['warnings'])
+
+    # Honors completes the regular course; an explicit prerequisite holds PHYS 4A back
+    schedule = planner.plan(context(['MATH 1AH', 'CIS 22A'], units=20, prerequisites={'PHYS 4A': ['MATH 1B']}))
+    assert codes(schedule) == ['MATH 1B', 'CIS 22B', 'GE']
+    assert schedule['quarter']['total_units'] == 19.5
+    assert 'PHYS 4A: Take after its prerequisites (MATH 1B)' in schedule['quarter']['warnings']
+
+
+def test_deterministic_and_fast():
+    planner = QuarterPlanner()
+    started = time.perf_counter()
+    plans = [planner.plan(context(['MATH 1A'], units=12)) for _ in range(5)]
+    assert (time.perf_counter() - started) / 5 < 0.5
+    assert all(plan == plans[0] for plan in plans)
+    assert codes(plans[0]) == ['MATH 1B', 'CIS 22A']
+    assert plans[0]['quarter']['total_units'] == 9.5
+
+
+def test_quarter_sequence():
+    assert quarter_sequence('fall', 2024, 'fall', 2025) == [('Fall', 2024), ('Winter', 2025), ('Spring', 2025)]
+    assert len(quarter_sequence('fall', 2024, 'fall', 2025, include_summer=True)) == 4
+    assert quarter_sequence('spring', 2025, 'winter', 2025) == []
+
+
+def test_plans_every_quarter_until_transfer():
+    planning_context = context([], units=10)
+    planning_context['profile'].update(transfer_quarter='fall', transfer_year=2025)
+    plan = QuarterPlanner().plan_horizon(planning_context)
+
+    assert [q['quarter_name'] for q in plan['quarters']] == ['Fall 2024', 'Winter 2025', 'Spring 2025']
+    # The MATH series runs one course per quarter; everything else fits around it
+    assert [codes({'quarter': q}) for q in plan['quarters']] == [
+        ['MATH 1A', 'CIS 22A'], ['MATH 1B', 'CIS 22B'], ['MATH 1C', 'GE']
+    ]
+    assert all(q['total_units'] <= 10 for q in plan['quarters'])
+    assert plan['unscheduled'] == ['PHYS 4A']
+    assert plan['warnings'][-1] == 'PHYS 4A: Not scheduled before transfer - no room under the 10-unit cap'
+
+    # A longer horizon fits everything
+    planning_context['profile'].update(transfer_year=2026)
+    plan = QuarterPlanner().plan_horizon(planning_context)
+    assert len(plan['quarters']) == 6
+    assert plan['unscheduled'] == []
+    # The async entry point solves in a worker thread and returns the same plan
+    assert asyncio.run(QuarterPlanner().generate_horizon_schedule(planning_context)) == plan
+
+
+def test_schedule_service_selects_engine():
+    planner = schedule_service('solver')
+    schedule = asyncio.run(planner.generate_quarter_schedule(context([])))
+    assert set(schedule) == {'quarter', 'recommendations'}
+    try:
+        schedule_service('oracle')
+        assert False, "expected an unknown engine to be rejected"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_plans_within_caps_and_prerequisites()
+    test_deterministic_and_fast()
+    test_quarter_sequence()
+    test_plans_every_quarter_until_transfer()
+    test_schedule_service_selects_engine()
+    print("✅ Quarter planner produces deterministic quarter and horizon schedules")
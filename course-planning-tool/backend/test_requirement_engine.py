@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append('.')
+from app.scrapers.articulation_model import Agreement
+from app.services.requirement_engine import RequirementTree, normalize_course_code, regular_course_code
+from fixtures.agreements import AND_OR_AGREEMENT as AGREEMENT
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'assist_reports', 'golden')
+
+
+def test_normalize_course_code():
+    assert normalize_course_code(' math  1a ') == 'MATH1A'
+    # One honors rule everywhere: an H right after the course number and optional section letter
+    assert [regular_course_code(code) for code in ('MATH1AH', 'MATH10H', 'MATH1A', 'ENGLH', 'MATH1ABH')] == [
+        'MATH1A', 'MATH10', 'MATH1A', 'ENGLH', 'MATH1ABH'
+    ]
+
+
+def test_evaluate_and_or_tree():
+    tree = RequirementTree(Agreement.from_dict(AGREEMENT))
+
+    progress = tree.evaluate([])
+    assert progress['satisfied'] == []
+    assert progress['required_groups'] == 2
+    sequence, choice = progress['remaining']
+    assert [c['code'] for c in sequence['courses']] == ['MATH 1A', 'MATH 1BX']
+    # Option A has no articulation, so the cheapest path runs through option B
+    assert [c['code'] for c in choice['courses']] == ['CIS 22A', 'CIS 22B']
+    assert progress['after_transfer'] == []
+    assert progress['cheapest_remaining']['units'] == 20.0
+    assert [c['code'] for c in progress['recommended_remaining'][0]['courses']] == ['MATH 10']
+
+    # An OR bracket is met by either group; an unarticulated honors course counts as the regular one
+    progress = tree.evaluate(['math 1ah', 'MATH 1B', 'MATH 1C', 'CIS 22A', 'MATH 10H'])
+    assert progress['satisfied'] == ['1', '3']
+    assert progress['completed_applied'] == ['MATH 1AH', 'MATH 1B', 'MATH 1C', 'CIS 22A', 'MATH 10']
+    assert [c['code'] for c in progress['cheapest_remaining']['courses']] == ['CIS 22B']
+
+    progress = tree.evaluate(['MATH 1A', 'MATH 1BX', 'CIS 22A', 'CIS 22B'])
+    assert progress['satisfied'] == ['1', '2']
+    assert progress['remaining'] == []
+    assert progress['cheapest_remaining'] == {'courses': [], 'units': 0.0}
+
+
+def test_no_course_articulated_is_after_transfer():
+    data = json.loads(json.dumps(AGREEMENT))
+    data['target_requirements'][1]['options'].pop()
+    data['target_requirements'][1]['structure'] = 'sequence'
+    data['target_requirements'][1]['courses'] = data['target_requirements'][1].pop('options')[0]['courses']
+    progress = RequirementTree(Agreement.from_dict(data)).evaluate(['MATH 1A', 'MATH 1BX'])
+    assert progress['after_transfer'] == ['COMPSCI 61A']
+    assert progress['remaining'][0]['courses'] == []
+
+
+def test_golden_reports_compile_and_evaluate_quickly():
+    for name in sorted(os.listdir(GOLDEN_DIR)):
+        with open(os.path.join(GOLDEN_DIR, name)) as f:
+            tree = RequirementTree(Agreement.from_dict(json.load(f)))
+        codes = [c.code for c in tree.agreement.sending_courses()]
+        assert tree.evaluate(codes)['cheapest_remaining']['units'] == 0.0, name
+        started = time.perf_counter()
+        for _ in range(100):
+            tree.evaluate(codes[::2])
+        assert (time.perf_counter() - started) / 100 < 0.005, name
+
+
+if __name__ == "__main__":
+    test_normalize_course_code()
+    test_evaluate_and_or_tree()
+    test_no_course_articulated_is_after_transfer()
+    test_golden_reports_compile_and_evaluate_quickly()
+    print("✅ Requirement engine evaluates articulation trees")
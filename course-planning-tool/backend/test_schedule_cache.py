@@ -0,0 +1,45 @@
+import sys
+
+sys.path.append('.')
+from app.scrapers.articulation_model import Agreement
+from app.services.schedule_cache import schedule_cache_key
+from fixtures.agreements import SEQUENCE_AGREEMENT as AGREEMENT
+
+
+def planning_context(completed, **profile):
+    return {
+        'profile': {'current_institution': 'De Anza College', 'target_institution': 'UC Berkeley',
+                    'current_major': 'Computer Science', 'target_major': 'Computer Science', **profile},
+        'completed_courses': completed,
+        'transfer_requirements': Agreement.from_dict(AGREEMENT),
+        'requirement_progress': {'ignored': True},
+        'preferences': {'units_per_quarter': 15, 'min_units_per_quarter': 12},
+    }
+
+
+def test_key_is_canonical():
+    key = schedule_cache_key(planning_context([
+        {'code': 'MATH 1A', 'units': 5, 'grade': 'A'}, {'code': 'CIS 22A', 'units': 4.5, 'grade': 'b+'}
+    ]))
+    # Course order, code spacing, grade case and parsed vs raw agreement data don't change the key
+    same = planning_context([
+        {'course_code': 'cis 22a', 'units': '4.5', 'grade': 'B+'}, {'code': 'MATH1A', 'units': 5.0, 'grade': 'A'}
+    ], current_institution='  de anza college ')
+    same['transfer_requirements'] = AGREEMENT
+    same['preferences']['min_units_per_quarter'] = 9  # not part of the prompt
+    assert schedule_cache_key(same) == key
+
+    # The agreement and the transcript each address their own segment of the key
+    changed_courses = schedule_cache_key(planning_context([{'code': 'MATH 1A', 'units': 5, 'grade': 'A'}]))
+    assert changed_courses.split('|')[1] == key.split('|')[1]
+    assert changed_courses.split('|')[2] != key.split('|')[2]
+
+    other = planning_context([])
+    other['transfer_requirements'] = Agreement.from_dict({**AGREEMENT, 'target_requirements': []})
+    assert schedule_cache_key(other).split('|')[1] != key.split('|')[1]
+    assert schedule_cache_key(planning_context([], planning_quarter='Winter')) != schedule_cache_key(planning_context([]))
+
+
+if __name__ == "__main__":
+    test_key_is_canonical()
+    print("✅ Schedule cache keys are canonical")
@@ -0,0 +1,193 @@
+import asyncio
+import sys
+
+sys.path.append('.')
+import app.scrapers.single_flight as single_flight
+from app.scrapers.single_flight import SingleFlight
+
+
+async def no_redis():
+    return None
+
+
+def run_with_redis(client, main):
+    """Run `main()` with single flight talking to `client` (None: in-process coalescing only)"""
+    async def get_client():
+        return client
+
+    get_async_redis = single_flight.get_async_redis
+    single_flight.get_async_redis = get_client
+    try:
+        return asyncio.run(main())
+    finally:
+        single_flight.get_async_redis = get_async_redis
+
+
+def run_without_redis(main):
+    return run_with_redis(None, main)
+
+
+class LoopbackRedis:
+    """
+    The lock, pub/sub and script commands single flight uses, shared by every
+    SingleFlight in the test the way Redis is shared by workers. Each command
+    takes a few milliseconds, so the gap between a leader's commands is real.
+    """
+    LATENCY = 0.02
+
+    def __init__(self):
+        self.values = {}
+        self.subscribers = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        await asyncio.sleep(self.LATENCY)
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token, *args):
+        owned = self.values.get(key) == token
+        if owned and "'del'" in script:
+            del self.values[key]
+        await asyncio.sleep(self.LATENCY)
+        return int(owned)
+
+    async def exists(self, key):
+        return int(key in self.values)
+
+    async def publish(self, channel, data):
+        for queue in self.subscribers.get(channel, []):
+            queue.put_nowait({"type": "message", "data": data})
+        await asyncio.sleep(self.LATENCY)
+
+    def pubsub(self):
+        return LoopbackPubSub(self)
+
+
+class LoopbackPubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = asyncio.Queue()
+        self.channels = []
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self.queue)
+        self.channels.append(channel)
+
+    async def get_message(self, ignore_subscribe_messages=False, timeout=0.0):
+        # Polls briefly rather than for the full timeout, like a follower between lock checks
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=min(timeout, 0.005))
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self, channel):
+        self.redis.subscribers[channel].remove(self.queue)
+
+    async def close(self):
+        pass
+
+
+def flight():
+    return SingleFlight(namespace="test", lock_ttl_seconds=5, wait_timeout_seconds=5)
+
+
+def test_concurrent_calls_share_one_execution():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"courses": ["MATH 1A"]}
+
+    async def run():
+        shared = flight()
+        results = await asyncio.gather(*(shared.do("key", work) for _ in range(5)))
+        # Once the flight lands, the next call runs the work again
+        await shared.do("key", work)
+        return results, shared
+
+    results, shared = run_without_redis(run)
+    assert len(calls) == 2
+    assert all(result == {"courses": ["MATH 1A"]} for result in results)
+    # Waiters get copies, so one caller mutating its result can't affect another's
+    assert results[1] is not results[2]
+    assert shared._inflight == {}
+
+
+def test_leader_error_reaches_every_waiter():
+    async def work():
+        await asyncio.sleep(0.05)
+        raise ValueError("scrape failed")
+
+    async def run():
+        shared = flight()
+        return await asyncio.gather(*(shared.do("key", work) for _ in range(3)), return_exceptions=True)
+
+    results = run_without_redis(run)
+    assert [type(result) for result in results] == [ValueError] * 3
+    assert all(str(result) == "scrape failed" for result in results)
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "agreement"
+
+    async def run():
+        shared = flight()
+        leader = asyncio.ensure_future(shared.do("key", work))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(shared.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        results = await asyncio.gather(*waiters)
+        try:
+            await leader
+            assert False, "expected the leader to be cancelled"
+        except asyncio.CancelledError:
+            pass
+        return results
+
+    assert run_without_redis(run) == ["agreement", "agreement"]
+    assert len(calls) == 1
+
+
+def test_leader_error_reaches_followers_in_other_workers():
+    calls = {"leader": 0, "followers": 0}
+
+    async def failing_scrape():
+        calls["leader"] += 1
+        await asyncio.sleep(0.1)
+        raise Exception("ASSIST.org is down")
+
+    async def scrape():
+        calls["followers"] += 1
+        return "agreement"
+
+    async def nothing_cached():
+        return None
+
+    async def run():
+        leader_worker, follower_worker = flight(), flight()
+        leader = asyncio.ensure_future(leader_worker.do("key", failing_scrape, nothing_cached))
+        await asyncio.sleep(0.05)  # The leader holds the lock
+        followers = [follower_worker.do("key", scrape, nothing_cached), flight().do("key", scrape, nothing_cached)]
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    results = run_with_redis(LoopbackRedis(), run)
+    # The error is published before the lock is released, so no follower re-runs the failing scrape
+    assert [str(result) for result in results] == ["ASSIST.org is down"] * 3
+    assert calls == {"leader": 1, "followers": 0}
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_one_execution()
+    test_leader_error_reaches_every_waiter()
+    test_cancelled_leader_does_not_cancel_waiters()
+    test_leader_error_reaches_followers_in_other_workers()
+    print("✅ Single flight coalesces calls and survives a cancelled leader")
@@ -0,0 +1,52 @@
+import asyncio
+import sys
+from types import SimpleNamespace
+
+sys.path.append('.')
+from app.api.v1.transfer import _articulation_progress
+from app.scrapers.articulation_cache import articulation_cache, articulation_cache_key
+from app.services.transfer_analysis_service import TransferAnalysisService, resolve_assist_names
+from fixtures.agreements import AND_OR_AGREEMENT as AGREEMENT
+from fixtures.settings import without_assist_catalog
+
+
+class CompletedCodesSession:
+    """Answers the completed-course query; the agreement comes from the cache"""
+
+    def __init__(self, codes):
+        self.codes = codes
+
+    async def scalars(self, statement):
+        return iter(self.codes)
+
+
+def test_progress_reads_the_agreement_analyze_public_cached():
+    with without_assist_catalog():
+        params = TransferAnalysisService.prepare_public_request({
+            "current_institution": "de anza", "intended_transfer_institution": "uc berkeley",
+            "current_major": "computer science", "target_transfer_quarter": "2026", "current_planning_quarter": "fall",
+        })
+        resolved = resolve_assist_names("2025-2026", "De Anza", "UC Berkeley", "Computer Science")
+        articulation_cache.set(articulation_cache_key(
+            params["academic_year"], params["current_institution"], params["target_institution"], params["major"]
+        ), AGREEMENT, remote=False)
+
+        # The profile stores the student's own spelling; the lookup resolves it the same way
+        profile = SimpleNamespace(expected_transfer_year=2026, current_institution="De Anza",
+                                  target_institution="UC Berkeley", target_major="Computer Science")
+        progress = asyncio.run(_articulation_progress(profile, 1, CompletedCodesSession(["MATH 1A"])))
+    assert resolved == (params["current_institution"], params["target_institution"], params["major"])
+    assert progress is not None
+    assert progress["completed_applied"] == ["MATH 1A"]
+
+
+def test_progress_without_a_transfer_year():
+    profile = SimpleNamespace(expected_transfer_year=None, current_institution="De Anza",
+                              target_institution="UC Berkeley", target_major="Computer Science")
+    assert asyncio.run(_articulation_progress(profile, 1, CompletedCodesSession([]))) is None
+
+
+if __name__ == "__main__":
+    test_progress_reads_the_agreement_analyze_public_cached()
+    test_progress_without_a_transfer_year()
+    print("✅ Transfer progress finds the cached agreement")